@@ -1,12 +1,45 @@
+from types import GeneratorType
+
+
 class ASTNode:
-    """Classe base para todos os nós da AST."""
+    """Classe base para todos os nós da AST.
+
+    Nós de expressão, atribuições e leituras têm o atributo `resolved_type`,
+    preenchido pelo analisador semântico com 'inteiro', 'decimal' ou 'texto'.
+    Declarações, atribuições, leituras e variáveis têm o atributo `symbol`,
+    preenchido pelo `Resolver` (resolver.py).
+
+    Os nós criados pelo parser têm `lineno` e `lexpos`, a linha e a posição no
+    texto do token que os originou; nos demais, os dois ficam None.
+    """
+    __slots__ = ()
+
     def accept(self, visitor):
         """Método para aceitar visitantes (padrão Visitor)."""
         raise NotImplementedError("Este método deve ser implementado nas subclasses")
 
 
+class DispatchTable(dict):
+    """Tabela tipo -> manipulador; um tipo sem entrada herda o manipulador da classe base mais próxima."""
+    def __missing__(self, cls):
+        handler = None
+        for base in cls.__mro__[1:]:
+            if base in self:
+                handler = self[base]
+                break
+        self[cls] = handler
+        return handler
+
+    @classmethod
+    def bind(cls, owner, handler_names):
+        """Monta a tabela com os métodos de `owner` indicados em `handler_names` (tipo -> nome)."""
+        return cls({node_type: getattr(owner, name) for node_type, name in handler_names.items()})
+
+
 class ProgramNode(ASTNode):
     """Nó principal que representa o programa."""
+    __slots__ = ("statements",)
+
     def __init__(self, statements):
         self.statements = statements
 
@@ -14,15 +47,22 @@ class ProgramNode(ASTNode):
         return visitor.visit_program(self)
 
 class StatementNode(ASTNode):
+    __slots__ = ("statement",)
+
     def init(self, statement):
         super().init()
         self.statement = statement  
 
 class DeclarationNode(ASTNode):
     """Nó para declarações de variáveis."""
+    __slots__ = ("var_type", "var_name", "symbol", "lineno", "lexpos")
+
     def __init__(self, var_type, var_name):
         self.var_type = var_type
         self.var_name = var_name
+        self.symbol = None
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_declaration(self)
@@ -30,9 +70,15 @@ class DeclarationNode(ASTNode):
 
 class AssignmentNode(ASTNode):
     """Nó para atribuições."""
+    __slots__ = ("var_name", "expression", "resolved_type", "symbol", "lineno", "lexpos")
+
     def __init__(self, var_name, expression):
         self.var_name = var_name
         self.expression = expression
+        self.resolved_type = None
+        self.symbol = None
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_assignment(self)
@@ -40,10 +86,15 @@ class AssignmentNode(ASTNode):
 
 class BinaryOpNode(ASTNode):
     """Nó para operações binárias (e.g., soma, subtração, multiplicação)."""
+    __slots__ = ("left", "operator", "right", "resolved_type", "lineno", "lexpos")
+
     def __init__(self, left, operator, right):
         self.left = left       
         self.operator = operator  
         self.right = right     
+        self.resolved_type = None
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_binary_op(self)
@@ -51,8 +102,14 @@ class BinaryOpNode(ASTNode):
 
 class VariableNode(ASTNode):
     """Nó para variáveis (usado em expressões ou atribuições)."""
+    __slots__ = ("var_name", "resolved_type", "symbol", "lineno", "lexpos")
+
     def __init__(self, var_name):
         self.var_name = var_name  
+        self.resolved_type = None
+        self.symbol = None
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         """Permite que o visitante (visitor) passe por este nó."""
@@ -61,10 +118,14 @@ class VariableNode(ASTNode):
 
 class IfNode(ASTNode):
     """Nó para estruturas condicionais."""
+    __slots__ = ("condition", "then_branch", "else_branch", "lineno", "lexpos")
+
     def __init__(self, condition, then_branch, else_branch=None):
         self.condition = condition
         self.then_branch = [then_branch] if not isinstance(then_branch, list) else then_branch
         self.else_branch = [else_branch] if else_branch and not isinstance(else_branch, list) else else_branch
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_if(self)
@@ -73,9 +134,13 @@ class IfNode(ASTNode):
 
 class WhileNode(ASTNode):
     """Nó para laços 'while'."""
+    __slots__ = ("condition", "body", "lineno", "lexpos")
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_while(self)
@@ -83,47 +148,93 @@ class WhileNode(ASTNode):
 
 class WriteNode(ASTNode):
     """Nó para instruções 'escreva'."""
+    __slots__ = ("expression", "lineno", "lexpos")
+
     def __init__(self, expression):
         self.expression = expression  
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_write(self)
 
 class ReadNode(ASTNode):
     """Nó para instruções 'leia'."""
+    __slots__ = ("var_name", "resolved_type", "symbol", "lineno", "lexpos")
+
     def __init__(self, var_name):
         self.var_name = var_name
+        self.resolved_type = None
+        self.symbol = None
+        self.lineno = None
+        self.lexpos = None
 
     def accept(self, visitor):
         return visitor.visit_read(self)
     
 class ForNode(ASTNode):
-    def __init__(self, variable, start, end, step, body):
+    __slots__ = ("init", "condition", "update", "body", "lineno", "lexpos")
+
+    def __init__(self, init, condition, update, body):
         """
-        Representa um nó de laço 'for' na AST.
+        Representa um laço 'para (init; condition; update) body' na AST.
 
-        :param variable: A variável de controle do laço (ex.: 'i').
-        :param start: O valor inicial do laço.
-        :param end: A condição de parada ou valor final do laço.
-        :param step: O incremento ou passo do laço (pode ser None).
-        :param body: O corpo do laço (uma lista de nós de instruções).
+        :param init: A atribuição inicial (ex.: 'i := 0').
+        :param condition: A condição avaliada antes de cada iteração.
+        :param update: A atribuição executada após cada iteração (ex.: 'i := i + 1').
+        :param body: O corpo do laço (uma instrução ou lista de instruções).
         """
-        self.variable = variable  
-        self.start = start        
-        self.end = end            
-        self.step = step          
-        self.body = body         
-    def accept(self, visitor): 
-        return visitor.visit_for(self)
+        self.init = init
+        self.condition = condition
+        self.update = update
+        self.body = body
+        self.lineno = None
+        self.lexpos = None
 
-    def repr(self):
+    def __repr__(self):
         """Representação legível para depuração."""
-        return (f"ForNode(variable={self.variable}, start={self.start}, "
-                f"end={self.end}, step={self.step}, body={self.body})")
+        return (f"ForNode(init={self.init}, condition={self.condition}, "
+                f"update={self.update}, body={self.body})")
+
     def accept(self, visitor):
         return visitor.visit_for(self)
 
-class ComparisonNode:
+
+class RangeForNode(ASTNode):
+    __slots__ = ("variable", "start", "stop", "step", "body", "symbol", "lineno", "lexpos")
+
+    def __init__(self, variable, start, stop, step, body):
+        """
+        Laço contado, equivalente a 'for variable in range(start, stop, step)'.
+
+        Não é produzido pelo parser: vem da análise de laços (loops.py), quando um
+        'para' ou 'enquanto' tem uma variável de indução.
+
+        :param variable: O nome da variável de controle do laço (ex.: 'i').
+        :param start: O valor inicial do laço.
+        :param stop: O valor final (exclusivo) do laço.
+        :param step: O passo do laço, um inteiro constante diferente de zero.
+        :param body: O corpo do laço (uma lista de nós de instruções).
+        """
+        self.variable = variable
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.body = body
+        self.symbol = None
+        self.lineno = None
+        self.lexpos = None
+
+    def __repr__(self):
+        return (f"RangeForNode(variable={self.variable}, start={self.start}, "
+                f"stop={self.stop}, step={self.step}, body={self.body})")
+
+    def accept(self, visitor):
+        return visitor.visit_range_for(self)
+
+class ComparisonNode(ASTNode):
+    __slots__ = ("operator", "left", "right", "resolved_type", "lineno", "lexpos")
+
     def __init__(self, operator, left, right):
         """
         Inicializa o nó de comparação.
@@ -135,6 +246,9 @@ class ComparisonNode:
         self.operator = operator
         self.left = left
         self.right = right
+        self.resolved_type = None
+        self.lineno = None
+        self.lexpos = None
 
     def __repr__(self):
         """
@@ -167,3 +281,145 @@ class ComparisonNode:
         else:
             raise ValueError(f"Operador desconhecido: {self.operator}")
 
+
+# Percursos sem recursão: a profundidade da árvore (blocos aninhados ou
+# expressões longas) não é limitada pela pilha de chamadas do Python.
+
+OPERATOR_NODES = (BinaryOpNode, ComparisonNode)
+
+
+def with_operands(expression, left, right):
+    """A operação `expression` com os operandos `left` e `right`.
+
+    Devolve o próprio nó quando os operandos não mudaram e, senão, uma cópia com o
+    mesmo tipo resolvido e a mesma posição: o original pode estar compartilhado
+    com outros pontos do programa (sharing.py) e não é alterado.
+    """
+    if left is expression.left and right is expression.right:
+        return expression
+    if type(expression) is ComparisonNode:
+        node = ComparisonNode(expression.operator, left, right)
+    else:
+        node = BinaryOpNode(left, expression.operator, right)
+    node.resolved_type = expression.resolved_type
+    node.lineno = expression.lineno
+    node.lexpos = expression.lexpos
+    return node
+
+
+def walk(node, handlers, owner):
+    """Visita `node` e seus descendentes com os manipuladores de `handlers` (tipo -> função de `owner`).
+
+    Um manipulador gerador entrega com `yield` cada filho a visitar (um nó ou uma
+    lista de nós, percorrida em ordem) e é retomado quando o filho termina. Os
+    geradores suspensos ficam em uma pilha explícita no lugar das chamadas
+    recursivas. Os resultados dos manipuladores são descartados; veja transform().
+    """
+    stack = []
+    while True:
+        if type(node) is list:
+            stack.append(iter(node))
+        else:
+            handler = handlers[type(node)]
+            if handler is not None:
+                result = handler(owner, node)
+                if type(result) is GeneratorType:
+                    stack.append(result)
+        # next() com valor padrão não levanta StopIteration quando o gerador termina.
+        while stack:
+            node = next(stack[-1], _DONE)
+            if node is not _DONE:
+                break
+            stack.pop()
+        else:
+            return
+
+
+def transform(node, handlers, owner):
+    """Como walk(), mas devolve o resultado do manipulador de `node`.
+
+    Um manipulador gerador recebe o resultado de cada filho como valor do `yield`
+    e devolve o seu com `return`; os demais devolvem o resultado diretamente.
+    Listas não são percorridas automaticamente: precisam de um manipulador.
+    """
+    stack = []
+    while True:
+        handler = handlers[type(node)]
+        result = handler(owner, node) if handler is not None else None
+        if type(result) is GeneratorType:
+            stack.append(result)
+            result = None
+        while stack:
+            try:
+                node = stack[-1].send(result)
+                break
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+        else:
+            return result
+
+
+def evaluate(expression, handlers, owner, cached=None):
+    """Avalia a expressão de baixo para cima com uma pilha explícita.
+
+    Operações (`BinaryOpNode` e `ComparisonNode`) são avaliadas depois dos dois
+    operandos, o esquerdo primeiro, e o manipulador recebe os resultados deles:
+    `handler(owner, node, left, right)`. Os demais nós recebem só o próprio nó.
+    Tipos sem manipulador resultam em None.
+
+    `cached` (id do nó -> resultado) guarda resultados já conhecidos: uma operação
+    que está nele não é percorrida de novo. Serve às árvores com nós compartilhados
+    (sharing.py), em que a mesma subexpressão aparece em vários pontos.
+    """
+    if not isinstance(expression, OPERATOR_NODES):
+        handler = handlers[type(expression)]
+        return handler(owner, expression) if handler is not None else None
+    if cached is not None:
+        value = cached.get(id(expression), _MISSING)
+        if value is not _MISSING:
+            return value
+    if not (isinstance(expression.left, OPERATOR_NODES) or isinstance(expression.right, OPERATOR_NODES)):
+        return _operation(expression, handlers, owner)
+    # A pilha guarda operações a expandir, operandos simples a avaliar e, depois de
+    # cada operação expandida, o marcador _COMBINE: ao retirá-lo, os resultados dos
+    # dois operandos já estão no topo de `results`. Operações entre dois operandos
+    # simples, o caso mais comum, são avaliadas direto, sem passar pela pilha.
+    results = []
+    stack = [expression]
+    while True:
+        node = stack.pop()
+        if node is _COMBINE:
+            node = stack.pop()
+            right = results.pop()
+            left = results.pop()
+            handler = handlers[type(node)]
+            value = handler(owner, node, left, right) if handler is not None else None
+            if not stack:
+                return value
+        elif not isinstance(node, OPERATOR_NODES):
+            handler = handlers[type(node)]
+            value = handler(owner, node) if handler is not None else None
+        elif cached is not None and id(node) in cached:
+            value = cached[id(node)]
+        elif isinstance(node.left, OPERATOR_NODES) or isinstance(node.right, OPERATOR_NODES):
+            stack += (node, _COMBINE, node.right, node.left)
+            continue
+        else:
+            value = _operation(node, handlers, owner)
+        results.append(value)
+
+
+def _operation(node, handlers, owner):
+    """Avalia uma operação entre dois operandos simples."""
+    handler = handlers[type(node.left)]
+    left = handler(owner, node.left) if handler is not None else None
+    handler = handlers[type(node.right)]
+    right = handler(owner, node.right) if handler is not None else None
+    handler = handlers[type(node)]
+    return handler(owner, node, left, right) if handler is not None else None
+
+
+_COMBINE = object()
+_DONE = object()
+_MISSING = object()
@@ -0,0 +1,154 @@
+"""Compilador em lote: compila arquivos, diretórios ou globs de programas em paralelo.
+
+Uso:
+    python batch.py exemplos/ outros/*.prog -o saida/ -j 8
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import create_lexer
+from parsercode import get_parser
+from compiler import compile_source, compiler_version
+from streaming import compile_path
+
+SOURCE_EXT = ".prog"
+OUTPUT_EXT = ".py"
+
+# Estado de cada processo trabalhador: lexer e parser ficam aquecidos entre arquivos.
+_worker = {}
+
+
+def collect_sources(inputs, ext=SOURCE_EXT):
+    """Expande arquivos, diretórios e globs em pares (arquivo, raiz relativa)."""
+    seen = set()
+    sources = []
+    for item in inputs:
+        matches = glob.glob(item, recursive=True) if glob.has_magic(item) else [item]
+        for path in matches:
+            if os.path.isdir(path):
+                for dirpath, _, filenames in os.walk(path):
+                    for name in sorted(filenames):
+                        if name.endswith(ext):
+                            sources.append((os.path.join(dirpath, name), path))
+            else:
+                sources.append((path, os.path.dirname(path)))
+    unique = []
+    for path, root in sources:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append((path, root))
+    return unique
+
+
+def output_path(path, root, out_dir):
+    """Caminho do arquivo gerado: ao lado da entrada ou espelhado em `out_dir`."""
+    base = os.path.splitext(path)[0] + OUTPUT_EXT
+    if out_dir is None:
+        return base
+    return os.path.join(out_dir, os.path.relpath(base, root or "."))
+
+
+def init_worker(cache_dir=None, stream=False, optimize=0):
+    """Prepara o lexer, o parser e o cache do processo trabalhador."""
+    _worker["lexer"] = create_lexer()
+    _worker["stream"] = stream
+    _worker["optimize"] = optimize
+    get_parser()
+    if cache_dir:
+        from cache import CompilationCache
+        _worker["cache"] = CompilationCache(directory=cache_dir,
+                                            version=f"{compiler_version()}:O{optimize}")
+
+
+def compile_file(job):
+    """Compila um arquivo e grava a saída. Devolve (entrada, saída, erro, segundos, bytes)."""
+    path, out_path = job
+    start = time.perf_counter()
+    try:
+        if _worker["stream"]:
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            compile_path(path, out_path, lexer=_worker["lexer"], optimize=_worker["optimize"])
+            return path, out_path, None, time.perf_counter() - start, os.path.getsize(path)
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        lexer = _worker["lexer"]
+        optimize = _worker["optimize"]
+        cache = _worker.get("cache")
+        if cache is not None:
+            result = cache.compile(source, lambda src: compile_source(src, lexer=lexer, optimize=optimize))
+        else:
+            result = compile_source(source, lexer=lexer, optimize=optimize)
+        out_parent = os.path.dirname(out_path)
+        if out_parent:
+            os.makedirs(out_parent, exist_ok=True)
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(result.code)
+            f.write("\n")
+        error = None
+    except Exception as e:
+        source = ""
+        error = str(e) or type(e).__name__
+    return path, out_path, error, time.perf_counter() - start, len(source)
+
+
+def compile_batch(sources, out_dir=None, jobs=None, cache_dir=None, stream=False, optimize=0,
+                  chunksize=None):
+    """Compila os arquivos em um pool de processos, devolvendo os resultados em ordem."""
+    jobs_list = [(path, output_path(path, root, out_dir)) for path, root in sources]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(jobs_list) <= 1:
+        init_worker(cache_dir, stream, optimize)
+        yield from map(compile_file, jobs_list)
+        return
+    chunksize = chunksize or max(1, len(jobs_list) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(cache_dir, stream, optimize)) as executor:
+        yield from executor.map(compile_file, jobs_list, chunksize=chunksize)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compila programas em lote.")
+    arg_parser.add_argument("inputs", nargs="+", help="arquivos, diretórios ou globs")
+    arg_parser.add_argument("-o", "--out-dir", help="diretório de saída (padrão: ao lado da entrada)")
+    arg_parser.add_argument("-j", "--jobs", type=int, help="processos trabalhadores (padrão: núcleos)")
+    arg_parser.add_argument("--ext", default=SOURCE_EXT, help="extensão procurada nos diretórios")
+    arg_parser.add_argument("--cache-dir", help="diretório do cache de compilação em disco")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="lê cada arquivo em blocos, sem carregá-lo inteiro na memória")
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1, 2), default=0,
+                            help="nível de otimização (-O0, -O1, -O2)")
+    arg_parser.add_argument("-q", "--quiet", action="store_true", help="não lista cada arquivo")
+    args = arg_parser.parse_args(argv)
+
+    sources = collect_sources(args.inputs, args.ext)
+    if not sources:
+        print("Nenhum arquivo encontrado.", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    failures = 0
+    total_bytes = 0
+    for path, out_path, error, elapsed, size in compile_batch(sources, args.out_dir, args.jobs,
+                                                             args.cache_dir, args.stream,
+                                                             args.optimize):
+        total_bytes += size
+        if error:
+            failures += 1
+            # Um diagnóstico por linha: os seguintes ao primeiro vêm recuados.
+            print(f"ERRO {path}: " + "\n     ".join(error.splitlines()), file=sys.stderr)
+        elif not args.quiet:
+            print(f"ok   {path} -> {out_path} ({elapsed * 1000:.1f} ms)")
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(sources)} arquivos, {failures} com erro, {elapsed:.2f} s, "
+          f"{len(sources) / elapsed:.1f} arquivos/s, {total_bytes / 1024 / elapsed:.1f} KiB/s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Compara a memória e a velocidade de percurso das codificações da AST.
+
+- objetos com __dict__ (como eram os nós antes de __slots__);
+- objetos com __slots__ (astcode atual);
+- FlatAST, com arrays paralelos.
+
+Uso: python -m benchmarks.ast_memory [--repeat N]
+"""
+import argparse
+import time
+import tracemalloc
+
+from compiler import compile_source
+from flat_ast import FlatAST, _FIELDS
+from semantic import SemanticAnalyzer
+from code_generator import PythonCodeGenerator
+
+BODY = """
+    inteiro a;
+    decimal b;
+    texto c;
+    a := 10 + 2 * 3;
+    b := 3.14;
+    c := "oi";
+    escreva a;
+    se (a < 9)
+        escreva "a < 9";
+    senao
+        escreva "a >= 9";
+    enquanto (a > 0)
+        a := a - 1;
+"""
+
+
+def make_dict_classes():
+    """Cópias dos nós de astcode sem __slots__, com um __dict__ por instância."""
+    classes = {}
+    for cls in _FIELDS:
+        namespace = {"__init__": cls.__init__}
+        classes[cls] = type(cls.__name__, (), namespace)
+    return classes
+
+
+def copy_tree(value, classes=None):
+    if isinstance(value, list):
+        return [copy_tree(item, classes) for item in value]
+    fields = _FIELDS.get(type(value))
+    if fields is None:
+        return value
+    cls = classes[type(value)] if classes else type(value)
+    return cls(*(copy_tree(getattr(value, field), classes) for field in fields))
+
+
+def walk_tree(node, fields_by_type=_FIELDS):
+    count = 0
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+            continue
+        fields = fields_by_type.get(type(value))
+        count += 1
+        if fields:
+            for field in fields:
+                stack.append(getattr(value, field))
+    return count
+
+
+def walk_flat(flat):
+    count = 0
+    kinds = flat.kinds
+    for _ in kinds:
+        count += 1
+    return count
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def analyze_and_generate(program):
+    SemanticAnalyzer().analyze_program(program)
+    PythonCodeGenerator().generate(program)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=2000, help="cópias do corpo de exemplo")
+    args = arg_parser.parse_args()
+
+    ast = compile_source("programa\n" + BODY * args.repeat + "fimprog\n").ast
+    dict_classes = make_dict_classes()
+    dict_fields = {dict_classes[cls]: fields for cls, fields in _FIELDS.items()}
+    dict_tree, dict_bytes = measure(lambda: copy_tree(ast, dict_classes))
+    slot_tree, slot_bytes = measure(lambda: copy_tree(ast))
+    flat, flat_bytes = measure(lambda: FlatAST.from_tree(ast))
+    nodes = len(flat)
+
+    print(f"{nodes} nós ({args.repeat} cópias do corpo)")
+    print(f"{'codificação':<14}{'bytes/nó':>10}{'percurso':>12}{'semântica+geração':>20}")
+    print(f"{'__dict__':<14}{dict_bytes / nodes:>10.1f}{timed(walk_tree, dict_tree, dict_fields) * 1000:>10.1f}ms"
+          f"{'-':>20}")
+    print(f"{'__slots__':<14}{slot_bytes / nodes:>10.1f}{timed(walk_tree, slot_tree) * 1000:>10.1f}ms"
+          f"{timed(analyze_and_generate, slot_tree) * 1000:>18.1f}ms")
+    print(f"{'FlatAST':<14}{flat_bytes / nodes:>10.1f}{timed(walk_flat, flat) * 1000:>10.1f}ms"
+          f"{timed(analyze_and_generate, flat) * 1000:>18.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Tempo de execução no backend Python (bytecode_backend) e no backend C (c_backend) para os mesmos programas.
+
+Os programas são os laços numéricos de benchmarks.loops e programas gerados por
+benchmarks.workload (sem 'enquanto', que pode não terminar). Os programas em que
+um dos backends falha (em C, por exemplo, um inteiro que passa de 64 bits) são
+contados e deixados de fora. O tempo do C inclui criar o processo; a compilação
+(gcc, sem o cache) aparece à parte.
+
+Uso: python -m benchmarks.c_backend [--iterations N] [--workloads K]
+"""
+import argparse
+import resource
+import signal
+import subprocess
+import tempfile
+import time
+
+import bytecode_backend
+import c_backend
+from compiler import CompilationError
+from benchmarks.loops import PROGRAMS
+from benchmarks.workload import generate_program
+
+MEMORY_LIMIT = 2 << 30  # bytes, para este processo e os programas compilados
+TIMEOUT = 10  # segundos por execução, em cada backend
+
+
+def interrupt(signum, frame):
+    raise TimeoutError("Tempo esgotado no backend Python.")
+
+
+def best_time(function, rounds):
+    """Menor tempo entre `rounds` execuções e o resultado da primeira."""
+    times, results = [], []
+    for _ in range(rounds):
+        results.append(function())
+        times.append(results[-1].elapsed)
+    return min(times), results[0].output
+
+
+def compare(name, source, stdin, cache, rounds, optimize):
+    """Linha da tabela para `source`, ou None se algum backend falhar."""
+    started = time.perf_counter()
+    try:
+        binary = cache.build(source, optimize)
+        build = time.perf_counter() - started
+        native, expected = best_time(lambda: c_backend.run(binary, stdin, timeout=TIMEOUT), rounds)
+        code = bytecode_backend.compile_to_code(source, optimize=optimize)
+        signal.alarm(TIMEOUT * rounds)
+        try:
+            interpreted, output = best_time(lambda: bytecode_backend.run(code, stdin), rounds)
+        finally:
+            signal.alarm(0)
+    except (CompilationError, c_backend.NativeError, subprocess.TimeoutExpired, TimeoutError, ArithmeticError,
+            EOFError, MemoryError):
+        return None
+    assert output == expected, f"{name}: saídas diferentes nos backends Python e C"
+    return (f"{name:<22}{interpreted * 1000:>10.1f}ms{native * 1000:>10.1f}ms"
+            f"{interpreted / native:>9.1f}x{build * 1000:>11.0f}ms")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=1000000)
+    arg_parser.add_argument("--workloads", type=int, default=30, help="programas gerados a tentar")
+    arg_parser.add_argument("--statements", type=int, default=100)
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1, 2), default=2)
+    args = arg_parser.parse_args()
+
+    # Alguns programas gerados concatenam textos que dobram de tamanho a cada volta do laço.
+    resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT, MEMORY_LIMIT))
+    signal.signal(signal.SIGALRM, interrupt)
+    side = int(args.iterations ** 0.5)
+    print(f"{'programa':<22}{'Python':>12}{'C':>12}{'ganho':>10}{'compilação':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = c_backend.BinaryCache(directory)
+        for name, template in PROGRAMS.items():
+            source = template.replace("{n}", str(args.iterations)).replace("{m}", str(side))
+            print(compare(name, source, "", cache, args.rounds, args.optimize) or f"{name:<22}falhou")
+        skipped = 0
+        for seed in range(args.workloads):
+            source = generate_program(args.statements, seed, mix={"enquanto": 0})
+            row = compare(f"gerado {seed}", source, "7\n" * 100000, cache, args.rounds, args.optimize)
+            if row is None:
+                skipped += 1
+            else:
+                print(row)
+        print(f"{skipped} de {args.workloads} programas gerados deixados de fora (erro em algum backend)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Mede o tempo de partida a frio: do início do processo até a primeira AST.
+
+Cada medição roda em um processo Python novo, para incluir o custo de importar
+o PLY e carregar (ou gerar) as tabelas LALR.
+
+Uso: python -m benchmarks.cold_start [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """
+programa
+    inteiro a;
+    a := 10;
+    enquanto (a > 0)
+        a := a - 1;
+    escreva a;
+fimprog
+"""
+
+# Cada alvo importa o ponto de entrada real e faz o primeiro parse com os objetos dele.
+TARGETS = {
+    "main.py": """
+import main
+from compiler import parse_source
+ast = parse_source(SAMPLE, lexer=main.create_lexer())
+""",
+    "interface-gráfica": """
+from importlib.machinery import SourceFileLoader
+gui = SourceFileLoader("interface_grafica", "interface-gráfica").load_module()
+ast = gui.IncrementalCompiler().parse(SAMPLE, lambda: False)
+""",
+    "tabelas geradas em memória": """
+import ply.yacc as yacc
+import parsercode
+from lexer import create_lexer
+p = yacc.yacc(module=parsercode, tabmodule="_sem_tabelas", write_tables=False, debug=False,
+              errorlog=yacc.NullLogger())
+ast = p.parse(SAMPLE, lexer=create_lexer())
+""",
+}
+
+SNIPPET = """
+import time
+t0 = time.perf_counter()
+SAMPLE = {sample!r}
+{body}
+assert ast is not None
+print(time.perf_counter() - t0)
+"""
+
+
+def run_target(body, runs):
+    """Executa o alvo em `runs` processos novos e devolve os tempos em segundos."""
+    code = SNIPPET.format(sample=SAMPLE, body=body)
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                             text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = arg_parser.parse_args()
+
+    results = {}
+    for name, body in TARGETS.items():
+        try:
+            times = run_target(body, args.runs)
+        except subprocess.CalledProcessError as e:
+            results[name] = {"erro": e.stderr.strip().splitlines()[-1]}
+            continue
+        results[name] = {"mediana_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000}
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    for name, r in results.items():
+        if "erro" in r:
+            print(f"{name:<28} erro: {r['erro']}")
+        else:
+            print(f"{name:<28} mediana {r['mediana_ms']:8.2f} ms   min {r['min_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compara a análise semântica + geração em dois percursos com o percurso único (fused).
+
+Uso: python -m benchmarks.dispatch [--repeat N] [--rounds N]
+"""
+import argparse
+import time
+
+from compiler import compile_source
+from flat_ast import FlatAST
+from semantic import SemanticAnalyzer
+from code_generator import PythonCodeGenerator
+from fused import FusedCodeGenerator
+
+BODY = """
+    inteiro a;
+    decimal b;
+    a := (10 + 2) * 3 - a / 2;
+    b := b * 2.5 + a;
+    escreva a + 1;
+    se (b < 9 + b)
+        escreva "a < 9";
+    senao
+        escreva a * 2;
+    enquanto (a > 0)
+        a := a - 1;
+    para (a := 0; a < 3; a := a + 1)
+        escreva a;
+"""
+
+
+def two_pass(ast):
+    SemanticAnalyzer().analyze_program(ast)
+    code_generator = PythonCodeGenerator()
+    code_generator.generate(ast)
+    return code_generator.get_code()
+
+
+def fused(ast):
+    code_generator = FusedCodeGenerator()
+    code_generator.generate(ast)
+    return code_generator.get_code()
+
+
+def best_of(fn, ast, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=2000, help="cópias do corpo de exemplo")
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    ast = compile_source("programa\n" + BODY * args.repeat + "fimprog\n").ast
+    flat = FlatAST.from_tree(ast)
+    assert two_pass(ast) == fused(ast)
+    nodes = len(flat)
+
+    print(f"{nodes} nós ({args.repeat} cópias do corpo), melhor de {args.rounds}")
+    for label, tree in (("árvore", ast), ("FlatAST", flat)):
+        for name, fn in (("dois percursos", two_pass), ("percurso único", fused)):
+            elapsed = best_of(fn, tree, args.rounds)
+            print(f"{label:<8} {name:<16} {elapsed * 1000:8.1f} ms  {nodes / elapsed / 1e6:6.2f} M nós/s")
+
+
+if __name__ == "__main__":
+    main()
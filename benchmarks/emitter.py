@@ -0,0 +1,47 @@
+"""Mede o custo da geração de código em função da profundidade de aninhamento.
+
+Cada programa tem a mesma quantidade de instruções 'se', agrupadas em cadeias
+de profundidade crescente. Com o emissor de buffer único o tempo por byte
+gerado deve se manter constante.
+
+Uso: python -m benchmarks.emitter [--statements N]
+"""
+import argparse
+import os
+import time
+
+from compiler import compile_source
+from code_generator import PythonCodeGenerator
+
+
+def nested_program(depth, statements):
+    chain = "    se (a < 1)\n" * depth + "    escreva a;\n"
+    return "programa\n    inteiro a;\n" + chain * (statements // depth) + "fimprog\n"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--statements", type=int, default=3200, help="total de instruções 'se'")
+    args = arg_parser.parse_args()
+
+    print(f"{'profundidade':>12}{'bytes':>12}{'memória':>12}{'ns/byte':>9}{'arquivo':>12}")
+    for depth in (1, 10, 100, 400, 1600):
+        ast = compile_source(nested_program(depth, args.statements)).ast
+
+        start = time.perf_counter()
+        code_generator = PythonCodeGenerator()
+        code_generator.generate(ast)
+        size = len(code_generator.get_code())
+        in_memory = time.perf_counter() - start
+
+        with open(os.devnull, "w") as sink:
+            start = time.perf_counter()
+            PythonCodeGenerator(sink=sink).generate(ast)
+            streamed = time.perf_counter() - start
+
+        print(f"{depth:>12}{size:>12}{in_memory * 1000:>10.1f}ms{in_memory / size * 1e9:>9.1f}"
+              f"{streamed * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
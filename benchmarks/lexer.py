@@ -0,0 +1,86 @@
+"""Vazão (tokens/s) do Scanner escrito à mão contra o lexer gerado pelo PLY.
+
+Antes de medir, confere que os dois produzem a mesma sequência de tokens (tipo,
+valor, linha e posição) e os mesmos diagnósticos, no programa gerado e em um
+texto com todos os operadores e caracteres ilegais. Também mede a análise
+sintática completa com cada um.
+
+Uso: python -m benchmarks.lexer [--statements N] [--seed S] [--rounds N]
+"""
+import argparse
+import time
+
+from benchmarks.workload import generate_program
+from compiler import collector_paused, parse_source
+from lexer import create_lexer
+
+# Operadores colados, números, textos, palavras reservadas como prefixo e caracteres ilegais.
+EDGE_CASES = """programa
+  inteiro senaox; decimal se1;  texto _t;
+  senaox:=1+2-3*4/5;se1:=1.25;x := 1. ;
+  se(a<b)se(a<=b)se(a>b)se(a>=b)se(a==b)se(a!=b) escreva "a<=b; 1.5";
+  @ a = b ! c : d $ "sem fim
+\ttexto\r\n é ç 12.x 007 ٣
+fimprog  \t """
+
+
+def tokenize(kind, source):
+    lexer = create_lexer(kind)
+    lexer.input(source)
+    tokens = [(t.type, t.value, type(t.value), t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+    return tokens, [str(d) for d in lexer.diagnostics], lexer.lineno, lexer.lexpos
+
+
+def check_identical(source, name):
+    expected = tokenize("ply", source)
+    actual = tokenize("scanner", source)
+    if actual != expected:
+        for index, (a, b) in enumerate(zip(actual[0], expected[0])):
+            if a != b:
+                raise SystemExit(f"{name}: token {index} difere: scanner {a}, PLY {b}")
+        raise SystemExit(f"{name}: tokens, diagnósticos ou posição final diferem")
+    return len(expected[0])
+
+
+def best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        with collector_paused():
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def lex_all(kind, source):
+    lexer = create_lexer(kind)
+    lexer.input(source)
+    for _ in iter(lexer.token, None):
+        pass
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--statements", type=int, default=50000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.statements, args.seed)
+    check_identical(EDGE_CASES, "casos de borda")
+    count = check_identical(source, "programa gerado")
+    print(f"{count} tokens, {len(source)} caracteres; mesmas sequências de tokens; melhor de {args.rounds}")
+
+    results = {}
+    for kind in ("ply", "scanner"):
+        lex_time = best_of(lambda: lex_all(kind, source), args.rounds)
+        parse_time = best_of(lambda: parse_source(source, create_lexer(kind)), args.rounds)
+        results[kind] = lex_time, parse_time
+        print(f"{kind:<10}{count / lex_time / 1e6:8.2f} M tokens/s   léxica {lex_time * 1000:8.1f} ms"
+              f"   léxica + sintática {parse_time * 1000:8.1f} ms")
+    (ply_lex, ply_parse), (lex_time, parse_time) = results["ply"], results["scanner"]
+    print(f"scanner: léxica {ply_lex / lex_time:.2f}x, léxica + sintática {ply_parse / parse_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Tempo de execução de programas com laços, com e sem a conversão em laços contados.
+
+Uso: python -m benchmarks.loops [--iterations N]
+"""
+import argparse
+
+from bytecode_backend import compile_program, run
+from compiler import parse_source
+from semantic import SemanticAnalyzer
+from optimizer import Optimizer
+from loops import LoopLowering
+
+PROGRAMS = {
+    "para somando": """
+programa
+    inteiro i;
+    inteiro s;
+    s := 0;
+    para (i := 0; i < {n}; i := i + 1)
+        s := s + i;
+    escreva s;
+fimprog
+""",
+    "para aninhado": """
+programa
+    inteiro i;
+    inteiro j;
+    inteiro n;
+    inteiro s;
+    n := {m};
+    para (i := 1; i <= n; i := i + 1)
+        para (j := n; j > 0; j := j - 2)
+            s := s + i * j;
+    escreva s;
+fimprog
+""",
+    "para com se": """
+programa
+    inteiro i;
+    inteiro pares;
+    para (i := {n}; i >= 1; i := i - 1)
+        se (i / 2 * 2 == i)
+            pares := pares + 1;
+    escreva pares;
+fimprog
+""",
+    "enquanto contador": """
+programa
+    inteiro i;
+    i := 0;
+    enquanto (i < {n})
+        i := i + 3;
+    escreva i;
+fimprog
+""",
+}
+
+
+def compile_with(source, lower):
+    program = parse_source(source)
+    SemanticAnalyzer().analyze_program(program)
+    program = Optimizer(1).optimize(program)
+    if lower:
+        program = LoopLowering().lower(program)
+    return compile_program(program)
+
+
+def best_run(code, rounds):
+    results = [run(code) for _ in range(rounds)]
+    return min(r.elapsed for r in results), results[0].output.strip()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=500000)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    side = int(args.iterations ** 0.5)
+    print(f"{'programa':<20}{'while':>12}{'range()':>12}{'ganho':>9}")
+    for name, template in PROGRAMS.items():
+        source = template.replace("{n}", str(args.iterations)).replace("{m}", str(side))
+        times = []
+        outputs = set()
+        for lower in (False, True):
+            elapsed, output = best_run(compile_with(source, lower), args.rounds)
+            times.append(elapsed)
+            outputs.add(output)
+        assert len(outputs) == 1, f"saídas diferentes com e sem a conversão: {outputs}"
+        print(f"{name:<20}" + "".join(f"{t * 1000:>10.1f}ms" for t in times)
+              + f"{times[0] / times[1]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
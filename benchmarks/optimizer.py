@@ -0,0 +1,76 @@
+"""Tempo de execução dos programas gerados em cada nível de otimização.
+
+Uso: python -m benchmarks.optimizer [--iterations N]
+"""
+import argparse
+
+from bytecode_backend import compile_to_code, run
+
+PROGRAMS = {
+    "constantes no laço": """
+programa
+    inteiro i;
+    inteiro k;
+    k := 4;
+    i := 0;
+    enquanto (i < {n} * 1)
+        i := i + (k * 2 - k) / k + 60 / (k * 15) - 1;
+    escreva i;
+fimprog
+""",
+    "ramo morto no laço": """
+programa
+    inteiro i;
+    inteiro modo;
+    modo := 3;
+    i := 0;
+    enquanto (i < {n})
+        se (modo > 2)
+            i := i + 1;
+        senao
+            i := i + modo * 2;
+    escreva i;
+fimprog
+""",
+    "decimal constante": """
+programa
+    decimal x;
+    decimal passo;
+    passo := 1 / 4 + 0.75;
+    x := 0;
+    enquanto (x < {n}.0)
+        x := x + passo * 2 - 1;
+    escreva x;
+fimprog
+""",
+}
+
+
+def best_run(code, rounds):
+    results = [run(code) for _ in range(rounds)]
+    return min(r.elapsed for r in results), results[0].output.strip()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=500000)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    levels = (0, 1, 2)
+    print(f"{'programa':<22}" + "".join(f"{f'-O{level}':>12}" for level in levels) + f"{'ganho':>9}")
+    for name, template in PROGRAMS.items():
+        source = template.replace("{n}", str(args.iterations))
+        times = []
+        outputs = set()
+        for level in levels:
+            elapsed, output = best_run(compile_to_code(source, optimize=level), args.rounds)
+            times.append(elapsed)
+            outputs.add(output)
+        assert len(outputs) == 1, f"saídas diferentes entre os níveis: {outputs}"
+        print(f"{name:<22}" + "".join(f"{t * 1000:>10.1f}ms" for t in times)
+              + f"{times[0] / times[-1]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Análise semântica com busca de nomes na pilha de escopos e com símbolos do Resolver.
+
+O programa gerado aninha `--depth` escopos, cada um declarando uma variável, e o
+escopo mais interno usa todas elas e mais `--globals` variáveis globais; o bloco
+inteiro se repete `--repeat` vezes. Sem o Resolver, cada uso percorre a pilha de
+escopos até achar o nome; com ele, a busca é feita uma vez e as análises
+seguintes leem o símbolo.
+
+Uso: python -m benchmarks.resolver [--depth N] [--globals N] [--repeat N]
+"""
+import argparse
+import time
+
+from compiler import parse_source
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+
+
+def build_source(depth, globals_count, repeat):
+    names = [f"g{i}" for i in range(globals_count)] + [f"w{k}" for k in range(depth)]
+    lines = ["programa"]
+    lines += [f"    inteiro g{i};" for i in range(globals_count)]
+    for _ in range(repeat):
+        # 'então' e 'senão' compartilham o escopo: w{k} é visível em todo o aninhamento abaixo.
+        for k in range(depth):
+            lines.append(f"    se (g0 < 1) inteiro w{k}; senao")
+        lines.append("        escreva " + " + ".join(names) + ";")
+    lines.append("fimprog")
+    return "\n".join(lines)
+
+
+def best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--depth", type=int, default=150)
+    arg_parser.add_argument("--globals", type=int, default=150)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    source = build_source(args.depth, args.globals, args.repeat)
+    unresolved = parse_source(source)
+    resolved = parse_source(source)
+    Resolver().resolve(resolved)
+
+    uses = args.repeat * (args.depth + args.globals + args.depth)
+    scan = best_of(lambda: SemanticAnalyzer().analyze_program(unresolved), args.rounds)
+    resolve = best_of(lambda: Resolver().resolve(resolved), args.rounds)
+    analyze = best_of(lambda: SemanticAnalyzer().analyze_program(resolved), args.rounds)
+
+    print(f"{uses} usos de variáveis, {args.depth} escopos aninhados, melhor de {args.rounds}")
+    print(f"pilha de escopos            {scan * 1000:8.1f} ms")
+    print(f"Resolver                    {resolve * 1000:8.1f} ms")
+    print(f"análise com símbolos        {analyze * 1000:8.1f} ms")
+    print(f"Resolver + análise          {(resolve + analyze) * 1000:8.1f} ms"
+          f"   ({scan / (resolve + analyze):.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
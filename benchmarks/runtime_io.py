@@ -0,0 +1,118 @@
+"""Tempo de 'leia' e 'escreva' no backend Python com o runtime em blocos (runtime.py) e com input()/print() a cada valor.
+
+Os programas fazem N leituras, N escritas, ou as duas coisas em sequência. A
+execução antiga chamava print() e input(), redirecionados para io.StringIO, a
+cada valor; ela é refeita aqui trocando leia/escreva/fimprog no namespace do
+mesmo objeto de código. Cada forma roda com a entrada e a saída em memória e em
+arquivos de verdade (entrada em disco, saída em /dev/null).
+
+Uso: python -m benchmarks.runtime_io [--values N]
+"""
+import argparse
+import builtins
+import io
+import os
+import tempfile
+import time
+
+import bytecode_backend
+import runtime
+
+PROGRAMS = {
+    "escreva": """
+programa
+    inteiro i;
+    para (i := 0; i < {n}; i := i + 1) escreva i;
+fimprog
+""",
+    "escreva decimal": """
+programa
+    inteiro i;
+    para (i := 0; i < {n}; i := i + 1) escreva i * 0.5;
+fimprog
+""",
+    "leia": """
+programa
+    inteiro i;
+    inteiro x;
+    para (i := 0; i < {n}; i := i + 1) leia x;
+fimprog
+""",
+    "leia texto": """
+programa
+    inteiro i;
+    texto t;
+    para (i := 0; i < {n}; i := i + 1) leia t;
+fimprog
+""",
+    "leia e escreva": """
+programa
+    inteiro i;
+    inteiro x;
+    para (i := 0; i < {n}; i := i + 1) leia x;
+    para (i := 0; i < {n}; i := i + 1) escreva x;
+fimprog
+""",
+}
+
+
+def unbuffered_namespace(stdin, stdout):
+    """O namespace da execução antiga: uma chamada a print() e outra a readline() por valor."""
+    def leia():
+        line = stdin.readline()
+        if not line:
+            raise EOFError(runtime.END_OF_INPUT)
+        return line.rstrip("\n")
+
+    def escreva(value):
+        print(value, file=stdout)
+
+    return {"leia": leia, "escreva": escreva, "fimprog": stdout.flush}
+
+
+def buffered_namespace(stdin, stdout):
+    return runtime.namespace(runtime.Input(stdin), runtime.Output(stdout))
+
+
+def execute(code, make_namespace, stdin, stdout):
+    namespace = {"__builtins__": builtins, **make_namespace(stdin, stdout)}
+    started = time.perf_counter()
+    exec(code, namespace)
+    return time.perf_counter() - started
+
+
+def measure(code, make_namespace, text, path, rounds):
+    """Menores tempos em memória e em arquivos, e a saída da execução em memória."""
+    in_memory, in_files = [], []
+    for _ in range(rounds):
+        stdout = io.StringIO()
+        in_memory.append(execute(code, make_namespace, io.StringIO(text), stdout))
+        with open(path, encoding="utf-8") as stdin, open(os.devnull, "w", encoding="utf-8") as devnull:
+            in_files.append(execute(code, make_namespace, stdin, devnull))
+    return min(in_memory), min(in_files), stdout.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--values", type=int, default=1000000, help="valores lidos ou escritos por programa")
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1, 2), default=2)
+    args = arg_parser.parse_args()
+
+    text = "".join(f"{value % 1000}\n" for value in range(args.values))
+    print(f"{'programa':<16}{'antes':>11}{'runtime':>11}{'ganho':>8}{'antes (arq.)':>15}{'runtime (arq.)':>16}{'ganho':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "entrada.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        for name, template in PROGRAMS.items():
+            code = bytecode_backend.compile_to_code(template.replace("{n}", str(args.values)), optimize=args.optimize)
+            old_memory, old_files, expected = measure(code, unbuffered_namespace, text, path, args.rounds)
+            new_memory, new_files, output = measure(code, buffered_namespace, text, path, args.rounds)
+            assert output == expected, f"{name}: saídas diferentes"
+            print(f"{name:<16}{old_memory * 1000:>9.0f}ms{new_memory * 1000:>9.0f}ms{old_memory / new_memory:>7.1f}x"
+                  f"{old_files * 1000:>13.0f}ms{new_files * 1000:>14.0f}ms{old_files / new_files:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
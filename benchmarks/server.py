@@ -0,0 +1,120 @@
+"""Mede a latência do servidor de compilação (server.py) contra um processo novo por compilação.
+
+Os pedidos são enviados um de cada vez, esperando a resposta, pelo socket Unix e
+pela entrada padrão. "variado" muda o programa a cada pedido (sem acerto de cache);
+"repetido" envia sempre o mesmo.
+
+Uso: python -m benchmarks.server [--requests N] [--statements N] [--runs N]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.workload import generate_program
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sources(statements, count):
+    return [generate_program(statements, seed, 3, 1) for seed in range(count)]
+
+
+def timed_requests(send, programs):
+    """Envia cada programa e devolve as latências em segundos."""
+    times = []
+    for index, source in enumerate(programs):
+        line = json.dumps({"id": index, "method": "compile", "source": source}).encode("utf-8") + b"\n"
+        start = time.perf_counter()
+        response = json.loads(send(line))
+        times.append(time.perf_counter() - start)
+        if not response["ok"]:
+            raise RuntimeError(f"falha na compilação: {response}")
+    return times
+
+
+def over_socket(programs_by_case):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "compilador.sock")
+        server = subprocess.Popen([sys.executable, "server.py", "--socket", path, "-j", "1"], cwd=ROOT,
+                                  stderr=subprocess.PIPE, text=True)
+        try:
+            server.stderr.readline()  # "Servidor de compilação em ..."
+            client = socket.socket(socket.AF_UNIX)
+            client.connect(path)
+            stream = client.makefile("rwb")
+
+            def send(line):
+                stream.write(line)
+                stream.flush()
+                return stream.readline()
+
+            results = {case: timed_requests(send, programs) for case, programs in programs_by_case.items()}
+            send(b'{"method": "shutdown"}\n')
+            client.close()
+        finally:
+            server.wait(timeout=10)
+    return results
+
+
+def over_stdio(programs_by_case):
+    server = subprocess.Popen([sys.executable, "server.py", "-j", "1"], cwd=ROOT,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def send(line):
+        server.stdin.write(line)
+        server.stdin.flush()
+        return server.stdout.readline()
+
+    try:
+        return {case: timed_requests(send, programs) for case, programs in programs_by_case.items()}
+    finally:
+        server.stdin.close()
+        server.wait(timeout=10)
+
+
+def cold_processes(source, runs):
+    """Uma compilação por processo, como fazem os scripts que chamam main.py."""
+    with tempfile.NamedTemporaryFile("w", suffix=".prog", delete=False, encoding="utf-8") as f:
+        f.write(source)
+    try:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "main.py", f.name], cwd=ROOT, check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+        return times
+    finally:
+        os.remove(f.name)
+
+
+def report(name, times):
+    times = sorted(times)
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f"{name:<28}{statistics.median(times) * 1000:>10.3f}{p99 * 1000:>10.3f}{len(times):>8}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--requests", type=int, default=500, help="pedidos por caso")
+    arg_parser.add_argument("--statements", type=int, default=20, help="instruções de cada programa")
+    arg_parser.add_argument("--runs", type=int, default=10, help="processos novos medidos")
+    args = arg_parser.parse_args()
+
+    varied = sources(args.statements, args.requests)
+    cases = {"variado": varied, "repetido": [varied[0]] * args.requests}
+
+    print(f"{'':<28}{'mediana ms':>10}{'p99 ms':>10}{'pedidos':>8}")
+    for transport, measure in (("socket", over_socket), ("entrada padrão", over_stdio)):
+        for case, times in measure(cases).items():
+            report(f"{transport}, {case}", times)
+    report("processo novo (main.py)", cold_processes(varied[0], args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Memória e tempo de compilação com e sem o compartilhamento de expressões (sharing.py) em entradas repetitivas.
+
+O programa repetitivo atribui e escreve, muitas vezes, um pequeno conjunto de
+expressões, como um código gerado por máquina; o programa de benchmarks.workload,
+com expressões aleatórias, mostra o custo quando quase nada se repete. Para cada
+um: nós de expressão (ocorrências e objetos distintos), memória retida pela AST,
+pico de memória da compilação, tempo de compilação e instruções da IR.
+
+Uso: python -m benchmarks.sharing [--statements N] [--distinct K] [--depth D]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from astcode import OPERATOR_NODES, VariableNode
+from compiler import compile_source, parse_source
+from metrics import CHILD_FIELDS
+from sharing import ExpressionInterner
+from benchmarks.workload import generate_program
+
+VARIABLES = [f"v{index}" for index in range(8)]
+EMPTY_PROGRAM = "programa\n    inteiro r;\nfimprog\n"
+
+
+def repetitive_program(statements, distinct, depth, seed=0):
+    """`statements` instruções com `distinct` expressões de profundidade `depth`, escolhidas ao acaso."""
+    rng = random.Random(seed)
+
+    def expression(level):
+        if level == 0:
+            return rng.choice(VARIABLES + ["1", "2", "3"])
+        return f"({expression(level - 1)} {rng.choice('+-*')} {expression(level - 1)})"
+
+    expressions = [expression(depth) for _ in range(distinct)]
+    lines = ["programa"] + [f"    inteiro {name};" for name in VARIABLES + ["r"]]
+    lines += [f"    {name} := {index + 1};" for index, name in enumerate(VARIABLES)]
+    for index in range(statements):
+        if index % 4 == 3:
+            lines.append(f"    escreva {rng.choice(expressions)};")
+        else:
+            lines.append(f"    r := {rng.choice(expressions)};")
+    lines.append("fimprog")
+    return "\n".join(lines) + "\n"
+
+
+def count_expressions(program):
+    """Ocorrências de nós de expressão na árvore e quantos objetos distintos elas são."""
+    occurrences, distinct = 0, set()
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if isinstance(node, OPERATOR_NODES) or type(node) is VariableNode:
+            occurrences += 1
+            distinct.add(id(node))
+        for field in CHILD_FIELDS[type(node)]:
+            stack.append(getattr(node, field))
+    return occurrences, len(distinct)
+
+
+def release_parser():
+    """O parser do PLY guarda a última árvore até a análise seguinte; uma análise mínima a libera."""
+    parse_source(EMPTY_PROGRAM)
+    gc.collect()
+
+
+def measure(source, share, rounds, optimize):
+    """Linha da tabela para `source` compilado com ou sem o compartilhamento."""
+    release_parser()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ast = parse_source(source, interner=ExpressionInterner() if share else None)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    occurrences, distinct = count_expressions(ast)
+    del ast
+    release_parser()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = compile_source(source, optimize=optimize, share_expressions=share)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    instructions = sum(len(block.instructions) for block in result.ir.blocks)
+    del result
+
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        compile_source(source, optimize=optimize, share_expressions=share)
+        times.append(time.perf_counter() - started)
+    return (f"{'sim' if share else 'não':>5}{occurrences:>12}{distinct:>10}{retained / 1024:>11.0f}K"
+            f"{peak / 1024:>11.0f}K{min(times) * 1000:>11.1f}ms{instructions:>10}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--statements", type=int, default=20000)
+    arg_parser.add_argument("--distinct", type=int, default=50, help="expressões distintas no programa repetitivo")
+    arg_parser.add_argument("--depth", type=int, default=4, help="profundidade das expressões")
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1, 2), default=0)
+    args = arg_parser.parse_args()
+
+    programs = {
+        "repetitivo": repetitive_program(args.statements, args.distinct, args.depth),
+        "workload": generate_program(args.statements, seed=0),
+    }
+    print(f"{'programa':<12}{'comp.':>5}{'ocorrências':>12}{'objetos':>10}{'AST':>12}{'pico':>12}"
+          f"{'tempo':>13}{'IR':>10}")
+    for name, source in programs.items():
+        for share in (False, True):
+            print(f"{name:<12}" + measure(source, share, args.rounds, args.optimize))
+
+
+if __name__ == "__main__":
+    main()
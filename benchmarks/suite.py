@@ -0,0 +1,122 @@
+"""Vazão de cada fase do compilador em programas sintéticos, com comparação contra uma linha de base.
+
+Para cada tamanho, um programa é gerado por `benchmarks.workload` (mesma semente,
+mesmo programa) e compilado `--rounds` vezes com `metrics.CompilationMetrics`;
+vale o melhor tempo de cada fase. Com `--save-baseline` os tempos são gravados
+em `--baseline`; nas execuções seguintes, fases mais lentas que a linha de base
+além de `--threshold` são marcadas como regressão e o processo termina com código 1.
+
+Uso: python -m benchmarks.suite [--sizes 1000 10000 100000 1000000] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+
+from benchmarks.workload import generate_program
+from compiler import compile_source
+from metrics import CompilationMetrics
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "suite.json")
+
+
+def measure(source, rounds, optimize):
+    """Melhor tempo de cada fase (e do total) em `rounds` compilações, mais os contadores."""
+    best = {}
+    counters = {}
+    for _ in range(rounds):
+        metrics = CompilationMetrics(track_allocations=False)
+        compile_source(source, optimize=optimize, metrics=metrics)
+        data = metrics.to_dict()
+        counters = data["counters"]
+        times = {name: phase["seconds"] for name, phase in data["phases"].items()}
+        times["total"] = data["total_seconds"]
+        for name, seconds in times.items():
+            best[name] = min(best.get(name, seconds), seconds)
+    return best, counters
+
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                            help="instruções de cada programa (padrão 1000 10000; para medir a escala, "
+                                 "use 1000 10000 100000 1000000)")
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--expression-depth", type=int, default=3)
+    arg_parser.add_argument("--nesting", type=int, default=2)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1, 2), default=0)
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    arg_parser.add_argument("--save-baseline", action="store_true", help="grava os tempos como nova linha de base")
+    arg_parser.add_argument("--threshold", type=float, default=0.15,
+                            help="piora relativa tolerada antes de acusar regressão (padrão 0.15 = 15%%)")
+    arg_parser.add_argument("--json", action="store_true", help="imprime os resultados em JSON")
+    args = arg_parser.parse_args()
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("environment") != environment():
+            print(f"Aviso: linha de base gravada em outro ambiente ({stored.get('environment')}).", file=sys.stderr)
+        if stored.get("settings") != settings(args):
+            print("Aviso: linha de base gravada com outros parâmetros; comparação ignorada.", file=sys.stderr)
+        else:
+            baseline = stored["results"]
+
+    results = {}
+    regressions = []
+    for size in args.sizes:
+        source = generate_program(size, args.seed, args.expression_depth, args.nesting)
+        times, counters = measure(source, args.rounds, args.optimize)
+        results[str(size)] = {"seconds": times, "counters": counters}
+        base = baseline.get(str(size), {}).get("seconds", {})
+
+        if not args.json:
+            print(f"\n{size} instruções, {counters['tokens']} tokens, {counters['ast_nodes']} nós "
+                  f"(melhor de {args.rounds})")
+            print(f"{'fase':<10}{'tempo':>12}{'instr/s':>14}{'tokens/s':>14}{'base':>12}{'variação':>10}")
+        for phase, seconds in times.items():
+            previous = base.get(phase)
+            change = seconds / previous - 1 if previous else None
+            regressed = change is not None and change > args.threshold
+            if regressed:
+                regressions.append((size, phase, change))
+            if args.json:
+                continue
+            rate = size / seconds if seconds else float("inf")
+            token_rate = counters["tokens"] / seconds if seconds else float("inf")
+            base_text = f"{previous * 1000:.1f}ms" if previous else "-"
+            change_text = f"{change:+.1%}" if change is not None else "-"
+            print(f"{phase:<10}{seconds * 1000:>10.1f}ms{rate:>14,.0f}{token_rate:>14,.0f}"
+                  f"{base_text:>12}{change_text:>10}" + ("  REGRESSÃO" if regressed else ""))
+
+    if args.json:
+        print(json.dumps({"environment": environment(), "settings": settings(args), "results": results,
+                          "regressions": [{"size": s, "phase": p, "change": c} for s, p, c in regressions]},
+                         indent=2, ensure_ascii=False))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "settings": settings(args), "results": results}, f, indent=2)
+        print(f"\nLinha de base gravada em {args.baseline}", file=sys.stderr)
+    elif regressions:
+        print(f"\n{len(regressions)} fase(s) mais lentas que a linha de base além de {args.threshold:.0%}.",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+def settings(args):
+    """Parâmetros que precisam coincidir para que a comparação com a linha de base faça sentido."""
+    return {"seed": args.seed, "expression_depth": args.expression_depth, "nesting": args.nesting,
+            "optimize": args.optimize}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Mede o efeito da geração especializada por tipos no tempo de execução do programa gerado.
+
+O mesmo programa é traduzido pelo backend de bytecode com a AST anotada pelo
+analisador semântico (especializado) e sem anotações (genérico), e os dois
+objetos de código são executados no próprio processo.
+
+Uso: python -m benchmarks.typed_codegen [--iterations N]
+"""
+import argparse
+
+from bytecode_backend import compile_program, run
+from compiler import parse_source
+from semantic import SemanticAnalyzer
+
+PROGRAMS = {
+    "soma decimal": """
+programa
+    decimal s;
+    s := 0;
+    enquanto (s < {n}.0)
+        s := s + 1;
+    escreva s;
+fimprog
+""",
+    "divisão inteira": """
+programa
+    inteiro i;
+    i := 0;
+    enquanto (i < {n})
+        i := i + 6 / 2;
+    escreva i;
+fimprog
+""",
+    "leitura inteira": """
+programa
+    inteiro i;
+    leia i;
+    enquanto (i < {n})
+        i := i + 1;
+    escreva i;
+fimprog
+""",
+}
+
+
+def best_run(code, rounds):
+    results = [run(code, stdin="0\n") for _ in range(rounds)]
+    return min(r.elapsed for r in results), results[0].output.strip()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=1000000)
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'programa':<18}{'genérico':>12}{'especializado':>16}{'ganho':>8}")
+    for name, template in PROGRAMS.items():
+        source = template.replace("{n}", str(args.iterations))
+        generic = compile_program(parse_source(source))
+        program = parse_source(source)
+        SemanticAnalyzer().analyze_program(program)
+        specialized = compile_program(program)
+
+        try:
+            generic_time, generic_out = best_run(generic, args.rounds)
+        except TypeError as e:
+            # Sem conversão em 'leia', o valor lido continua texto e a aritmética falha.
+            print(f"{name:<18}{'falhou':>12}   ({e})")
+            continue
+        specialized_time, specialized_out = best_run(specialized, args.rounds)
+        print(f"{name:<18}{generic_time * 1000:>10.1f}ms{specialized_time * 1000:>14.1f}ms"
+              f"{generic_time / specialized_time:>7.2f}x   ({generic_out} / {specialized_out})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Tempo de execução dos programas com laços na máquina virtual, comparado a um interpretador que percorre a AST.
+
+O interpretador de referência é o mais direto possível: recursivo, com uma
+cadeia de isinstance() por nó e as variáveis em um dicionário pelo nome. A
+máquina virtual roda o bytecode de -O0 e o de -O2 (laços contados e IR otimizada).
+
+Uso: python -m benchmarks.vm [--iterations N]
+"""
+import argparse
+import operator
+import time
+
+from astcode import (DeclarationNode, AssignmentNode, BinaryOpNode, VariableNode, IfNode, WhileNode, WriteNode,
+                     ReadNode, ForNode, ComparisonNode)
+from bytecode_backend import DEFAULT_VALUES
+from compiler import parse_source
+from semantic import SemanticAnalyzer
+from benchmarks.loops import PROGRAMS
+import vm
+
+OPERATORS = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv,
+             "<": operator.lt, ">": operator.gt, "<=": operator.le, ">=": operator.ge,
+             "==": operator.eq, "!=": operator.ne}
+
+
+class TreeWalker:
+    """Interpretador recursivo sobre a AST analisada, só para comparação."""
+    def __init__(self, stdin=""):
+        self.variables = {}
+        self.output = []
+        self.lines = iter(stdin.splitlines())
+
+    def run(self, program):
+        self.execute_all(program.statements)
+        return "".join(f"{value}\n" for value in self.output)
+
+    def execute_all(self, statements):
+        for statement in statements if isinstance(statements, list) else [statements]:
+            self.execute(statement)
+
+    def execute(self, node):
+        if isinstance(node, DeclarationNode):
+            self.variables[node.var_name] = DEFAULT_VALUES[node.var_type]
+        elif isinstance(node, AssignmentNode):
+            value = self.evaluate(node.expression)
+            if node.resolved_type == "decimal":
+                value = float(value)
+            self.variables[node.var_name] = value
+        elif isinstance(node, WriteNode):
+            self.output.append(self.evaluate(node.expression))
+        elif isinstance(node, ReadNode):
+            conversion = {"inteiro": int, "decimal": float}.get(node.resolved_type, str)
+            self.variables[node.var_name] = conversion(next(self.lines))
+        elif isinstance(node, IfNode):
+            if self.evaluate(node.condition):
+                self.execute_all(node.then_branch)
+            elif node.else_branch:
+                self.execute_all(node.else_branch)
+        elif isinstance(node, WhileNode):
+            while self.evaluate(node.condition):
+                self.execute_all(node.body)
+        elif isinstance(node, ForNode):
+            self.execute(node.init)
+            while self.evaluate(node.condition):
+                self.execute_all(node.body)
+                self.execute(node.update)
+        else:
+            raise TypeError(f"Nó não suportado: {type(node).__name__}")
+
+    def evaluate(self, node):
+        if isinstance(node, (int, float, str)):
+            return node
+        if isinstance(node, VariableNode):
+            return self.variables[node.var_name]
+        if isinstance(node, (BinaryOpNode, ComparisonNode)):
+            left, right = self.evaluate(node.left), self.evaluate(node.right)
+            if node.operator == "/" and node.resolved_type == "inteiro":
+                return left // right
+            return OPERATORS[node.operator](left, right)
+        raise TypeError(f"Expressão não suportada: {type(node).__name__}")
+
+
+def best_time(function, rounds):
+    """Menor tempo entre `rounds` execuções e o resultado da primeira."""
+    times, results = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        results.append(function())
+        times.append(time.perf_counter() - started)
+    return min(times), results[0]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=200000)
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    side = int(args.iterations ** 0.5)
+    print(f"{'programa':<20}{'árvore':>12}{'vm -O0':>12}{'vm -O2':>12}{'ganho -O0':>11}{'instr/s -O0':>14}")
+    for name, template in PROGRAMS.items():
+        source = template.replace("{n}", str(args.iterations)).replace("{m}", str(side))
+        program = parse_source(source)
+        SemanticAnalyzer().analyze_program(program)
+        walked, expected = best_time(lambda: TreeWalker().run(program), args.rounds)
+        times, steps = [walked], []
+        for level in (0, 2):
+            bytecode = vm.compile_to_bytecode(source, level)
+            elapsed, result = best_time(lambda: vm.run(bytecode), args.rounds)
+            assert result.output == expected, f"{name}: saída da vm difere do interpretador da AST"
+            times.append(elapsed)
+            steps.append(result.steps)
+        # O ganho compara o mesmo programa: em -O2, o laço pode nem existir mais.
+        print(f"{name:<20}" + "".join(f"{t * 1000:>10.1f}ms" for t in times)
+              + f"{walked / times[1]:>10.2f}x{steps[0] / times[1]:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Gerador de programas sintéticos válidos (que passam pela análise semântica).
+
+A mesma semente gera sempre o mesmo programa. O tamanho é controlado pelo número
+de instruções, pela profundidade das expressões, pelo aninhamento de
+'se'/'enquanto'/'para' e pelos pesos de cada tipo de instrução.
+
+Uma atribuição a 'texto' copia uma variável ou concatena só constantes: dentro
+de um laço, nenhum texto cresce a cada volta.
+
+Uso: python -m benchmarks.workload [--statements N] [--seed S] > programa.prog
+"""
+import argparse
+import random
+
+TYPES = ("inteiro", "decimal", "texto")
+
+DEFAULT_MIX = {
+    "declaracao": 1,
+    "atribuicao": 6,
+    "escreva": 2,
+    "leia": 1,
+    "se": 2,
+    "enquanto": 1,
+    "para": 1,
+}
+
+ARITHMETIC = ("+", "-", "*", "/")
+COMPARISONS = ("<", ">", "<=", ">=", "==", "!=")
+
+
+class WorkloadGenerator:
+    """Gera o texto de um programa com `statements` instruções (contando as aninhadas)."""
+    def __init__(self, seed=0, expression_depth=3, nesting=2, mix=None):
+        self.random = random.Random(seed)
+        self.expression_depth = expression_depth
+        self.nesting = nesting
+        mix = {**DEFAULT_MIX, **(mix or {})}
+        self.kinds = [kind for kind, weight in mix.items() if weight > 0]
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.variables = {var_type: [] for var_type in TYPES}
+        self.count = 0
+
+    def generate(self, statements):
+        lines = ["programa"]
+        # Uma variável de cada tipo desde o início, para que toda expressão tenha operandos.
+        for var_type in TYPES:
+            lines.append("    " + self.declaration(var_type))
+        self.count = len(TYPES)
+        while self.count < statements:
+            lines.append("    " + self.statement(0, statements))
+        lines.append("fimprog")
+        return "\n".join(lines) + "\n"
+
+    def statement(self, level, budget):
+        self.count += 1
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        nested = level < self.nesting and self.count < budget
+        if kind == "declaracao" and level == 0:
+            return self.declaration(self.random.choice(TYPES))
+        if kind == "leia":
+            return f"leia {self.variable(self.random.choice(TYPES))};"
+        if kind == "escreva":
+            return f"escreva {self.expression(self.random.choice(TYPES), self.expression_depth)};"
+        if kind == "se" and nested:
+            text = f"se ({self.condition()}) {self.statement(level + 1, budget)}"
+            if self.random.random() < 0.5 and self.count < budget:
+                text += f" senao {self.statement(level + 1, budget)}"
+            return text
+        if kind == "enquanto" and nested:
+            return f"enquanto ({self.condition()}) {self.statement(level + 1, budget)}"
+        if kind == "para" and nested:
+            counter = self.variable("inteiro")
+            return (f"para ({counter} := 0; {counter} < {self.random.randint(1, 100)}; "
+                    f"{counter} := {counter} + 1) {self.statement(level + 1, budget)}")
+        var_type = self.random.choice(TYPES)
+        if var_type == "texto":
+            return f"{self.variable(var_type)} := {self.text_value(self.expression_depth)};"
+        return f"{self.variable(var_type)} := {self.expression(var_type, self.expression_depth)};"
+
+    def declaration(self, var_type):
+        name = f"{var_type[0]}{len(self.variables[var_type])}"
+        self.variables[var_type].append(name)
+        return f"{var_type} {name};"
+
+    def variable(self, var_type):
+        return self.random.choice(self.variables[var_type])
+
+    def condition(self):
+        var_type = self.random.choice(("inteiro", "decimal"))
+        operator = self.random.choice(COMPARISONS)
+        depth = max(self.expression_depth - 1, 0)
+        return f"{self.expression(var_type, depth)} {operator} {self.expression(var_type, depth)}"
+
+    def expression(self, var_type, depth):
+        if depth <= 0 or self.random.random() < 0.3:
+            return self.operand(var_type)
+        if var_type == "texto":
+            return f"{self.expression('texto', depth - 1)} + {self.operand('texto')}"
+        operator = self.random.choice(ARITHMETIC)
+        left = self.expression(var_type, depth - 1)
+        if operator == "/":
+            # Divisor constante e diferente de zero.
+            right = str(self.random.randint(1, 9)) + (".0" if var_type == "decimal" else "")
+        else:
+            right = self.expression(var_type, depth - 1)
+        if self.random.random() < 0.3:
+            return f"({left} {operator} {right})"
+        return f"{left} {operator} {right}"
+
+    def text_value(self, depth):
+        """Valor atribuído a um 'texto': uma variável ou uma concatenação de constantes."""
+        if self.random.random() < 0.3:
+            return self.variable("texto")
+        return " + ".join(self.literal("texto") for _ in range(self.random.randint(1, depth + 1)))
+
+    def operand(self, var_type):
+        if self.random.random() < 0.5:
+            return self.variable(var_type)
+        return self.literal(var_type)
+
+    def literal(self, var_type):
+        if var_type == "inteiro":
+            return str(self.random.randint(0, 1000))
+        if var_type == "decimal":
+            return f"{self.random.randint(0, 1000)}.{self.random.randint(0, 99)}"
+        return f'"s{self.random.randint(0, 1000)}"'
+
+
+def generate_program(statements, seed=0, expression_depth=3, nesting=2, mix=None):
+    """Atalho para `WorkloadGenerator(...).generate(statements)`."""
+    return WorkloadGenerator(seed, expression_depth, nesting, mix).generate(statements)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--statements", type=int, default=1000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--expression-depth", type=int, default=3)
+    arg_parser.add_argument("--nesting", type=int, default=2)
+    arg_parser.add_argument("--mix", metavar="TIPO=PESO", nargs="*", default=[],
+                            help=f"pesos das instruções ({', '.join(DEFAULT_MIX)})")
+    args = arg_parser.parse_args()
+
+    mix = {}
+    for item in args.mix:
+        kind, _, weight = item.partition("=")
+        if kind not in DEFAULT_MIX:
+            arg_parser.error(f"tipo de instrução desconhecido: {kind}")
+        mix[kind] = int(weight)
+    print(generate_program(args.statements, args.seed, args.expression_depth, args.nesting, mix), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Backend que traduz a AST para um objeto de código Python e o executa no próprio processo.
+
+Em vez de gerar texto e depois reinterpretá-lo, o ProgramNode é convertido
+diretamente em um `ast.Module` do Python e compilado com `compile()`. O objeto de
+código resultante pode ser serializado com `marshal` para reaproveitamento.
+
+O programa vira o corpo de uma função, então as variáveis são locais rápidas do
+Python (slots do quadro, sem busca em dicionário). Com os símbolos ligados pelo
+`Resolver`, cada variável de um escopo aninhado ocupa o seu próprio slot,
+nomeado pela profundidade e pelo índice do símbolo. Como no backend C, todas as
+variáveis começam com o valor padrão do tipo na entrada da função: uma
+declaração em um ramo não executado não deixa a variável sem valor.
+
+'leia' e 'escreva' chamam as funções de runtime.py, que leem a entrada e escrevem
+a saída em blocos; o fim da função chama fimprog(), que escreve o que ficou.
+"""
+import ast as pyast
+import builtins
+import hashlib
+import importlib.util
+import marshal
+import os
+import time
+
+from astcode import ProgramNode, DeclarationNode, AssignmentNode, WriteNode, ReadNode, IfNode, WhileNode, BinaryOpNode, VariableNode, ComparisonNode, ForNode, RangeForNode, DispatchTable, transform, evaluate
+from compiler import COMPILER_VERSION, CompilationError, parse_source
+from resolver import Resolver
+from flat_ast import FlatAST
+from semantic import SemanticAnalyzer
+from optimizer import Optimizer
+from loops import LoopLowering
+from ir import LITERAL_TYPES, READ_CONVERSIONS
+import runtime
+
+DEFAULT_VALUES = {
+    "inteiro": 0,
+    "decimal": 0.0,
+    "texto": "",
+}
+
+BINARY_OPERATORS = {
+    "+": pyast.Add,
+    "-": pyast.Sub,
+    "*": pyast.Mult,
+    "/": pyast.Div,
+}
+
+COMPARISON_OPERATORS = {
+    "<": pyast.Lt,
+    ">": pyast.Gt,
+    "<=": pyast.LtE,
+    ">=": pyast.GtE,
+    "==": pyast.Eq,
+    "!=": pyast.NotEq,
+}
+
+# Cabeçalho dos objetos de código serializados: invalida o cache ao trocar de
+# versão do Python ou do compilador.
+MARSHAL_HEADER = importlib.util.MAGIC_NUMBER + f"a4:{COMPILER_VERSION}\0".encode("ascii")
+
+# 'programa' é palavra reservada da linguagem, então não colide com nenhuma variável.
+PROGRAM_FUNCTION = "programa"
+RESULT_NAME = "__variaveis__"
+
+
+class PythonASTGenerator:
+    """Converte a AST da linguagem em um `ast.Module` do Python.
+
+    Usa os tipos anotados pelo analisador semântico da mesma forma que
+    `PythonCodeGenerator`: conversão em 'leia', divisão inteira entre inteiros e
+    constantes decimais em operações decimais.
+
+    Como em `PythonCodeGenerator`, os percursos não são recursivos: os manipuladores
+    entregam os blocos aninhados com `yield` e recebem de volta as instruções geradas.
+    O `compile()` do Python, porém, ainda tem limite para a profundidade do
+    `ast.Module`; expressões ou aninhamentos extremos podem ser recusados por ele.
+
+    `locals` guarda o tipo de cada variável local usada, na ordem em que apareceu.
+    """
+    def __init__(self):
+        self.locals = {}
+
+    def generate(self, node):
+        """Devolve a lista de instruções Python correspondente ao nó."""
+        if isinstance(node, FlatAST):
+            node = node.program()
+        return transform(node, self._statement_handlers, self)
+
+    def module(self, program):
+        """Módulo que define a função 'programa', a executa e guarda as variáveis finais."""
+        body = self.generate(program)
+        defaults = [self.assign(name, pyast.Constant(DEFAULT_VALUES[var_type]))
+                    for name, var_type in self.locals.items() if var_type in DEFAULT_VALUES]
+        body[:0] = defaults
+        body.append(pyast.Expr(self.call("fimprog")))
+        body.append(pyast.Return(self.call("locals")))
+        arguments = pyast.arguments(posonlyargs=[], args=[], vararg=None, kwonlyargs=[],
+                                    kw_defaults=[], kwarg=None, defaults=[])
+        function = pyast.FunctionDef(name=PROGRAM_FUNCTION, args=arguments, body=body,
+                                     decorator_list=[], returns=None)
+        result = self.assign(RESULT_NAME, self.call(PROGRAM_FUNCTION))
+        module = pyast.Module(body=[function, result], type_ignores=[])
+        return pyast.fix_missing_locations(module)
+
+    def local_name(self, var_name, symbol, var_type):
+        """Nome da variável local; variáveis de escopos aninhados recebem a posição do símbolo."""
+        if symbol is None or symbol.depth == 0:
+            name = var_name
+        else:
+            name = f"{var_name}.{symbol.depth}.{symbol.slot}"
+        self.locals.setdefault(name, var_type if symbol is None else symbol.var_type)
+        return name
+
+    def name_of(self, node):
+        var_type = node.var_type if type(node) is DeclarationNode else node.resolved_type
+        return self.local_name(node.var_name, getattr(node, "symbol", None), var_type)
+
+    def generate_program(self, node):
+        body = []
+        for statement in node.statements:
+            body.extend((yield statement))
+        return body
+
+    def generate_block(self, statements):
+        if not isinstance(statements, list):
+            statements = [statements]
+        body = []
+        for statement in statements:
+            body.extend((yield statement))
+        return body or [pyast.Pass()]
+
+    def generate_unknown(self, node):
+        return []
+
+    def generate_declaration(self, node):
+        value = DEFAULT_VALUES.get(node.var_type)
+        return [self.assign(self.name_of(node), pyast.Constant(value))]
+
+    def generate_assignment(self, node):
+        value = self.generate_expression(node.expression)
+        if node.resolved_type == "decimal" and self.type_of(node.expression) == "inteiro":
+            value = self.as_decimal(node.expression, value, convert=True)
+        return [self.assign(self.name_of(node), value)]
+
+    def generate_write(self, node):
+        return [pyast.Expr(self.call("escreva", self.generate_expression(node.expression)))]
+
+    def generate_read(self, node):
+        value = self.call("leia")
+        conversion = READ_CONVERSIONS.get(node.resolved_type)
+        if conversion:
+            value = self.call(conversion, value)
+        return [self.assign(self.name_of(node), value)]
+
+    def generate_if(self, node):
+        condition = self.generate_expression(node.condition)
+        then_branch = yield from self.generate_block(node.then_branch)
+        orelse = (yield from self.generate_block(node.else_branch)) if node.else_branch else []
+        return [pyast.If(condition, then_branch, orelse)]
+
+    def generate_while(self, node):
+        condition = self.generate_expression(node.condition)
+        return [pyast.While(condition, (yield from self.generate_block(node.body)), [])]
+
+    def generate_for(self, node):
+        init = yield node.init
+        condition = self.generate_expression(node.condition)
+        body = (yield from self.generate_block(node.body)) + (yield node.update)
+        return init + [pyast.While(condition, body, [])]
+
+    def generate_range_for(self, node):
+        bounds = [self.generate_expression(node.start), self.generate_expression(node.stop)]
+        if node.step != 1:
+            bounds.append(pyast.Constant(node.step))
+        target = pyast.Name(self.local_name(node.variable, getattr(node, "symbol", None), "inteiro"), pyast.Store())
+        body = yield from self.generate_block(node.body)
+        return [pyast.For(target, self.call("range", *bounds), body, [])]
+
+    def generate_expression(self, expression):
+        return evaluate(expression, self._expression_handlers, self)
+
+    def unsupported_expression(self, expression):
+        raise TypeError(f"Expressão não suportada: {expression!r}")
+
+    def generate_binary_op(self, expression, left, right):
+        operator = BINARY_OPERATORS[expression.operator]
+        if expression.resolved_type == "decimal":
+            left = self.as_decimal(expression.left, left)
+            right = self.as_decimal(expression.right, right)
+        elif expression.resolved_type == "inteiro" and operator is pyast.Div:
+            operator = pyast.FloorDiv
+        return pyast.BinOp(left, operator(), right)
+
+    def generate_comparison(self, expression, left, right):
+        return pyast.Compare(left, [COMPARISON_OPERATORS[expression.operator]()], [right])
+
+    def generate_variable(self, expression):
+        return pyast.Name(self.name_of(expression), pyast.Load())
+
+    def generate_literal(self, expression):
+        return pyast.Constant(expression)
+
+    def as_decimal(self, expression, value, convert=False):
+        """Constantes inteiras viram decimais; com `convert`, demais valores recebem float()."""
+        if type(expression) is int:
+            return pyast.Constant(float(expression))
+        return self.call("float", value) if convert else value
+
+    def type_of(self, expression):
+        return LITERAL_TYPES.get(type(expression)) or getattr(expression, "resolved_type", None)
+
+    def assign(self, name, value):
+        return pyast.Assign([pyast.Name(name, pyast.Store())], value)
+
+    def call(self, name, *args):
+        return pyast.Call(pyast.Name(name, pyast.Load()), list(args), [])
+
+    STATEMENT_HANDLERS = {
+        list: "generate_block",
+        ProgramNode: "generate_program",
+        DeclarationNode: "generate_declaration",
+        AssignmentNode: "generate_assignment",
+        WriteNode: "generate_write",
+        ReadNode: "generate_read",
+        IfNode: "generate_if",
+        WhileNode: "generate_while",
+        ForNode: "generate_for",
+        RangeForNode: "generate_range_for",
+        object: "generate_unknown",
+    }
+
+    EXPRESSION_HANDLERS = {
+        BinaryOpNode: "generate_binary_op",
+        VariableNode: "generate_variable",
+        ComparisonNode: "generate_comparison",
+        int: "generate_literal",
+        float: "generate_literal",
+        str: "generate_literal",
+        object: "unsupported_expression",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.bind_handlers()
+
+    @classmethod
+    def bind_handlers(cls):
+        cls._statement_handlers = DispatchTable.bind(cls, cls.STATEMENT_HANDLERS)
+        cls._expression_handlers = DispatchTable.bind(cls, cls.EXPRESSION_HANDLERS)
+
+
+PythonASTGenerator.bind_handlers()
+
+
+class RunResult:
+    """Resultado de uma execução: saída capturada, variáveis finais, tempo em segundos e, na vm, instruções executadas."""
+    def __init__(self, output, variables, elapsed, steps=None):
+        self.output = output
+        self.variables = variables
+        self.elapsed = elapsed
+        self.steps = steps
+
+    def __repr__(self):
+        return f"RunResult(output={len(self.output)} chars, elapsed={self.elapsed:.6f}s)"
+
+
+def compile_program(program, filename="<programa>"):
+    """Traduz um ProgramNode (ou FlatAST) para um objeto de código Python."""
+    return compile(PythonASTGenerator().module(program), filename, "exec")
+
+
+def compile_to_code(source, filename="<programa>", optimize=0):
+    """Compila o código-fonte da linguagem, com verificação semântica, para um objeto de código.
+
+    Como em `compiler.compile_source`, todos os erros são levantados juntos em uma `CompilationError`.
+    """
+    diagnostics = []
+    program = parse_source(source, diagnostics=diagnostics)
+    if program is not None:
+        Resolver().resolve(program)
+        SemanticAnalyzer(diagnostics).analyze_program(program)
+    if diagnostics:
+        raise CompilationError.from_diagnostics(diagnostics, source)
+    if optimize:
+        program = LoopLowering().lower(Optimizer(optimize).optimize(program))
+    return compile_program(program, filename)
+
+
+def dump_code(code):
+    """Serializa o objeto de código com marshal."""
+    return MARSHAL_HEADER + marshal.dumps(code)
+
+
+def load_code(data):
+    """Desserializa um objeto de código gravado por dump_code(); None se for de outra versão."""
+    if not data.startswith(MARSHAL_HEADER):
+        return None
+    return marshal.loads(data[len(MARSHAL_HEADER):])
+
+
+def cached_compile_to_code(source, directory, filename="<programa>", optimize=0):
+    """Como compile_to_code(), reaproveitando objetos de código serializados em `directory`."""
+    key = hashlib.sha256(MARSHAL_HEADER + f"O{optimize}\0{source}".encode("utf-8")).hexdigest()
+    path = os.path.join(directory, key + ".marshal")
+    try:
+        with open(path, "rb") as f:
+            code = load_code(f.read())
+        if code is not None:
+            return code
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile_to_code(source, filename, optimize)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dump_code(code))
+    os.replace(tmp_path, path)
+    return code
+
+
+def run(code, stdin="", stdout=None):
+    """Executa o objeto de código, lendo `leia` de `stdin` e capturando o que `escreva` imprime.
+
+    `stdin` é o texto da entrada ou um arquivo de texto. Com `stdout` (um arquivo
+    de texto), a saída é escrita nele, em blocos, em vez de capturada, e a saída
+    do RunResult fica vazia.
+    """
+    output = runtime.Output(stdout)
+    namespace = {"__builtins__": builtins, **runtime.namespace(runtime.Input(stdin), output)}
+    start = time.perf_counter()
+    try:
+        exec(code, namespace)
+    finally:
+        output.flush()
+    elapsed = time.perf_counter() - start
+    # Só as variáveis do escopo global; as dos escopos aninhados têm a posição no nome.
+    variables = {name: value for name, value in namespace[RESULT_NAME].items() if "." not in name}
+    return RunResult(output.getvalue() if stdout is None else "", variables, elapsed)
+
+
+def run_source(source, stdin="", optimize=0):
+    """Compila e executa o código-fonte no próprio processo."""
+    return run(compile_to_code(source, optimize=optimize), stdin)
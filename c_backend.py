@@ -0,0 +1,570 @@
+"""Backend nativo: gera C a partir da IR, compila com o compilador C do sistema e executa o binário.
+
+`CCodeGenerator` traduz a `ir.Function` (a mesma que o gerador de Python recebe,
+já otimizada em -O2) para uma única função `main` em C: cada bloco básico vira
+um rótulo e os terminadores viram `goto`. As variáveis e os temporários são
+variáveis locais do tipo declarado ('inteiro' é `long long`, 'decimal' é
+`double` e 'texto' é `const char *`), de modo que os laços numéricos rodam em
+código de máquina. Cada declaração tem a sua variável local, com o seu tipo,
+mesmo quando esconde ou repete outra de mesmo nome.
+
+Cada variável de 'texto' é dona do seu texto: a cópia duplica o texto, e
+atribuir libera o anterior (text_set()), de modo que concatenar em um laço não
+acumula memória.
+
+As diferenças de semântica em relação ao Python ficam visíveis em vez de
+silenciosas: 'inteiro' tem 64 bits, e uma conta que passaria do limite termina
+o programa com erro. A divisão inteira arredonda para baixo, 'decimal' é
+escrito como o repr() do Python e uma comparação guardada em variável é escrita
+como True/False, como no código Python gerado.
+
+`BinaryCache` guarda os executáveis em disco pelo hash do código-fonte (com a
+versão do compilador, o nível de otimização e o comando do compilador C), e
+run() executa o binário em um processo separado.
+"""
+import hashlib
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+
+from compiler import CompilationError, compile_source, compiler_version
+from ir import VERSION_SEPARATOR, Function, Name, Jump, Branch, RangeLoop, NextItem, IRBuilder, ARITHMETIC, COMPARISONS, COPY, TO_FLOAT, READ, WRITE, DECLARE
+from emitter import CodeEmitter
+from bytecode_backend import RunResult
+from vm import reverse_postorder_then_first
+
+# Incrementar sempre que o código C gerado mudar para a mesma IR.
+C_BACKEND_VERSION = "3"
+
+C_TYPES = {"inteiro": "long long", "decimal": "double", "texto": "const char *"}
+DEFAULT_VALUES = {"inteiro": "0", "decimal": "0.0", "texto": "empty_text"}
+LITERAL_TYPES = {int: "inteiro", float: "decimal", str: "texto"}
+READ_TYPES = {"inteiro": "inteiro", "decimal": "decimal", None: "texto"}
+READ_FUNCTIONS = {"inteiro": "read_int", "decimal": "read_double", "texto": "read_text"}
+WRITE_FUNCTIONS = {"inteiro": "write_int", "decimal": "write_double", "texto": "write_text"}
+INTEGER_FUNCTIONS = {"+": "int_add", "-": "int_sub", "*": "int_mul", "//": "int_div"}
+
+INT_MIN = -(1 << 63)
+INT_MAX = (1 << 63) - 1
+
+RUNTIME = r"""#define _POSIX_C_SOURCE 200809L
+#include <ctype.h>
+#include <errno.h>
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+static void fail(const char *message) {
+    fflush(stdout);
+    fprintf(stderr, "%s\n", message);
+    exit(1);
+}
+
+#define OVERFLOW "Erro: Estouro de inteiro (o backend C usa 64 bits)."
+#define DIVISION "Erro: Divisão por zero."
+
+static long long int_add(long long a, long long b) {
+    long long r;
+    if (__builtin_add_overflow(a, b, &r)) fail(OVERFLOW);
+    return r;
+}
+
+static long long int_sub(long long a, long long b) {
+    long long r;
+    if (__builtin_sub_overflow(a, b, &r)) fail(OVERFLOW);
+    return r;
+}
+
+static long long int_mul(long long a, long long b) {
+    long long r;
+    if (__builtin_mul_overflow(a, b, &r)) fail(OVERFLOW);
+    return r;
+}
+
+/* Divisão inteira do Python: arredonda para baixo. */
+static long long int_div(long long a, long long b) {
+    if (b == 0) fail(DIVISION);
+    if (b == -1) return int_sub(0, a);
+    long long q = a / b;
+    if (a % b != 0 && (a < 0) != (b < 0)) q--;
+    return q;
+}
+
+static double float_div(double a, double b) {
+    if (b == 0.0) fail(DIVISION);
+    return a / b;
+}
+
+#define NO_MEMORY "Erro: Memória insuficiente."
+
+/* Os textos das variáveis são alocados, um por variável; o texto vazio inicial
+   (empty_text) é o único que não é liberado. */
+static char empty_text[1];
+
+static void text_set(const char **variable, const char *value) {
+    if (*variable != empty_text) free((char *) *variable);
+    *variable = value;
+}
+
+static const char *text_copy(const char *value) {
+    if (*value == '\0') return empty_text;
+    char *r = strdup(value);
+    if (r == NULL) fail(NO_MEMORY);
+    return r;
+}
+
+static const char *str_concat(const char *a, const char *b) {
+    size_t la = strlen(a), lb = strlen(b);
+    char *r = malloc(la + lb + 1);
+    if (r == NULL) fail(NO_MEMORY);
+    memcpy(r, a, la);
+    memcpy(r + la, b, lb + 1);
+    return r;
+}
+
+static char *read_line(void) {
+    static char *line = NULL;
+    static size_t size = 0;
+    ssize_t length = getline(&line, &size, stdin);
+    if (length < 0) fail("Erro: Fim da entrada durante 'leia'.");
+    if (length > 0 && line[length - 1] == '\n') line[--length] = '\0';
+    return line;
+}
+
+static long long read_int(void) {
+    char *line = read_line(), *end;
+    errno = 0;
+    long long value = strtoll(line, &end, 10);
+    while (isspace((unsigned char) *end)) end++;
+    if (end == line || *end != '\0') fail("Erro: Valor inválido para 'leia' de 'inteiro'.");
+    if (errno == ERANGE) fail(OVERFLOW);
+    return value;
+}
+
+static double read_double(void) {
+    char *line = read_line(), *end;
+    double value = strtod(line, &end);
+    while (isspace((unsigned char) *end)) end++;
+    /* Hexadecimal ('0x1p3') fica fora da gramática de 'leia', como em runtime.decimal(). */
+    if (end == line || *end != '\0' || strpbrk(line, "xX") != NULL)
+        fail("Erro: Valor inválido para 'leia' de 'decimal'.");
+    return value;
+}
+
+static const char *read_text(void) {
+    return text_copy(read_line());
+}
+
+static void write_int(long long value) {
+    printf("%lld\n", value);
+}
+
+static void write_flagged(long long value, char is_bool) {
+    if (is_bool) puts(value ? "True" : "False");
+    else printf("%lld\n", value);
+}
+
+static void write_text(const char *value) {
+    puts(value);
+}
+
+/* repr() do Python: o menor número de dígitos que volta ao mesmo valor, em
+   notação fixa quando o expoente está em [-4, 16). */
+static void write_double(double value) {
+    char buffer[40], digits[24], *p;
+    int precision, exponent, count = 0;
+    if (isnan(value)) { puts("nan"); return; }
+    if (isinf(value)) { puts(value > 0 ? "inf" : "-inf"); return; }
+    for (precision = 1; precision < 17; precision++) {
+        snprintf(buffer, sizeof buffer, "%.*e", precision - 1, value);
+        if (strtod(buffer, NULL) == value) break;
+    }
+    snprintf(buffer, sizeof buffer, "%.*e", precision - 1, value);
+    for (p = buffer + (buffer[0] == '-'); *p != 'e'; p++)
+        if (*p != '.') digits[count++] = *p;
+    while (count > 1 && digits[count - 1] == '0') count--;
+    digits[count] = '\0';
+    exponent = atoi(p + 1);
+    if (buffer[0] == '-') putchar('-');
+    if (exponent >= 16 || exponent < -4) {
+        putchar(digits[0]);
+        if (count > 1) printf(".%s", digits + 1);
+        printf("e%c%02d\n", exponent < 0 ? '-' : '+', abs(exponent));
+    } else if (exponent < 0) {
+        fputs("0.", stdout);
+        for (int i = exponent + 1; i < 0; i++) putchar('0');
+        puts(digits);
+    } else if (count <= exponent + 1) {
+        fputs(digits, stdout);
+        for (int i = count; i <= exponent; i++) putchar('0');
+        puts(".0");
+    } else {
+        printf("%.*s.%s\n", exponent + 1, digits, digits + exponent + 1);
+    }
+}
+
+static int finish(void) {
+    fflush(stdout);
+    return ferror(stdout) ? 1 : 0;
+}
+"""
+
+
+class NativeError(Exception):
+    """O programa nativo terminou com erro; `output` é o que ele escreveu antes."""
+    def __init__(self, message, output="", returncode=1):
+        super().__init__(message)
+        self.output = output
+        self.returncode = returncode
+
+
+class CCodeGenerator:
+    """Gera o código C de uma `ir.Function` (ou de um nó da AST, rebaixado antes pelo `IRBuilder`).
+
+    Os blocos saem na mesma ordem do bytecode da vm (vm.reverse_postorder_then_first),
+    sem o `goto` para o bloco seguinte. As variáveis que podem guardar o resultado de
+    uma comparação têm um indicador ao lado (`f_<nome>`), que escolhe entre escrever
+    True/False e o número.
+    """
+    def __init__(self):
+        self.emitter = CodeEmitter()
+        self.emit = self.emitter.line
+        self.builder = IRBuilder()
+        self.names = {}
+        self.types = {}
+        self.flagged = set()
+        self.loops = {}
+
+    def lower(self, node):
+        return self.builder.lower(node)
+
+    def generate(self, node):
+        function = node if isinstance(node, Function) else self.lower(node)
+        layout = reverse_postorder_then_first(function)
+        self.infer_types(layout)
+        self.find_flagged(layout)
+        targets = self.jump_targets(layout)
+
+        for line in RUNTIME.splitlines():
+            self.emit(line)
+        self.emit("")
+        self.emit("int main(void) {")
+        self.emitter.indent()
+        self.emit("static char output_buffer[1 << 16];")
+        self.emit("setvbuf(stdout, output_buffer, _IOFBF, sizeof output_buffer);")
+        self.declare_locals(layout)
+        for index, block in enumerate(layout):
+            following = layout[index + 1] if index + 1 < len(layout) else None
+            if block in targets:
+                self.emitter.dedent()
+                self.emit(f"b{block.index}:;")
+                self.emitter.indent()
+            for instruction in block.instructions:
+                self.instruction(instruction)
+            self.terminator(block.terminator, following)
+        self.emitter.dedent()
+        self.emit("}")
+
+    def get_code(self):
+        return self.emitter.getvalue()
+
+    # Análises sobre a IR
+
+    def infer_types(self, layout):
+        """Tipo de cada `Name`: o anotado, ou o deduzido da instrução que o define."""
+        for block in layout:
+            for instruction in block.instructions:
+                target = instruction.target
+                if target is None or target.type is not None or target in self.types:
+                    continue
+                op = instruction.op
+                if op in COMPARISONS:
+                    var_type = "inteiro"
+                elif op in ARITHMETIC:
+                    operand_types = {self.type_of(instruction.left), self.type_of(instruction.right)}
+                    var_type = ("texto" if "texto" in operand_types else
+                                "decimal" if "decimal" in operand_types else "inteiro")
+                elif op == TO_FLOAT:
+                    var_type = "decimal"
+                elif op == READ:
+                    var_type = READ_TYPES[instruction.left]
+                elif op == DECLARE:
+                    var_type = instruction.left
+                else:
+                    var_type = self.type_of(instruction.left)
+                self.types[target] = var_type
+
+    def type_of(self, value):
+        if type(value) is Name:
+            return value.type or self.types.get(value, "inteiro")
+        return LITERAL_TYPES[type(value)]
+
+    def find_flagged(self, layout):
+        """Os `Name` que podem guardar uma comparação: destinos de comparações e cópias deles, até o ponto fixo."""
+        copies = []
+        for block in layout:
+            for instruction in block.instructions:
+                if instruction.op in COMPARISONS:
+                    self.flagged.add(instruction.target)
+                elif instruction.op == COPY and type(instruction.left) is Name:
+                    copies.append((instruction.target, instruction.left))
+        changed = True
+        while changed:
+            changed = False
+            for target, source in copies:
+                if source in self.flagged and target not in self.flagged:
+                    self.flagged.add(target)
+                    changed = True
+
+    def jump_targets(self, layout):
+        targets = set()
+        for index, block in enumerate(layout):
+            following = layout[index + 1] if index + 1 < len(layout) else None
+            terminator = block.terminator
+            if isinstance(terminator, RangeLoop):
+                targets.add(terminator.header)
+            elif isinstance(terminator, NextItem):
+                targets.add(terminator.loop.body)
+            targets.update(successor for successor in block.successors if successor is not following)
+        return targets
+
+    def declare_locals(self, layout):
+        names = []
+        for block in layout:
+            values = []
+            for instruction in block.instructions:
+                values += (instruction.target, *instruction.uses())
+            terminator = block.terminator
+            if terminator is not None:
+                values += (*terminator.uses(), terminator.defines())
+            if isinstance(terminator, RangeLoop):
+                self.loops[terminator] = len(self.loops)
+            for value in values:
+                if type(value) is Name and value not in self.names:
+                    self.names[value] = local_name(value)
+                    names.append(value)
+        for name in names:
+            var_type = self.type_of(name)
+            self.emit(f"{C_TYPES[var_type]} {self.names[name]} = {DEFAULT_VALUES[var_type]};")
+            if name in self.flagged:
+                self.emit(f"char f_{self.names[name]} = 0;")
+        for index in self.loops.values():
+            self.emit(f"long long next_{index} = 0, limit_{index} = 0;")
+
+    # Geração
+
+    def operand(self, value):
+        if type(value) is Name:
+            return self.names[value]
+        if type(value) is int:
+            if not INT_MIN <= value <= INT_MAX:
+                raise CompilationError(f"Erro: A constante {value} não cabe em 64 bits (backend C).")
+            return f"({INT_MIN + 1}LL - 1)" if value == INT_MIN else f"{value}LL"
+        if type(value) is float:
+            if value != value:
+                return "NAN"
+            if value in (float("inf"), float("-inf")):
+                return "INFINITY" if value > 0 else "(-INFINITY)"
+            return repr(value)
+        return c_string(value)
+
+    def flag(self, target, value):
+        """Atualiza o indicador de comparação de `target` (quando ele tem um)."""
+        if target in self.flagged:
+            self.emit(f"f_{self.names[target]} = {value};")
+
+    def assign(self, target, code):
+        """`target = code`; um texto passa por text_set(), que libera o anterior."""
+        if self.type_of(target) == "texto":
+            self.emit(f"text_set(&{self.names[target]}, {code});")
+        else:
+            self.emit(f"{self.names[target]} = {code};")
+
+    def instruction(self, instruction):
+        op, target = instruction.op, instruction.target
+        if op == DECLARE:
+            self.assign(target, DEFAULT_VALUES[instruction.left])
+            self.flag(target, 0)
+        elif op == READ:
+            self.assign(target, f"{READ_FUNCTIONS[self.type_of(target)]}()")
+            self.flag(target, 0)
+        elif op == WRITE:
+            value = instruction.left
+            if value in self.flagged:
+                self.emit(f"write_flagged({self.operand(value)}, f_{self.names[value]});")
+            else:
+                self.emit(f"{WRITE_FUNCTIONS[self.type_of(value)]}({self.operand(value)});")
+        elif op == COPY:
+            source = instruction.left
+            code = self.operand(source)
+            # Cada variável tem o seu texto: a cópia não pode ser liberada junto com o original.
+            self.assign(target, f"text_copy({code})" if self.type_of(target) == "texto" else code)
+            self.flag(target, f"f_{self.names[source]}" if source in self.flagged else 0)
+        elif op == TO_FLOAT:
+            self.assign(target, f"(double) {self.operand(instruction.left)}")
+            self.flag(target, 0)
+        else:
+            self.assign(target, self.binary(op, instruction.left, instruction.right))
+            self.flag(target, 1 if op in COMPARISONS else 0)
+
+    def binary(self, op, left, right):
+        types = {self.type_of(left), self.type_of(right)}
+        left, right = self.operand(left), self.operand(right)
+        if op in COMPARISONS:
+            if "texto" in types:
+                return f"strcmp({left}, {right}) {op} 0"
+            return f"{left} {op} {right}"
+        if "texto" in types:
+            if op == "+":
+                return f"str_concat({left}, {right})"
+            # Como no Python, só a soma é definida entre textos; o erro acontece na execução.
+            return f'(fail("Erro: Operação \'{op}\' inválida entre textos."), empty_text)'
+        if "decimal" in types:
+            if op == "/":
+                return f"float_div({left}, {right})"
+            if op == "//":
+                return f"floor(float_div({left}, {right}))"
+            return f"{left} {op} {right}"
+        return f"{INTEGER_FUNCTIONS[op]}({left}, {right})"
+
+    def goto(self, block, following):
+        if block is not following:
+            self.emit(f"goto b{block.index};")
+
+    def terminator(self, terminator, following):
+        if terminator is None:
+            self.emit("return finish();")
+        elif isinstance(terminator, Jump):
+            self.goto(terminator.target, following)
+        elif isinstance(terminator, Branch):
+            condition = self.operand(terminator.condition)
+            if terminator.then is following:
+                self.emit(f"if (!{condition}) goto b{terminator.otherwise.index};")
+            else:
+                self.emit(f"if ({condition}) goto b{terminator.then.index};")
+                self.goto(terminator.otherwise, following)
+        elif isinstance(terminator, RangeLoop):
+            index = self.loops[terminator]
+            self.emit(f"next_{index} = {self.operand(terminator.start)};")
+            self.emit(f"limit_{index} = {self.operand(terminator.stop)};")
+            self.goto(terminator.header, following)
+        elif isinstance(terminator, NextItem):
+            loop = terminator.loop
+            index = self.loops[loop]
+            variable = self.names[loop.variable]
+            self.emit(f"if (next_{index} {'<' if loop.step > 0 else '>'} limit_{index}) {{")
+            self.emitter.indent()
+            self.emit(f"{variable} = next_{index};")
+            self.flag(loop.variable, 0)
+            # Passar do maior (ou menor) inteiro só acontece depois do limite: o laço acaba.
+            self.emit(f"if (__builtin_add_overflow(next_{index}, {loop.step}LL, &next_{index})) "
+                      f"next_{index} = limit_{index};")
+            self.emit(f"goto b{loop.body.index};")
+            self.emitter.dedent()
+            self.emit("}")
+            self.goto(loop.exit, following)
+        else:
+            raise TypeError(f"Terminador da IR não suportado: {terminator!r}")
+
+
+def local_name(value):
+    """Nome da variável local em C: 'v_a' para 'a', 'v1_a' para 'aˍ1' e 't_3' para o temporário '%3'."""
+    if value.temporary:
+        return f"t_{value.name[1:]}"
+    name, _, version = value.name.partition(VERSION_SEPARATOR)
+    return f"v{version}_{name}"
+
+
+def c_string(text):
+    """Literal de string do C com os bytes UTF-8 de `text`."""
+    parts = []
+    for byte in text.encode("utf-8"):
+        if 32 <= byte < 127 and chr(byte) not in '"\\?':
+            parts.append(chr(byte))
+        else:
+            parts.append(f"\\{byte:03o}")
+    return '"' + "".join(parts) + '"'
+
+
+def generate_c(source, optimize=0):
+    """Compila o código-fonte (com todas as verificações de `compiler.compile_source`) e devolve o código C."""
+    result = compile_source(source, optimize=optimize)
+    generator = CCodeGenerator()
+    generator.generate(result.ir)
+    return generator.get_code()
+
+
+class BinaryCache:
+    """Executáveis compilados em `directory`, um por hash do código-fonte.
+
+    O nome do arquivo é o SHA-256 da versão do compilador e do backend, do nível
+    de otimização, do comando do compilador C e do código-fonte. Os executáveis
+    são escritos com outro nome e renomeados no fim, então processos em paralelo
+    nunca veem um binário pela metade.
+    """
+    def __init__(self, directory=None, cc=None, cflags=("-O2",)):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "compilador-c-cache")
+        self.cc = cc or os.environ.get("CC", "cc")
+        self.cflags = tuple(cflags)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source, optimize=0):
+        command = shlex.join((self.cc, *self.cflags))
+        text = f"{compiler_version()}:{C_BACKEND_VERSION}:{optimize}:{command}\n{source}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def path(self, source, optimize=0):
+        return os.path.join(self.directory, self.key(source, optimize))
+
+    def build(self, source, optimize=0):
+        """Devolve o caminho do executável de `source`, gerando e compilando o código C quando não está no cache."""
+        path = self.path(source, optimize)
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+        self.misses += 1
+        code = generate_c(source, optimize)
+        if shutil.which(self.cc) is None:
+            raise CompilationError(f"Erro: Compilador C '{self.cc}' não encontrado.")
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        c_path = f"{tmp_path}.c"
+        with open(c_path, "w", encoding="utf-8") as f:
+            f.write(code)
+        try:
+            process = subprocess.run([self.cc, *self.cflags, "-o", tmp_path, c_path, "-lm"],
+                                     capture_output=True, text=True)
+            if process.returncode != 0:
+                raise CompilationError(f"Erro: O compilador C falhou:\n{process.stderr}")
+            os.replace(tmp_path, path)
+        finally:
+            os.remove(c_path)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+
+def run(binary, stdin="", timeout=None):
+    """Executa o binário, lendo 'leia' de `stdin`; devolve um `RunResult` (sem as variáveis, que ficam no processo).
+
+    Um erro na execução (divisão por zero, estouro, fim da entrada) levanta `NativeError`.
+    """
+    started = time.perf_counter()
+    process = subprocess.run([binary], input=stdin.encode("utf-8"), capture_output=True, timeout=timeout)
+    elapsed = time.perf_counter() - started
+    output = process.stdout.decode("utf-8")
+    if process.returncode != 0:
+        message = process.stderr.decode("utf-8").strip() or f"Erro: O programa terminou com código {process.returncode}."
+        raise NativeError(message, output, process.returncode)
+    return RunResult(output, {}, elapsed)
+
+
+def run_source(source, stdin="", optimize=0, cache=None, timeout=None):
+    """Compila (ou reaproveita do cache) e executa o código-fonte como programa nativo."""
+    cache = cache or BinaryCache()
+    return run(cache.build(source, optimize), stdin, timeout)
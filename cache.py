@@ -0,0 +1,144 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+from compiler import CompilationResult, compile_source, compiler_version
+
+
+class CompilationCache:
+    """Cache de compilações endereçado pelo conteúdo do código-fonte.
+
+    A chave é o SHA-256 da versão do compilador mais o texto-fonte. A camada em
+    memória é um LRU limitado por `max_entries` e, opcionalmente, por `max_bytes`
+    de código gerado. Com `directory`, os resultados também são gravados em disco
+    (código gerado, mapa de linhas e AST serializada com pickle), limitados a
+    `disk_max_entries` arquivos; os mais antigos são removidos primeiro.
+
+    As ASTs devolvidas são compartilhadas entre chamadas e não devem ser alteradas.
+    """
+    def __init__(self, max_entries=256, max_bytes=None, directory=None, disk_max_entries=None,
+                 version=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_entries = disk_max_entries
+        self.version = version or compiler_version()
+        self._prefix = hashlib.sha256(self.version.encode("utf-8") + b"\0")
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, source):
+        """Calcula a chave de cache do código-fonte."""
+        digest = self._prefix.copy()
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, source):
+        """Retorna o resultado em cache para `source`, ou None."""
+        return self._lookup(self.key(source))
+
+    def compile(self, source, compile_fn=compile_source):
+        """Compila `source`, reaproveitando o resultado em cache quando houver."""
+        key = self.key(source)
+        result = self._lookup(key)
+        if result is None:
+            result = compile_fn(source)
+            self.put(key, result)
+        return result
+
+    def put(self, key, result):
+        """Armazena um resultado nas camadas de memória e de disco."""
+        self._store(key, result)
+        if self.directory:
+            self._write_disk(key, result)
+
+    def clear(self):
+        """Esvazia a camada em memória e zera os contadores."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self):
+        """Contadores de acertos, faltas e remoções."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+        if self.directory:
+            result = self._read_disk(key)
+            if result is not None:
+                self.disk_hits += 1
+                self._store(key, result)
+                return result
+        self.misses += 1
+        return None
+
+    def _store(self, key, result):
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key).code)
+        self._entries[key] = result
+        self._bytes += len(result.code)
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.code)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if data.get("version") != self.version:
+            return None
+        return CompilationResult(data["ast"], data["code"], source_map=data.get("source_map"))
+
+    def _write_disk(self, key, result):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": self.version, "code": result.code, "ast": result.ast,
+                         "source_map": result.source_map}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        if self.disk_max_entries is not None:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                   if name.endswith(".pickle")]
+        excess = len(entries) - self.disk_max_entries
+        if excess <= 0:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,79 +1,233 @@
-from astcode import ProgramNode, DeclarationNode, AssignmentNode, WriteNode, ReadNode, IfNode, WhileNode, BinaryOpNode, VariableNode, ComparisonNode, ForNode
+import math
+
+from ir import Function, Name, Branch, RangeLoop, IRBuilder, ARITHMETIC, COMPARISONS, TO_FLOAT, READ, WRITE, DECLARE
+from emitter import CodeEmitter
+
+# Valor inicial de cada tipo, atribuído às variáveis no cabeçalho do código gerado.
+DEFAULT_VALUES = {"inteiro": "0", "decimal": "0.0", "texto": "''"}
+
+# Primeira linha do código gerado: as funções de runtime.py chamadas por 'leia', 'escreva',
+# 'fimprog' e as conversões de 'leia'. São palavras reservadas da linguagem, então não
+# colidem com as variáveis.
+RUNTIME_IMPORT = "from runtime import leia, escreva, fimprog, inteiro, decimal"
+
+# Prefixo dos temporários que precisam de nome no código gerado. Os identificadores
+# da linguagem são só ASCII, então não há colisão com as variáveis do programa.
+TEMPORARY_PREFIX = "τ"
+
+# Última linha do código gerado: escreve a saída que ficou no buffer (runtime.py).
+END_OF_PROGRAM = "fimprog()"
+
 
 class PythonCodeGenerator:
-    def __init__(self):
-        self.code = []
-        self.declarations = []  
+    """Gera código Python a partir da IR de três endereços (ir.py).
+
+    generate() aceita uma `ir.Function` ou um nó da AST, que é rebaixado antes pelo
+    `IRBuilder` de `self.builder` (`builder`, ou um novo). O corpo do programa é
+    escrito por um único `CodeEmitter`; com `sink`, ele vai direto para o arquivo
+    enquanto é gerado. O cabeçalho, em `self.declarations`, dá a cada variável o
+    valor padrão do seu tipo, como no backend C: uma variável declarada em um ramo
+    não executado (ou cuja declaração o `Optimizer` removeu) também tem valor.
+    get_code() o coloca antes do corpo, depois de RUNTIME_IMPORT, e o código pode
+    ser executado como script, com runtime.py no caminho de importação.
+
+    O código estruturado sai da forma guardada nos terminadores: 'if'/'else' na
+    junção de um `Branch` "if", 'while' no cabeçalho de um `Branch` "while" e
+    'for ... in range()' em um `RangeLoop`. Os temporários lidos uma vez só, no
+    mesmo bloco e na ordem em que foram calculados (o caso de toda expressão
+    rebaixada da AST), voltam a ser subexpressões; os demais recebem um nome. Os
+    blocos aninhados são gerados sem recursão, como nos percursos de astcode.
+
+    'leia' e 'escreva' viram chamadas a leia() e escreva(valor), e o código termina
+    com fimprog(): são os nomes de runtime.namespace(), com entrada e saída em blocos.
+
+    Com `source_map`, cada linha gerada é associada à linha do código-fonte da
+    instrução da IR que a produziu; source_map() devolve a associação na ordem de
+    get_code().
+    """
+    def __init__(self, sink=None, builder=None, source_map=False):
+        self.declarations = []
+        self.declaration_lines = []
+        self.declared = set()
+        self.emitter = CodeEmitter(sink, track_source=source_map)
+        self.emit = self.emitter.line
+        self.builder = builder or IRBuilder()
+        self.names = {}
+
+    def lower(self, node):
+        """Rebaixa o nó da AST (ou FlatAST) para a IR, sem gerar código."""
+        return self.builder.lower(node)
 
     def generate(self, node):
-        if isinstance(node, ProgramNode):
-            for statement in node.statements:
-                self.generate(statement)
-            self.code = self.declarations + self.code
-        elif isinstance(node, DeclarationNode):
-            if node.var_type == "inteiro":
-                self.declarations.append(f"int {node.var_name}")
-            elif node.var_type == "decimal":
-                self.declarations.append(f"float {node.var_name}")
-            elif node.var_type == "texto":
-                self.declarations.append(f"string {node.var_name}")
-        elif isinstance(node, AssignmentNode):
-            self.code.append(f"{node.var_name} = {self.generate_expression(node.expression)}")
-        elif isinstance(node, WriteNode):
-            if isinstance(node.expression, list):
-                raise TypeError("Erro: 'WriteNode.expression' deveria ser um único valor, não uma lista.")
-            self.code.append(f"print({self.generate_expression(node.expression)})")
-        elif isinstance(node, ReadNode):
-            self.code.append(f"{node.var_name} = input()")
-        elif isinstance(node, IfNode):
-            cond = self.generate_expression(node.condition)
-            self.code.append(f"if {cond}:")
-            self.code.append("    " + "\n    ".join(self.generate_block(node.then_branch)))
-            if node.else_branch:
-                self.code.append("else:")
-                self.code.append("    " + "\n    ".join(self.generate_block(node.else_branch)))
-        elif isinstance(node, WhileNode):
-            cond = self.generate_expression(node.condition)
-            self.code.append(f"while {cond}:")
-            self.code.append("    " + "\n    ".join(self.generate_block(node.body)))
-        elif isinstance(node, ForNode):
-            start = self.generate_expression(node.start)
-            end = self.generate_expression(node.end)
-            step = self.generate_expression(node.step) if node.step else "1"
-            self.code.append(f"for {node.variable.var_name} in range({start}, {end}, {step}):")
-            self.code.append(" " + "\n ".join(self.generate_block(node.body)))
-
-    def generate_expression(self, expression):
-        if isinstance(expression, BinaryOpNode):
-            left = self.generate_expression(expression.left)
-            right = self.generate_expression(expression.right)
-            return f"({left} {expression.operator} {right})"
-        elif isinstance(expression, VariableNode):
-            return expression.var_name
-        elif isinstance(expression, ComparisonNode):
-            left = self.generate_expression(expression.left)
-            right = self.generate_expression(expression.right)
-            return f"({left} {expression.operator} {right})"
-        elif isinstance(expression, (int, float, str)):
-            return repr(expression)
-
-    def generate_block(self, statements):
-        gen = PythonCodeGenerator()
-        if isinstance(statements, list):
-         for statement in statements:
-            gen.generate(statement)
-
-        else: gen.generate(statements)
-        return gen.code
+        function = node if isinstance(node, Function) else self.lower(node)
+        self.uses = function.use_counts()
+        stack = [self.generate_region(function.entry, None)]
+        while stack:
+            region = next(stack[-1], None)
+            if region is None:
+                stack.pop()
+            else:
+                stack.append(self.generate_region(*region))
+        for variable in function.variables:
+            if not variable.temporary:
+                self.declare(variable, variable.type, None)
+
+    def declare(self, variable, var_type, line):
+        """Acrescenta ao cabeçalho a inicialização de `variable`, se ela ainda não está lá."""
+        if variable.name not in self.declared and var_type in DEFAULT_VALUES:
+            self.declared.add(variable.name)
+            self.declarations.append(f"{variable.name} = {DEFAULT_VALUES[var_type]}")
+            self.declaration_lines.append(line)
+
+    def generate_region(self, block, stop):
+        """Gera os blocos a partir de `block` até chegar em `stop`; entrega as regiões aninhadas com `yield`."""
+        while block is not None and block is not stop:
+            terminator = block.terminator
+            if isinstance(terminator, Branch) and terminator.kind == "while":
+                yield from self.generate_while(block, terminator)
+                block = terminator.join
+                continue
+            pending = self.generate_instructions(block.instructions)
+            if isinstance(terminator, Branch):
+                condition = self.operand(terminator.condition, pending)
+                self.flush(pending)
+                self.emitter.source_line = terminator.line
+                self.emit(f"if {condition}:")
+                yield from self.generate_block(terminator.then, terminator.join)
+                if terminator.otherwise is not terminator.join:
+                    self.emit("else:")
+                    yield from self.generate_block(terminator.otherwise, terminator.join)
+                block = terminator.join
+            elif isinstance(terminator, RangeLoop):
+                stop_code = self.operand(terminator.stop, pending)
+                start = self.operand(terminator.start, pending)
+                self.flush(pending)
+                self.emitter.source_line = terminator.line
+                bounds = f"{start}, {stop_code}" if terminator.step == 1 else f"{start}, {stop_code}, {terminator.step}"
+                self.emit(f"for {terminator.variable.name} in range({bounds}):")
+                yield from self.generate_block(terminator.body, terminator.header)
+                block = terminator.exit
+            else:
+                self.flush(pending)
+                block = terminator.target if terminator is not None else None
+
+    def generate_while(self, header, branch):
+        """Laço com cabeçalho `header`: 'while cond:' quando o cabeçalho só calcula a condição."""
+        lines = []
+        emit, self.emit = self.emit, lines.append
+        try:
+            pending = self.generate_instructions(header.instructions)
+            condition = self.operand(branch.condition, pending)
+            self.flush(pending)
+        finally:
+            self.emit = emit
+        self.emitter.source_line = branch.line
+        if not lines:
+            self.emit(f"while {condition}:")
+            yield from self.generate_block(branch.then, header)
+            return
+        self.emit("while True:")
+        self.emitter.indent()
+        for line in lines:
+            self.emit(line)
+        self.emit(f"if not {condition}:")
+        self.emitter.indent()
+        self.emit("break")
+        self.emitter.dedent()
+        yield branch.then, header
+        self.emitter.dedent()
+
+    def generate_block(self, block, stop):
+        """Gera uma região aninhada um nível de indentação abaixo; regiões vazias recebem 'pass'."""
+        emitter = self.emitter
+        emitted = emitter.lines
+        emitter.indent()
+        yield block, stop
+        if emitter.lines == emitted:
+            self.emit("pass")
+        emitter.dedent()
+
+    def generate_instructions(self, instructions):
+        """Gera as instruções de um bloco e devolve a pilha de temporários ainda não usados.
+
+        A pilha guarda pares (temporário, código): um temporário lido uma vez só
+        fica nela até ser usado, e o seu código entra no lugar do operando.
+        """
+        pending = []
+        uses = self.uses
+        emitter = self.emitter
+        for instruction in instructions:
+            op, target = instruction.op, instruction.target
+            if op == DECLARE:
+                self.declare(target, instruction.left, instruction.line)
+                continue
+            emitter.source_line = instruction.line
+            if op == READ:
+                self.flush(pending)
+                conversion = instruction.left
+                self.emit(f"{self.name(target)} = {conversion}(leia())" if conversion
+                          else f"{self.name(target)} = leia()")
+                continue
+            if op in ARITHMETIC or op in COMPARISONS:
+                right = self.operand(instruction.right, pending)
+                code = f"({self.operand(instruction.left, pending)} {op} {right})"
+            elif op == TO_FLOAT:
+                code = f"float({self.operand(instruction.left, pending)})"
+            else:
+                code = self.operand(instruction.left, pending)
+            if op == WRITE:
+                self.flush(pending)
+                self.emit(f"escreva({code})")
+            elif target.temporary and uses.get(target) == 1:
+                pending.append((target, code))
+            else:
+                self.flush(pending)
+                self.emit(f"{self.name(target)} = {code}")
+        return pending
+
+    def operand(self, value, pending):
+        """Código do operando; o temporário no topo de `pending` é usado no lugar.
+
+        Um temporário pendente fora do topo seria avaliado fora de ordem: a pilha
+        inteira recebe nomes antes.
+        """
+        if type(value) is not Name:
+            if type(value) is float and not math.isfinite(value):
+                return f"float('{value}')"  # repr() daria os nomes inf e nan, que não existem no código
+            return repr(value)
+        if pending:
+            if pending[-1][0] is value:
+                return pending.pop()[1]
+            if any(name is value for name, _ in pending):
+                self.flush(pending)
+        return self.name(value)
+
+    def flush(self, pending):
+        """Atribui a um nome cada temporário pendente, na ordem em que foram calculados."""
+        for name, code in pending:
+            self.emit(f"{self.name(name)} = {code}")
+        pending.clear()
+
+    def name(self, value):
+        if not value.temporary:
+            return value.name
+        name = self.names.get(value)
+        if name is None:
+            name = self.names[value] = f"{TEMPORARY_PREFIX}{value.name[1:]}"
+        return name
+
+    def source_map(self):
+        """Lista com a linha do código-fonte de cada linha de get_code() (a posição 0 é a linha 1; None se não há).
+
+        Devolve None se o gerador foi criado sem `source_map`.
+        """
+        if self.emitter.source_lines is None:
+            return None
+        return [None] + self.declaration_lines + self.emitter.source_lines + [None]
 
     def get_code(self):
-        return "\n".join(self.code)
-    
-    def visit_declaration(self, node):
-        default_values = {
-            "inteiro": "0",
-            "decimal": "0.0",
-            "texto": "''",
-    }
-        default_value = default_values.get(node.var_type, "None")
-        self.code.append(f"{node.var_name} = {default_value}")
+        body = self.emitter.getvalue()
+        lines = [RUNTIME_IMPORT] + self.declarations
+        if body:
+            lines.append(body[:-1])
+        return "\n".join(lines + [END_OF_PROGRAM])
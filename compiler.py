@@ -0,0 +1,200 @@
+import gc
+from contextlib import contextmanager
+
+from lexer import create_lexer
+from parsercode import parser, get_parser, grammar_hash
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+from code_generator import PythonCodeGenerator
+from fused import FusedCodeGenerator
+from optimizer import Optimizer
+from ir_optimizer import IROptimizer
+from loops import LoopLowering
+from sharing import ExpressionInterner, SharingResolver, SharingSemanticAnalyzer, ReusingIRBuilder
+from metrics import NO_METRICS
+from diagnostics import Diagnostic, format_diagnostics, sort_diagnostics
+
+# Incrementar sempre que a saída do compilador mudar para a mesma entrada.
+COMPILER_VERSION = "12"
+
+
+class CompilationError(Exception):
+    """Erro em alguma fase da compilação; `diagnostics` lista cada erro encontrado, com a posição."""
+    def __init__(self, message, diagnostics=()):
+        super().__init__(message)
+        self.diagnostics = list(diagnostics)
+
+    @classmethod
+    def from_diagnostics(cls, diagnostics, source=None):
+        """Erro com todos os diagnósticos na mensagem, ordenados pela posição (colunas calculadas em `source`)."""
+        return cls(format_diagnostics(diagnostics, source), diagnostics)
+
+
+class CompilationResult:
+    """Resultado de uma compilação: a AST, a IR (`ir.Function`), o código Python gerado e as otimizações feitas.
+
+    `source_map[i]` é a linha do código-fonte que produziu a linha i + 1 do código
+    gerado (None quando não se sabe).
+    """
+    def __init__(self, ast, code, optimizations=None, ir=None, source_map=None):
+        self.ast = ast
+        self.code = code
+        self.optimizations = optimizations or {}
+        self.ir = ir
+        self.source_map = source_map
+
+    def __repr__(self):
+        return f"CompilationResult(code={len(self.code)} chars)"
+
+
+def compiler_version():
+    """Identifica a versão do compilador, incluindo a gramática em uso."""
+    return f"{COMPILER_VERSION}:{grammar_hash()}"
+
+
+@contextmanager
+def collector_paused():
+    """Suspende o coletor de ciclos do Python durante o bloco.
+
+    Tokens e nós da AST não formam ciclos; com o coletor ativo, cada coleta
+    completa varreria de novo todos os objetos já criados, e o custo por token
+    cresceria com o tamanho da entrada.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def parse_source(source, lexer=None, metrics=NO_METRICS, diagnostics=None, interner=None):
+    """Faz as análises léxica e sintática, devolvendo o ProgramNode.
+
+    Com métricas, os tokens são produzidos antes da análise sintática, para que as
+    duas fases sejam medidas separadamente.
+
+    O parser se recupera dos erros de sintaxe descartando a instrução até o próximo
+    ';'. Sem `diagnostics`, os erros encontrados são levantados juntos em uma
+    `CompilationError`; com uma lista, são registrados nela e a AST das instruções
+    restantes é devolvida (None se a análise não chegou ao 'fimprog').
+
+    Com `interner` (um `sharing.ExpressionInterner`), as expressões iguais são um
+    nó só, pedido à fábrica pelo parser.
+    """
+    if lexer is None:
+        lexer = create_lexer()
+    else:
+        lexer.lineno = 1
+    lexer.diagnostics = [] if diagnostics is None else diagnostics
+    get_parser().expression_interner = interner
+    try:
+        ast = _parse(source, lexer, metrics)
+    finally:
+        get_parser().expression_interner = None
+    if ast is None:
+        lexer.diagnostics.append(Diagnostic("Erro de sintaxe no final do arquivo.", lexer.lineno, len(source)))
+    if diagnostics is None and lexer.diagnostics:
+        raise CompilationError.from_diagnostics(lexer.diagnostics, source)
+    return ast
+
+
+def _parse(source, lexer, metrics):
+    if metrics.enabled:
+        with metrics.phase("lex"), collector_paused():
+            lexer.input(source)
+            tokens = list(iter(lexer.token, None))
+        metrics.count("tokens", len(tokens))
+        with metrics.phase("parse"), collector_paused():
+            stream = iter(tokens)
+            ast = parser.parse(lexer=lexer, tokenfunc=lambda: next(stream, None))
+    else:
+        with collector_paused():
+            ast = parser.parse(source, lexer=lexer)
+    return ast
+
+
+def check_source(source, lexer=None):
+    """Faz as análises léxica, sintática e semântica, sem gerar código.
+
+    Devolve a lista de diagnósticos, ordenada pela posição; vazia se o programa está correto.
+    """
+    diagnostics = []
+    ast = parse_source(source, lexer, diagnostics=diagnostics)
+    if ast is not None:
+        Resolver().resolve(ast)
+        SemanticAnalyzer(diagnostics).analyze_program(ast)
+    return sort_diagnostics(diagnostics, source)
+
+
+def compile_source(source, lexer=None, fused=False, optimize=0, metrics=NO_METRICS, share_expressions=False):
+    """Executa o pipeline completo: análise léxica, sintática, semântica e geração de código.
+
+    Sem `fused`, o `Resolver` liga as variáveis aos símbolos antes da análise
+    semântica. Com `fused=True`, a análise semântica e a geração de código são feitas em um
+    único percurso da AST por `FusedCodeGenerator`. Com `optimize` > 0, a AST
+    analisada passa pelo `Optimizer` desse nível antes da geração (e o percurso
+    único não é usado); depois dele, `LoopLowering` converte os laços de indução
+    em laços contados. A AST é rebaixada para a IR (ir.py), de onde o código é
+    gerado (fases "lower" e "codegen"; no percurso único, o rebaixamento é a fase
+    "fused"); com `optimize` >= 2, o `IROptimizer` roda sobre ela antes (fase "ir").
+
+    Com `share_expressions`, as expressões iguais são um nó só (sharing.py): o tipo
+    de cada uma é calculado uma vez e, dentro de um bloco básico, o valor de uma
+    subexpressão repetida é reaproveitado em vez de calculado de novo. O percurso
+    único não é usado.
+
+    `metrics` (um `metrics.CompilationMetrics`) recebe o tempo e as alocações de
+    cada fase e os contadores de tokens, nós da AST e tamanho da saída.
+
+    Os erros léxicos, sintáticos e semânticos são todos coletados antes de parar:
+    a `CompilationError` levantada traz a lista em `diagnostics`, com linha e coluna.
+    """
+    metrics.count_source(source)
+    diagnostics = []
+    interner = ExpressionInterner() if share_expressions else None
+    ast = parse_source(source, lexer, metrics, diagnostics, interner)
+    if ast is None:
+        raise CompilationError.from_diagnostics(diagnostics, source)
+    metrics.count_tree(ast)
+    if interner is not None:
+        metrics.count("expression_nodes", interner.created)
+        metrics.count("shared_expressions", interner.reused)
+        interner = None  # a tabela da fábrica só serve à análise sintática
+
+    optimizations = None
+    if fused and not optimize and not diagnostics and not share_expressions:
+        code_generator = FusedCodeGenerator(SemanticAnalyzer(diagnostics), source_map=True)
+        phase = "fused"
+    else:
+        with metrics.phase("resolve"):
+            (SharingResolver() if share_expressions else Resolver()).resolve(ast)
+        with metrics.phase("semantic"):
+            analyzer = SharingSemanticAnalyzer(diagnostics) if share_expressions else SemanticAnalyzer(diagnostics)
+            analyzer.analyze_program(ast)
+        if diagnostics:
+            raise CompilationError.from_diagnostics(diagnostics, source)
+        if optimize:
+            with metrics.phase("optimize"):
+                optimizer = Optimizer(optimize)
+                lowering = LoopLowering()
+                ast = lowering.lower(optimizer.optimize(ast))
+            optimizations = {**optimizer.changes, **lowering.changes}
+        code_generator = PythonCodeGenerator(builder=ReusingIRBuilder() if share_expressions else None, source_map=True)
+        phase = "lower"
+    # Como na análise sintática, a IR é um grande número de objetos pequenos criados de uma vez.
+    with metrics.phase(phase), collector_paused():
+        function = code_generator.lower(ast)
+    if diagnostics:
+        raise CompilationError.from_diagnostics(diagnostics, source)
+    if optimize >= 2:
+        with metrics.phase("ir"), collector_paused():
+            ir_optimizer = IROptimizer()
+            ir_optimizer.optimize(function)
+        optimizations.update(ir_optimizer.changes)
+    with metrics.phase("codegen"), collector_paused():
+        code_generator.generate(function)
+        code = code_generator.get_code()
+    metrics.count_output(code)
+    return CompilationResult(ast, code, optimizations, function, code_generator.source_map())
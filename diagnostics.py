@@ -0,0 +1,56 @@
+"""Diagnósticos de compilação: cada erro encontrado, com a sua posição no código-fonte.
+
+O lexer, o parser e o analisador semântico registram os erros em listas de
+`Diagnostic` em vez de parar no primeiro, de modo que uma única compilação aponta
+todos os problemas do programa.
+"""
+
+
+class Diagnostic:
+    """Erro na linha `line`; `lexpos` é a posição no texto analisado e `column` conta a partir de 1.
+
+    A coluna é calculada por locate(), com o texto em que `lexpos` foi medida.
+    """
+    __slots__ = ("message", "line", "lexpos", "column")
+
+    def __init__(self, message, line=None, lexpos=None):
+        self.message = message
+        self.line = line
+        self.lexpos = lexpos
+        self.column = None
+
+    def locate(self, text):
+        """Calcula a coluna a partir de `lexpos` e devolve o próprio diagnóstico."""
+        if self.column is None and self.lexpos is not None:
+            self.column = self.lexpos - text.rfind("\n", 0, self.lexpos)
+        return self
+
+    def sort_key(self):
+        return (self.line or 0, self.column or 0)
+
+    def to_dict(self):
+        return {"line": self.line, "column": self.column, "message": self.message}
+
+    def __str__(self):
+        if self.line is None:
+            return self.message
+        if self.column is None:
+            return f"Linha {self.line}: {self.message}"
+        return f"Linha {self.line}, coluna {self.column}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.message!r}, line={self.line}, column={self.column})"
+
+
+def sort_diagnostics(diagnostics, text=None):
+    """Ordena os diagnósticos pela posição; com `text`, as colunas que faltam são calculadas nele antes."""
+    if text is not None:
+        for diagnostic in diagnostics:
+            diagnostic.locate(text)
+    diagnostics.sort(key=Diagnostic.sort_key)
+    return diagnostics
+
+
+def format_diagnostics(diagnostics, text=None):
+    """Ordena os diagnósticos como sort_diagnostics() e os junta, um por linha."""
+    return "\n".join(map(str, sort_diagnostics(diagnostics, text)))
@@ -0,0 +1,47 @@
+class CodeEmitter:
+    """Escreve linhas de código em um único destino, controlando a indentação com uma pilha.
+
+    Sem `sink`, as linhas são acumuladas em memória e obtidas com getvalue(); com
+    um objeto de arquivo, cada linha é escrita nele assim que é emitida.
+
+    Com `track_source`, `source_lines[i]` é o valor de `source_line` quando a
+    linha i (contando de 0) foi emitida: quem gera o código o atualiza com a linha
+    do código-fonte. Sem, `source_lines` é None e nada cresce com o código, para
+    que a emissão em `sink` use memória limitada.
+    """
+    def __init__(self, sink=None, indent_unit="    ", track_source=False):
+        self.sink = sink
+        self.indent_unit = indent_unit
+        self.lines = 0
+        self.source_line = None
+        self.source_lines = [] if track_source else None
+        self._parts = []
+        self._indents = [""]
+        self._write = sink.write if sink is not None else self._parts.append
+
+    def line(self, text):
+        """Emite uma linha no nível de indentação atual."""
+        self._write(f"{self._indents[-1]}{text}\n")
+        if self.source_lines is not None:
+            self.source_lines.append(self.source_line)
+        self.lines += 1
+
+    def indent(self):
+        self._indents.append(self._indents[-1] + self.indent_unit)
+
+    def dedent(self):
+        if len(self._indents) == 1:
+            raise Exception("Erro: Tentativa de remover indentação no nível zero.")
+        self._indents.pop()
+
+    @property
+    def depth(self):
+        return len(self._indents) - 1
+
+    def getvalue(self):
+        """Texto emitido até agora (apenas sem `sink`)."""
+        if self.sink is not None:
+            raise Exception("Erro: O código foi escrito diretamente no destino do emissor.")
+        text = "".join(self._parts)
+        self._parts[:] = [text]
+        return text
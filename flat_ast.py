@@ -0,0 +1,323 @@
+"""Codificação compacta da AST em arrays paralelos ("struct of arrays").
+
+Cada nó ocupa uma posição nos arrays `kinds`, `ops`, `values`, `child_start` e
+`child_count` (e o tipo resolvido em `types`); os filhos de um nó ficam contíguos
+em `children`. Identificadores,
+operadores e tipos são internados em `names`, e as constantes em `constants`.
+
+`FlatAST.program()` devolve visões que são subclasses dos nós de `astcode`, então
+o analisador semântico e o gerador de código percorrem as duas codificações
+com o mesmo código.
+"""
+from array import array
+
+from astcode import (ProgramNode, DeclarationNode, AssignmentNode, BinaryOpNode, VariableNode,
+                     IfNode, WhileNode, ForNode, RangeForNode, WriteNode, ReadNode, ComparisonNode,
+                     DispatchTable, transform)
+
+(PROGRAM, DECLARATION, ASSIGNMENT, BINARY_OP, VARIABLE, IF, WHILE, FOR, WRITE, READ,
+ COMPARISON, CONST, BLOCK, RANGE_FOR) = range(14)
+
+NONE = -1
+
+# Códigos usados em FlatAST.types para o atributo `resolved_type` dos nós.
+TYPE_NAMES = (None, "inteiro", "decimal", "texto")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+
+class FlatAST:
+    """AST armazenada em arrays, com identificadores e constantes internados."""
+    def __init__(self):
+        self.kinds = array("B")
+        self.ops = array("i")
+        self.values = array("i")
+        self.child_start = array("I")
+        self.child_count = array("I")
+        self.types = array("B")
+        self.children = array("i")
+        self.names = []
+        self.constants = []
+        self._name_index = {}
+        self._constant_index = {}
+        self.root = NONE
+
+    @classmethod
+    def from_tree(cls, program):
+        """Codifica uma AST de `astcode` (normalmente um ProgramNode)."""
+        flat = cls()
+        flat.root = transform(program, _ENCODE, flat)
+        return flat
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def nbytes(self):
+        """Bytes ocupados pelos arrays (sem contar as tabelas de nomes e constantes)."""
+        return sum(a.itemsize * len(a) for a in (self.kinds, self.ops, self.values,
+                                                 self.child_start, self.child_count, self.types,
+                                                 self.children))
+
+    def program(self):
+        """Visão do nó raiz, aceita pelo analisador semântico e pelo gerador de código."""
+        return self.node(self.root)
+
+    def to_tree(self):
+        """Reconstrói a AST de objetos de `astcode`."""
+        return transform(self.program(), _MATERIALIZE, self)
+
+    def intern(self, name):
+        """Devolve o índice de `name` na tabela de nomes, inserindo-o se necessário."""
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def node(self, index):
+        """Devolve a visão do nó `index` (constantes e listas são devolvidas como valores Python)."""
+        if index == NONE:
+            return None
+        kind = self.kinds[index]
+        if kind == CONST:
+            return self.constants[self.values[index]]
+        if kind == BLOCK:
+            return self.child_nodes(index)
+        view = object.__new__(_VIEW_CLASSES[kind])
+        view._flat = self
+        view._index = index
+        return view
+
+    def child(self, index, position):
+        """Visão do filho na posição `position` do nó `index`."""
+        return self.node(self.children[self.child_start[index] + position])
+
+    def child_nodes(self, index):
+        """Lista com as visões de todos os filhos do nó `index`."""
+        start = self.child_start[index]
+        node = self.node
+        return [node(i) for i in self.children[start:start + self.child_count[index]]]
+
+    def _add(self, kind, op=NONE, value=NONE, children=(), resolved_type=None):
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.types.append(TYPE_CODES[resolved_type])
+        self.ops.append(op)
+        self.values.append(value)
+        self.child_start.append(len(self.children))
+        self.child_count.append(len(children))
+        self.children.extend(children)
+        return index
+
+    def _constant(self, value):
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    # from_tree() e to_tree() percorrem a árvore com astcode.transform: os filhos são
+    # entregues com `yield` e o resultado de cada um volta no lugar da chamada recursiva.
+
+    def _visit_all(self, values):
+        results = []
+        for value in values:
+            results.append((yield value))
+        return results
+
+    def _encode(self, node):
+        if node is None:
+            return NONE
+        if isinstance(node, list):
+            return self._add(BLOCK, children=(yield from self._visit_all(node)))
+        if isinstance(node, (int, float, str)):
+            return self._add(CONST, value=self._constant(node))
+        if isinstance(node, ProgramNode):
+            return self._add(PROGRAM, children=(yield from self._visit_all(node.statements)))
+        if isinstance(node, DeclarationNode):
+            return self._add(DECLARATION, self.intern(node.var_type), self.intern(node.var_name))
+        if isinstance(node, AssignmentNode):
+            return self._add(ASSIGNMENT, value=self.intern(node.var_name),
+                             children=[(yield node.expression)], resolved_type=node.resolved_type)
+        if isinstance(node, BinaryOpNode):
+            return self._add(BINARY_OP, self.intern(node.operator),
+                             children=(yield from self._visit_all((node.left, node.right))),
+                             resolved_type=node.resolved_type)
+        if isinstance(node, ComparisonNode):
+            return self._add(COMPARISON, self.intern(node.operator),
+                             children=(yield from self._visit_all((node.left, node.right))),
+                             resolved_type=node.resolved_type)
+        if isinstance(node, VariableNode):
+            return self._add(VARIABLE, value=self.intern(node.var_name), resolved_type=node.resolved_type)
+        if isinstance(node, IfNode):
+            return self._add(IF, children=(yield from self._visit_all(
+                (node.condition, node.then_branch, node.else_branch))))
+        if isinstance(node, WhileNode):
+            return self._add(WHILE, children=(yield from self._visit_all((node.condition, node.body))))
+        if isinstance(node, ForNode):
+            return self._add(FOR, children=(yield from self._visit_all(
+                (node.init, node.condition, node.update, node.body))))
+        if isinstance(node, RangeForNode):
+            return self._add(RANGE_FOR, value=self.intern(node.variable),
+                             children=(yield from self._visit_all(
+                                 (node.start, node.stop, node.step, node.body))))
+        if isinstance(node, WriteNode):
+            return self._add(WRITE, children=[(yield node.expression)])
+        if isinstance(node, ReadNode):
+            return self._add(READ, value=self.intern(node.var_name), resolved_type=node.resolved_type)
+        raise TypeError(f"Nó não suportado na codificação compacta: {type(node).__name__}")
+
+    def _materialize(self, value):
+        if isinstance(value, list):
+            return (yield from self._visit_all(value))
+        cls = _BASE_CLASSES.get(type(value))
+        if cls is None:
+            return value
+        node = cls(*(yield from self._visit_all([getattr(value, field) for field in _FIELDS[cls]])))
+        if hasattr(node, "resolved_type"):
+            node.resolved_type = value.resolved_type
+        return node
+
+
+def _op(self):
+    return self._flat.names[self._flat.ops[self._index]]
+
+
+def _name(self):
+    return self._flat.names[self._flat.values[self._index]]
+
+
+def _child(position):
+    return property(lambda self: self._flat.child(self._index, position))
+
+
+def _get_type(self):
+    return TYPE_NAMES[self._flat.types[self._index]]
+
+
+def _set_type(self, resolved_type):
+    self._flat.types[self._index] = TYPE_CODES[resolved_type]
+
+
+_resolved_type = property(_get_type, _set_type)
+
+
+class FlatProgramNode(ProgramNode):
+    __slots__ = ("_flat", "_index")
+    statements = property(lambda self: self._flat.child_nodes(self._index))
+
+
+class FlatDeclarationNode(DeclarationNode):
+    __slots__ = ("_flat", "_index")
+    var_type = property(_op)
+    var_name = property(_name)
+
+
+class FlatAssignmentNode(AssignmentNode):
+    __slots__ = ("_flat", "_index")
+    var_name = property(_name)
+    expression = _child(0)
+    resolved_type = _resolved_type
+
+
+class FlatBinaryOpNode(BinaryOpNode):
+    __slots__ = ("_flat", "_index")
+    operator = property(_op)
+    left = _child(0)
+    right = _child(1)
+    resolved_type = _resolved_type
+
+
+class FlatComparisonNode(ComparisonNode):
+    __slots__ = ("_flat", "_index")
+    operator = property(_op)
+    left = _child(0)
+    right = _child(1)
+    resolved_type = _resolved_type
+
+
+class FlatVariableNode(VariableNode):
+    __slots__ = ("_flat", "_index")
+    var_name = property(_name)
+    resolved_type = _resolved_type
+
+
+class FlatIfNode(IfNode):
+    __slots__ = ("_flat", "_index")
+    condition = _child(0)
+    then_branch = _child(1)
+    else_branch = _child(2)
+
+
+class FlatWhileNode(WhileNode):
+    __slots__ = ("_flat", "_index")
+    condition = _child(0)
+    body = _child(1)
+
+
+class FlatForNode(ForNode):
+    __slots__ = ("_flat", "_index")
+    init = _child(0)
+    condition = _child(1)
+    update = _child(2)
+    body = _child(3)
+
+
+class FlatRangeForNode(RangeForNode):
+    __slots__ = ("_flat", "_index")
+    variable = property(_name)
+    start = _child(0)
+    stop = _child(1)
+    step = _child(2)
+    body = _child(3)
+
+
+class FlatWriteNode(WriteNode):
+    __slots__ = ("_flat", "_index")
+    expression = _child(0)
+
+
+class FlatReadNode(ReadNode):
+    __slots__ = ("_flat", "_index")
+    var_name = property(_name)
+    resolved_type = _resolved_type
+
+
+_VIEW_CLASSES = {
+    PROGRAM: FlatProgramNode,
+    DECLARATION: FlatDeclarationNode,
+    ASSIGNMENT: FlatAssignmentNode,
+    BINARY_OP: FlatBinaryOpNode,
+    COMPARISON: FlatComparisonNode,
+    VARIABLE: FlatVariableNode,
+    IF: FlatIfNode,
+    WHILE: FlatWhileNode,
+    FOR: FlatForNode,
+    RANGE_FOR: FlatRangeForNode,
+    WRITE: FlatWriteNode,
+    READ: FlatReadNode,
+}
+
+# Campos de cada tipo de nó, na ordem do construtor, usados por to_tree().
+_FIELDS = {
+    ProgramNode: ("statements",),
+    DeclarationNode: ("var_type", "var_name"),
+    AssignmentNode: ("var_name", "expression"),
+    BinaryOpNode: ("left", "operator", "right"),
+    ComparisonNode: ("operator", "left", "right"),
+    VariableNode: ("var_name",),
+    IfNode: ("condition", "then_branch", "else_branch"),
+    WhileNode: ("condition", "body"),
+    ForNode: ("init", "condition", "update", "body"),
+    RangeForNode: ("variable", "start", "stop", "step", "body"),
+    WriteNode: ("expression",),
+    ReadNode: ("var_name",),
+}
+
+
+_BASE_CLASSES = {view: view.__mro__[1] for view in _VIEW_CLASSES.values()}
+
+
+# Mesmo manipulador para qualquer tipo de nó.
+_ENCODE = DispatchTable({object: FlatAST._encode})
+_MATERIALIZE = DispatchTable({object: FlatAST._materialize})
@@ -0,0 +1,145 @@
+from astcode import BinaryOpNode, VariableNode, ComparisonNode, DispatchTable, evaluate
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+from ir import IRBuilder, WRITE
+from code_generator import PythonCodeGenerator
+
+
+class FusedIRBuilder(IRBuilder):
+    """Verifica os tipos e rebaixa a AST para a IR em um único percurso.
+
+    Produz a mesma IR e levanta os mesmos erros que rodar
+    `SemanticAnalyzer.analyze_program` seguido de `IRBuilder.lower`, mas cada
+    expressão é visitada uma vez só, devolvendo o tipo e o operando juntos. Os
+    símbolos das variáveis são ligados no mesmo percurso, pelo `resolver`.
+    """
+    def __init__(self, analyzer=None):
+        super().__init__()
+        self.analyzer = analyzer or SemanticAnalyzer()
+        self.resolver = Resolver()
+
+    def enter_scope(self):
+        self.analyzer.enter_scope()
+        self.resolver.enter_scope()
+
+    def exit_scope(self):
+        self.analyzer.exit_scope()
+        self.resolver.exit_scope()
+
+    def lower_declaration(self, node):
+        node.symbol = self.resolver.declare(node.var_name, node.var_type)
+        self.analyzer.declare_variable(node.var_name, node.var_type)
+        super().lower_declaration(node)
+
+    def lower_assignment(self, node):
+        node.symbol = self.resolver.visible.get(node.var_name)
+        var_type = self.analyzer.variable_type(node)
+        expr_type, value = self.typed_expression(node.expression)
+        self.analyzer.check_assignment(node.var_name, var_type, expr_type, node)
+        node.resolved_type = var_type
+        self.assign(self.variable(node.var_name, var_type, node.symbol), self.coerce(node.expression, value, var_type))
+
+    def lower_binary_statement(self, node):
+        self.analyzer.analyze_binary_statement(node)
+
+    def lower_write(self, node):
+        if isinstance(node.expression, list):
+            raise TypeError("Erro: 'WriteNode.expression' deveria ser um único valor, não uma lista.")
+        expr_type, value = self.typed_expression(node.expression)
+        self.analyzer.check_write(expr_type, node)
+        self.append(WRITE, None, value)
+
+    def lower_read(self, node):
+        node.symbol = self.resolver.visible.get(node.var_name)
+        node.resolved_type = self.analyzer.variable_type(node)
+        super().lower_read(node)
+
+    def lower_if(self, node):
+        cond_type, condition = self.typed_expression(node.condition)
+        self.analyzer.check_condition("if", cond_type, ("inteiro", "decimal"), node)
+        self.enter_scope()
+        yield from self.lower_if_branches(condition, node)
+        self.exit_scope()
+
+    def lower_while(self, node):
+        header = self.loop_header()
+        cond_type, condition = self.typed_expression(node.condition)
+        self.analyzer.check_condition("while", cond_type, ("inteiro",), node)
+        self.enter_scope()
+        yield from self.lower_loop_body(header, condition, node.body)
+        self.exit_scope()
+
+    def lower_for(self, node):
+        yield node.init
+        header = self.loop_header()
+        cond_type, condition = self.typed_expression(node.condition)
+        self.analyzer.check_condition("for", cond_type, ("inteiro", "decimal"), node)
+        self.enter_scope()
+        body = node.body if isinstance(node.body, list) else [node.body]
+        yield from self.lower_loop_body(header, condition, body + [node.update])
+        self.exit_scope()
+
+    def typed_expression(self, expression):
+        """Devolve o par (tipo, operando) da expressão."""
+        return evaluate(expression, self._typed_handlers, self)
+
+    def typed_binary_op(self, expression, left, right):
+        (left_type, left), (right_type, right) = left, right
+        expression.resolved_type = self.analyzer.binary_op_type(expression.operator, left_type, right_type, expression)
+        return expression.resolved_type, self.binary_op(expression, left, right)
+
+    def typed_variable(self, expression):
+        expression.symbol = self.resolver.visible.get(expression.var_name)
+        expression.resolved_type = self.analyzer.variable_type(expression)
+        return expression.resolved_type, self.variable(expression.var_name, expression.resolved_type,
+                                                       expression.symbol)
+
+    def typed_comparison(self, expression, left, right):
+        (left_type, left), (right_type, right) = left, right
+        expression.resolved_type = self.analyzer.comparison_type(left_type, right_type, expression)
+        return expression.resolved_type, self.compute(expression.operator, left, right, expression.resolved_type)
+
+    def typed_integer(self, expression):
+        return "inteiro", expression
+
+    def typed_decimal(self, expression):
+        return "decimal", expression
+
+    def typed_text(self, expression):
+        return "texto", expression
+
+    def typed_unknown(self, expression):
+        return None, None
+
+    STATEMENT_HANDLERS = {
+        **IRBuilder.STATEMENT_HANDLERS,
+        BinaryOpNode: "lower_binary_statement",
+    }
+
+    TYPED_HANDLERS = {
+        BinaryOpNode: "typed_binary_op",
+        VariableNode: "typed_variable",
+        ComparisonNode: "typed_comparison",
+        int: "typed_integer",
+        float: "typed_decimal",
+        str: "typed_text",
+        object: "typed_unknown",
+    }
+
+    @classmethod
+    def bind_handlers(cls):
+        super().bind_handlers()
+        cls._typed_handlers = DispatchTable.bind(cls, cls.TYPED_HANDLERS)
+
+
+class FusedCodeGenerator(PythonCodeGenerator):
+    """Verifica os tipos e gera o código em um único percurso da AST.
+
+    Produz o mesmo código e levanta os mesmos erros que rodar
+    `SemanticAnalyzer.analyze_program` seguido de `PythonCodeGenerator.generate`;
+    a verificação é feita pelo `FusedIRBuilder` enquanto a AST é rebaixada.
+    """
+    def __init__(self, analyzer=None, sink=None, source_map=False):
+        super().__init__(sink, source_map=source_map)
+        self.builder = FusedIRBuilder(analyzer)
+        self.analyzer = self.builder.analyzer
@@ -0,0 +1,292 @@
+"""Recompilação incremental, usada pelo editor da interface gráfica.
+
+O texto é dividido em instruções de nível superior e a AST de cada uma é guardada
+com a sua posição. A cada nova versão do texto, as instruções antes e depois do
+trecho editado são reaproveitadas; só o trecho entre elas passa de novo pelas
+análises léxica e sintática. A resolução de nomes, a análise semântica e a
+geração de código continuam percorrendo o programa inteiro.
+
+As ASTs reaproveitadas são compartilhadas entre compilações, então não devem ser
+reescritas (por exemplo, pelo `Optimizer`).
+"""
+import time
+
+from astcode import ProgramNode
+from lexer import Token, create_lexer
+from parsercode import get_parser
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+from code_generator import PythonCodeGenerator
+from compiler import CompilationError, CompilationResult
+from metrics import CHILD_FIELDS
+
+# Tokens que iniciam uma instrução terminada no primeiro ';'.
+SIMPLE_STATEMENTS = {"INT_TYPE", "FLOAT_TYPE", "STRING_TYPE", "ID", "WRITE", "READ"}
+
+# Tokens que iniciam uma instrução com cabeçalho entre parênteses seguido de outra instrução.
+HEADED_STATEMENTS = {"IF", "WHILE", "FOR"}
+
+
+class CompilationCancelled(Exception):
+    """A compilação foi abandonada porque uma versão mais nova do texto chegou."""
+
+
+class Segment:
+    """Instrução de nível superior: posição no texto (início e fim exclusivo) e AST."""
+    __slots__ = ("start", "end", "node")
+
+    def __init__(self, start, end, node):
+        self.start = start
+        self.end = end
+        self.node = node
+
+
+class IncrementalCompiler:
+    """Compila versões sucessivas de um texto, reaproveitando as instruções não editadas.
+
+    Depois de cada compilação, `timings` guarda o tempo de cada fase em segundos e
+    `reparsed`/`reused` contam as instruções analisadas de novo e reaproveitadas.
+    """
+    def __init__(self):
+        self.lexer = create_lexer()
+        self.text = ""
+        self.segments = []
+        self.timings = {}
+        self.reparsed = 0
+        self.reused = 0
+
+    def compile(self, text, cancelled=None):
+        """Compila `text`; `cancelled()` é consultado entre as etapas para abandonar a compilação."""
+        cancelled = cancelled or (lambda: False)
+        timings = {}
+
+        start = time.perf_counter()
+        statements = self.parse(text, cancelled)
+        timings["léxica e sintática"] = time.perf_counter() - start
+        program = ProgramNode(statements)
+
+        start = time.perf_counter()
+        Resolver().resolve(program)
+        SemanticAnalyzer().analyze_program(program)
+        timings["semântica"] = time.perf_counter() - start
+        if cancelled():
+            raise CompilationCancelled()
+
+        start = time.perf_counter()
+        code_generator = PythonCodeGenerator()
+        code_generator.generate(program)
+        code = code_generator.get_code()
+        timings["geração"] = time.perf_counter() - start
+
+        self.timings = timings
+        return CompilationResult(program, code)
+
+    def parse(self, text, cancelled):
+        """Devolve as instruções de `text`, analisando de novo só o trecho editado."""
+        old_text, old_segments = self.text, self.segments
+        prefix = common_prefix_length(old_text, text)
+        suffix = common_suffix_length(old_text, text, min(len(old_text), len(text)) - prefix)
+
+        # Instruções inteiramente antes da edição. A última fica de fora: um 'senao'
+        # inserido logo depois dela mudaria a sua AST.
+        head = 0
+        while head < len(old_segments) and old_segments[head].end <= prefix:
+            head += 1
+        head = max(head - 1, 0)
+
+        # Instruções inteiramente depois da edição. A primeira reaproveitada precisa
+        # começar em uma linha não editada, para que nenhum token atravesse a fronteira.
+        unchanged = len(old_text) - suffix
+        tail = len(old_segments)
+        while tail > head and old_segments[tail - 1].start >= unchanged:
+            tail -= 1
+        while tail < len(old_segments) and not starts_line_after(old_text, old_segments[tail].start, unchanged):
+            tail += 1
+
+        delta = len(text) - len(old_text)
+        region_start = old_segments[head - 1].end if head else 0
+        region_end = old_segments[tail].start + delta if tail < len(old_segments) else len(text)
+        try:
+            parsed = self.parse_region(text, region_start, region_end, cancelled)
+        except CompilationError:
+            if region_start == 0 and region_end == len(text):
+                raise
+            # A edição pode ter juntado o trecho a uma instrução reaproveitada (por exemplo,
+            # um 'enquanto' que perdeu o corpo): analisa o texto inteiro.
+            head, tail = 0, len(old_segments)
+            parsed = self.parse_region(text, 0, len(text), cancelled)
+
+        # As instruções depois da edição mudam de posição no texto: as dos nós também.
+        lines = text.count("\n", prefix, len(text) - suffix) - old_text.count("\n", prefix, unchanged)
+        segments = old_segments[:head] + parsed
+        for segment in old_segments[tail:]:
+            if delta or lines:
+                shift_positions(segment.node, lines, delta)
+            segments.append(Segment(segment.start + delta, segment.end + delta, segment.node))
+        if not segments:
+            raise syntax_error()
+
+        self.text, self.segments = text, segments
+        self.reparsed = len(parsed)
+        self.reused = len(segments) - len(parsed)
+        return [segment.node for segment in segments]
+
+    def parse_region(self, text, start, end, cancelled):
+        """Analisa as instruções de text[start:end]; nas pontas do texto, exige 'programa' e 'fimprog'."""
+        tokens = self.tokenize(text, start, end)
+        if start == 0:
+            if not tokens or tokens[0].type != "PROGRAM":
+                raise syntax_error()
+            tokens = tokens[1:]
+        if end == len(text):
+            if not tokens or tokens[-1].type != "END_PROGRAM":
+                raise syntax_error()
+            tokens = tokens[:-1]
+
+        parsed = []
+        index = 0
+        while index < len(tokens):
+            if cancelled():
+                raise CompilationCancelled()
+            stop = statement_end(tokens, index)
+            if stop is None:
+                raise syntax_error()
+            node = parse_statement(tokens[index:stop], self.lexer)
+            parsed.append(Segment(tokens[index].lexpos, tokens[stop - 1].lexpos + 1, node))
+            index = stop
+        diagnostics = self.lexer.diagnostics
+        if diagnostics:
+            # Como em compile_source(): todos os erros do trecho, com as colunas calculadas no texto inteiro.
+            for diagnostic in diagnostics:
+                diagnostic.column = None
+            raise CompilationError.from_diagnostics(diagnostics, text)
+        return parsed
+
+    def tokenize(self, text, start, end):
+        """Tokens de text[start:end], com posições e linhas relativas ao texto inteiro.
+
+        Os erros léxicos ficam em `lexer.diagnostics`, também com as posições no texto inteiro.
+        """
+        lexer = self.lexer
+        lexer.lineno = text.count("\n", 0, start) + 1
+        lexer.diagnostics = []
+        lexer.input(text[start:end])
+        tokens = [Token(token.type, token.value, token.lineno, token.lexpos + start)
+                  for token in iter(lexer.token, None)]
+        for diagnostic in lexer.diagnostics:
+            diagnostic.lexpos += start
+        return tokens
+
+
+def syntax_error():
+    return CompilationError("Erro durante a análise sintática. Verifique o código de entrada.")
+
+
+def common_prefix_length(a, b):
+    """Comprimento do maior prefixo comum, comparando fatias (em C) por busca binária."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix_length(a, b, limit):
+    """Comprimento do maior sufixo comum, limitado a `limit` caracteres."""
+    low, high = 0, max(limit, 0)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def starts_line_after(text, position, boundary):
+    """Verifica se `position` é o primeiro token da sua linha e se a quebra anterior está em `boundary` ou depois."""
+    newline = text.rfind("\n", 0, position)
+    return newline >= boundary and not text[newline + 1:position].strip()
+
+
+def statement_end(tokens, index):
+    """Índice logo após a instrução que começa em tokens[index]; None se ela estiver incompleta.
+
+    Os cabeçalhos ('se', 'enquanto', 'para') ainda sem corpo completo ficam em uma
+    pilha, no lugar de uma chamada recursiva por nível de aninhamento.
+    """
+    headers = []
+    position = index
+    while position < len(tokens):
+        kind = tokens[position].type
+        if kind in HEADED_STATEMENTS:
+            position += 1
+            if position >= len(tokens) or tokens[position].type != "LPAREN":
+                return None
+            depth = 0
+            while position < len(tokens):
+                depth += {"LPAREN": 1, "RPAREN": -1}.get(tokens[position].type, 0)
+                position += 1
+                if depth == 0:
+                    break
+            else:
+                return None
+            headers.append(kind)
+            continue
+        if kind not in SIMPLE_STATEMENTS:
+            return None
+        while position < len(tokens) and tokens[position].type != "SEMI":
+            position += 1
+        if position == len(tokens):
+            return None
+        end = position + 1
+
+        # A instrução simples termina os cabeçalhos pendentes, do mais interno para fora.
+        # Como no parser, o 'senao' pertence ao 'se' mais próximo: o corpo dele vem a seguir.
+        while headers:
+            if headers.pop() == "IF" and end < len(tokens) and tokens[end].type == "ELSE":
+                break
+        else:
+            return end
+        position = end + 1
+    return None
+
+
+def shift_positions(node, lines, characters):
+    """Desloca `lineno` e `lexpos` de `node` e dos seus descendentes."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if node is None:
+            continue
+        if getattr(node, "lineno", None) is not None:
+            node.lineno += lines
+        if getattr(node, "lexpos", None) is not None:
+            node.lexpos += characters
+        stack.extend(getattr(node, field) for field in CHILD_FIELDS[type(node)])
+
+
+def parse_statement(tokens, lexer):
+    """Analisa uma única instrução, envolvendo os seus tokens em 'programa ... fimprog'.
+
+    O parser se recupera dos erros de sintaxe e os registra em `lexer.diagnostics`;
+    nesse caso, devolve None e quem chama levanta os erros.
+    """
+    errors = len(lexer.diagnostics)
+    stream = iter([marker("PROGRAM", tokens[0]), *tokens, marker("END_PROGRAM", tokens[-1])])
+    program = get_parser().parse(lexer=lexer, tokenfunc=lambda: next(stream, None))
+    if len(lexer.diagnostics) > errors:
+        return None
+    if program is None or len(program.statements) != 1:
+        raise syntax_error()
+    return program.statements[0]
+
+
+def marker(kind, near):
+    return Token(kind, kind, near.lineno, near.lexpos)
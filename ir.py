@@ -0,0 +1,545 @@
+"""Representação intermediária (IR) de três endereços, com blocos básicos e grafo de fluxo de controle.
+
+`IRBuilder` rebaixa a AST analisada para uma `Function`: uma lista de `BasicBlock`,
+cada um com instruções de no máximo uma operação (destino, operador e até dois
+operandos) e um terminador que o liga aos sucessores. Os operandos são `Name`
+(uma variável do programa ou um temporário) ou constantes do Python (int, float
+e str). As conversões implícitas da linguagem ficam explícitas: '/' entre
+inteiros vira '//', constantes inteiras em operações decimais viram decimais e
+a atribuição de um inteiro a uma variável decimal passa por 'float'.
+
+Os terminadores guardam a forma do 'se' ou do laço de origem (`kind`, `join`),
+para que o gerador de código reconstrua o código estruturado a partir do grafo.
+As instruções, os `Branch` e os `RangeLoop` guardam em `line` a linha do código-fonte
+da instrução da linguagem de que vieram (None nos nós criados sem posição).
+As análises e otimizações de fluxo de dados estão em ir_optimizer.py; dump()
+escreve a IR em texto para inspeção.
+"""
+from astcode import ProgramNode, DeclarationNode, AssignmentNode, WriteNode, ReadNode, IfNode, WhileNode, BinaryOpNode, VariableNode, ComparisonNode, ForNode, RangeForNode, DispatchTable, walk, evaluate
+from flat_ast import FlatAST
+
+LITERAL_TYPES = {int: "inteiro", float: "decimal", str: "texto"}
+
+# Conversão aplicada ao resultado de leia(), conforme o tipo da variável.
+READ_CONVERSIONS = {"inteiro": "inteiro", "decimal": "decimal"}
+
+# Operações: `target = left op right` (aritméticas e comparações), cópia, conversão
+# para decimal, leitura, escrita e declaração (sem efeito na execução).
+ARITHMETIC = ("+", "-", "*", "/", "//")
+COMPARISONS = ("<", ">", "<=", ">=", "==", "!=")
+COPY = "copy"
+TO_FLOAT = "float"
+READ = "read"
+WRITE = "write"
+DECLARE = "declare"
+
+# Operações sem efeito além do valor do destino (eliminação de código morto e de subexpressões comuns).
+PURE = frozenset(ARITHMETIC + COMPARISONS + (COPY, TO_FLOAT))
+
+# Separa o nome de uma variável do número da declaração quando outra de mesmo nome
+# já existe ('aˍ1', 'aˍ2'). É uma letra, válida em identificadores do Python, e os
+# identificadores da linguagem são só ASCII, então não há colisão.
+VERSION_SEPARATOR = "ˍ"
+
+
+class Name:
+    """Variável do programa, identificada pelo nome usado no código gerado, ou temporário da IR.
+
+    `symbol` é o símbolo do `Resolver` da declaração da variável (None nos
+    temporários e nas variáveis de uma AST não resolvida).
+    """
+    __slots__ = ("name", "type", "temporary", "symbol")
+
+    def __init__(self, name, type=None, temporary=False, symbol=None):
+        self.name = name
+        self.type = type
+        self.temporary = temporary
+        self.symbol = symbol
+
+    def __repr__(self):
+        return self.name
+
+
+class Instruction:
+    """`target = left op right`; `right` (e `target`, em 'write') ficam None quando não se aplicam.
+
+    Em 'read', `left` é a conversão do valor lido ('inteiro', 'decimal' ou None); em
+    'declare', o tipo declarado. `line` é a linha do código-fonte.
+    """
+    __slots__ = ("op", "target", "left", "right", "line")
+
+    def __init__(self, op, target=None, left=None, right=None, line=None):
+        self.op = op
+        self.target = target
+        self.left = left
+        self.right = right
+        self.line = line
+
+    def uses(self):
+        """Os `Name` lidos pela instrução."""
+        if self.op in (READ, DECLARE):
+            return ()
+        return [value for value in (self.left, self.right) if type(value) is Name]
+
+    def defines(self):
+        """O `Name` escrito pela instrução, ou None."""
+        return None if self.op in (WRITE, DECLARE) else self.target
+
+    def __repr__(self):
+        return format_instruction(self)
+
+
+class Jump:
+    """Desvio incondicional para `target`."""
+    __slots__ = ("target",)
+
+    def __init__(self, target):
+        self.target = target
+
+    def successors(self):
+        return (self.target,)
+
+    def uses(self):
+        return ()
+
+    def defines(self):
+        return None
+
+
+class Branch:
+    """Desvio para `then` se `condition` for verdadeira, senão para `otherwise`.
+
+    `kind` é "if" ou "while". Em um 'se', `join` é o bloco onde os dois caminhos
+    se reencontram (`otherwise` é `join` quando não há 'senao'); em um laço, o
+    bloco é o cabeçalho (alvo do fim do corpo) e `join` é a saída.
+    """
+    __slots__ = ("condition", "then", "otherwise", "kind", "join", "line")
+
+    def __init__(self, condition, then, otherwise, kind, join, line=None):
+        self.condition = condition
+        self.then = then
+        self.otherwise = otherwise
+        self.kind = kind
+        self.join = join
+        self.line = line
+
+    def successors(self):
+        return (self.then, self.otherwise)
+
+    def uses(self):
+        return (self.condition,) if type(self.condition) is Name else ()
+
+    def defines(self):
+        return None
+
+
+class RangeLoop:
+    """Entrada de 'for variable in range(start, stop, step)': o limite é avaliado uma vez, aqui.
+
+    O fim do corpo desvia para `header`, cujo terminador (`NextItem`) passa ao
+    próximo valor ou sai para `exit`. Sem nenhuma iteração, `variable` não muda:
+    para as análises, ela é lida e escrita (talvez) aqui e em `header`.
+    """
+    __slots__ = ("variable", "start", "stop", "step", "body", "exit", "header", "line")
+
+    def __init__(self, variable, start, stop, step, body, exit, header, line=None):
+        self.variable = variable
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.body = body
+        self.exit = exit
+        self.header = header
+        self.line = line
+
+    def successors(self):
+        return (self.body, self.exit)
+
+    def uses(self):
+        return [value for value in (self.start, self.stop, self.variable) if type(value) is Name]
+
+    def defines(self):
+        return self.variable
+
+
+class NextItem:
+    """Próximo valor do range de `loop` (um `RangeLoop`): volta ao corpo ou sai do laço."""
+    __slots__ = ("loop",)
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def successors(self):
+        return (self.loop.body, self.loop.exit)
+
+    def uses(self):
+        return (self.loop.variable,)
+
+    def defines(self):
+        return self.loop.variable
+
+
+class BasicBlock:
+    """Sequência de instruções sem desvios, terminada por `terminator` (None no fim da função)."""
+    __slots__ = ("index", "instructions", "terminator", "predecessors")
+
+    def __init__(self, index):
+        self.index = index
+        self.instructions = []
+        self.terminator = None
+        self.predecessors = []
+
+    @property
+    def successors(self):
+        return self.terminator.successors() if self.terminator is not None else ()
+
+    def __repr__(self):
+        return f"b{self.index}"
+
+
+class Function:
+    """Grafo de fluxo de controle: `blocks` em ordem de criação, começando por `entry`.
+
+    `variables` são as variáveis do programa referidas, que continuam vivas ao fim
+    da função (o estado final é observável; os temporários, não).
+    """
+    __slots__ = ("blocks", "entry", "variables")
+
+    def __init__(self):
+        self.blocks = []
+        self.entry = None
+        self.variables = []
+
+    def link(self):
+        """Recalcula os predecessores de cada bloco a partir dos terminadores."""
+        for block in self.blocks:
+            block.predecessors = []
+        for block in self.blocks:
+            for successor in block.successors:
+                successor.predecessors.append(block)
+
+    def use_counts(self):
+        """Número de leituras de cada `Name`, nas instruções e nos terminadores."""
+        counts = {}
+        get = counts.get
+        for block in self.blocks:
+            for instruction in block.instructions:
+                if instruction.op in (READ, DECLARE):
+                    continue
+                left, right = instruction.left, instruction.right
+                if type(left) is Name:
+                    counts[left] = get(left, 0) + 1
+                if type(right) is Name:
+                    counts[right] = get(right, 0) + 1
+            if block.terminator is not None:
+                for name in block.terminator.uses():
+                    counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+class IRBuilder:
+    """Rebaixa a AST (anotada ou não pelo analisador semântico) para a IR.
+
+    Os percursos usam `astcode.walk` e `astcode.evaluate`, como os demais: os
+    manipuladores de instruções entregam os blocos aninhados com `yield` e os de
+    expressões devolvem o operando que guarda o valor. As variáveis e a numeração
+    dos temporários são mantidas entre chamadas de lower(), de modo que trechos
+    do mesmo programa rebaixados em separado (streaming.py) não colidem.
+
+    Com os símbolos ligados pelo `Resolver`, cada declaração tem o seu `Name`, com o
+    seu tipo: uma declaração que esconde ou repete outra de mesmo nome é outra
+    variável, com o número da declaração no nome (VERSION_SEPARATOR). Os nós sem
+    símbolo são ligados pelo nome.
+
+    `line` é a linha da instrução da linguagem sendo rebaixada, atualizada antes de
+    cada manipulador de instrução (veja located()) e copiada para a IR criada.
+    """
+    def __init__(self):
+        self.variables = {}
+        self.symbols = {}
+        self.versions = {}
+        self.temporaries = 0
+        self.function = None
+        self.block = None
+        self.line = None
+
+    def lower(self, node):
+        """Devolve a `Function` de `node`: um ProgramNode, uma FlatAST ou uma instrução."""
+        if isinstance(node, FlatAST):
+            node = node.program()
+        self.function = function = Function()
+        function.entry = self.block = self.new_block()
+        walk(node, self._statement_handlers, self)
+        function.variables = list(self.variables.values())
+        function.link()
+        self.function = self.block = None
+        return function
+
+    def new_block(self):
+        block = BasicBlock(len(self.function.blocks))
+        self.function.blocks.append(block)
+        return block
+
+    def variable(self, name, var_type=None, symbol=None):
+        """O `Name` da variável `name`, ou o da declaração `symbol`."""
+        if symbol is not None:
+            value = self.symbols.get(symbol)
+            if value is None:
+                version = self.versions.get(name, 0)
+                self.versions[name] = version + 1
+                local_name = f"{name}{VERSION_SEPARATOR}{version}" if version else name
+                value = self.symbols[symbol] = self.variables[local_name] = Name(local_name, symbol.var_type,
+                                                                                 symbol=symbol)
+            return value
+        value = self.variables.get(name)
+        if value is None:
+            value = self.variables[name] = Name(name, var_type)
+            self.versions.setdefault(name, 1)
+        elif value.type is None:
+            value.type = var_type
+        return value
+
+    def temporary(self, var_type=None):
+        self.temporaries += 1
+        return Name(f"%{self.temporaries}", var_type, True)
+
+    def append(self, op, target=None, left=None, right=None):
+        self.block.instructions.append(Instruction(op, target, left, right, self.line))
+
+    def compute(self, op, left, right=None, var_type=None):
+        """Acrescenta `temporário = left op right` e devolve o temporário."""
+        target = self.temporary(var_type)
+        self.append(op, target, left, right)
+        return target
+
+    def assign(self, target, value):
+        """`target = value`; um temporário recém-calculado passa a escrever direto em `target`."""
+        instructions = self.block.instructions
+        if type(value) is Name and value.temporary and instructions and instructions[-1].target is value:
+            instructions[-1].target = target
+        else:
+            self.append(COPY, target, value)
+
+    def terminate(self, terminator):
+        self.block.terminator = terminator
+
+    def lower_program(self, node):
+        yield node.statements
+
+    def lower_declaration(self, node):
+        self.append(DECLARE, self.variable(node.var_name, node.var_type, node.symbol), node.var_type)
+
+    def lower_assignment(self, node):
+        value = self.lower_expression(node.expression)
+        self.assign(self.variable(node.var_name, node.resolved_type, node.symbol),
+                    self.coerce(node.expression, value, node.resolved_type))
+
+    def lower_write(self, node):
+        if isinstance(node.expression, list):
+            raise TypeError("Erro: 'WriteNode.expression' deveria ser um único valor, não uma lista.")
+        self.append(WRITE, None, self.lower_expression(node.expression))
+
+    def lower_read(self, node):
+        target = self.variable(node.var_name, node.resolved_type, node.symbol)
+        self.append(READ, target, READ_CONVERSIONS.get(node.resolved_type))
+
+    def lower_if(self, node):
+        yield from self.lower_if_branches(self.lower_expression(node.condition), node)
+
+    def lower_if_branches(self, condition, node):
+        then = self.new_block()
+        otherwise = self.new_block() if node.else_branch else None
+        join = self.new_block()
+        self.terminate(Branch(condition, then, otherwise or join, "if", join, self.line))
+        self.block = then
+        yield node.then_branch
+        self.terminate(Jump(join))
+        if otherwise is not None:
+            self.block = otherwise
+            yield node.else_branch
+            self.terminate(Jump(join))
+        self.block = join
+
+    def lower_while(self, node):
+        yield from self.lower_loop(node.condition, node.body)
+
+    def lower_for(self, node):
+        """'para' genérico: a atribuição inicial seguida de um laço que executa o passo no fim do corpo."""
+        yield node.init
+        body = node.body if isinstance(node.body, list) else [node.body]
+        yield from self.lower_loop(node.condition, body + [node.update])
+
+    def loop_header(self):
+        """Começa o cabeçalho de um laço, alvo do fim do corpo."""
+        header = self.new_block()
+        self.terminate(Jump(header))
+        self.block = header
+        return header
+
+    def lower_loop(self, condition, body):
+        header = self.loop_header()
+        yield from self.lower_loop_body(header, self.lower_expression(condition), body)
+
+    def lower_loop_body(self, header, condition, body):
+        block, exit = self.new_block(), self.new_block()
+        self.terminate(Branch(condition, block, exit, "while", exit, self.line))
+        self.block = block
+        yield body
+        self.terminate(Jump(header))
+        self.block = exit
+
+    def lower_range_for(self, node):
+        start = self.lower_expression(node.start)
+        stop = self.lower_expression(node.stop)
+        header, body, exit = self.new_block(), self.new_block(), self.new_block()
+        loop = RangeLoop(self.variable(node.variable, "inteiro", node.symbol), start, stop, node.step, body, exit,
+                         header, self.line)
+        self.terminate(loop)
+        header.terminator = NextItem(loop)
+        self.block = body
+        yield node.body
+        self.terminate(Jump(header))
+        self.block = exit
+
+    def lower_expression(self, expression):
+        return evaluate(expression, self._expression_handlers, self)
+
+    def lower_binary_op(self, expression, left, right):
+        return self.binary_op(expression, left, right)
+
+    def binary_op(self, expression, left, right):
+        """Operação especializada pelo tipo resolvido: constantes decimais e '//' entre inteiros."""
+        operator = expression.operator
+        if expression.resolved_type == "decimal":
+            left = float(left) if type(left) is int else left
+            right = float(right) if type(right) is int else right
+        elif expression.resolved_type == "inteiro" and operator == "/":
+            operator = "//"
+        return self.compute(operator, left, right, expression.resolved_type)
+
+    def coerce(self, expression, value, target_type):
+        """Converte um valor inteiro atribuído a uma variável decimal."""
+        if target_type == "decimal" and self.type_of(expression) == "inteiro":
+            return float(value) if type(value) is int else self.compute(TO_FLOAT, value, var_type="decimal")
+        return value
+
+    def type_of(self, expression):
+        literal_type = LITERAL_TYPES.get(type(expression))
+        return literal_type or getattr(expression, "resolved_type", None)
+
+    def lower_variable(self, expression):
+        return self.variable(expression.var_name, expression.resolved_type, expression.symbol)
+
+    def lower_comparison(self, expression, left, right):
+        return self.compute(expression.operator, left, right, expression.resolved_type)
+
+    def lower_literal(self, expression):
+        return expression
+
+    # Manipuladores por tipo de nó; subclasses podem sobrescrever os métodos nomeados aqui.
+    STATEMENT_HANDLERS = {
+        ProgramNode: "lower_program",
+        DeclarationNode: "lower_declaration",
+        AssignmentNode: "lower_assignment",
+        WriteNode: "lower_write",
+        ReadNode: "lower_read",
+        IfNode: "lower_if",
+        WhileNode: "lower_while",
+        ForNode: "lower_for",
+        RangeForNode: "lower_range_for",
+    }
+
+    EXPRESSION_HANDLERS = {
+        BinaryOpNode: "lower_binary_op",
+        VariableNode: "lower_variable",
+        ComparisonNode: "lower_comparison",
+        int: "lower_literal",
+        float: "lower_literal",
+        str: "lower_literal",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.bind_handlers()
+
+    @classmethod
+    def bind_handlers(cls):
+        handlers = DispatchTable.bind(cls, cls.STATEMENT_HANDLERS)
+        cls._statement_handlers = DispatchTable({node_type: located(handler) for node_type, handler in handlers.items()})
+        cls._expression_handlers = DispatchTable.bind(cls, cls.EXPRESSION_HANDLERS)
+
+
+def located(handler):
+    """Envolve um manipulador de instrução: a linha do nó (quando tem) passa a ser `owner.line`.
+
+    Os nós sem posição, como os criados pelas otimizações, ficam com a linha da
+    instrução rebaixada antes deles.
+    """
+    def lower_located(owner, node):
+        line = getattr(node, "lineno", None)
+        if line is not None:
+            owner.line = line
+        return handler(owner, node)
+    return lower_located
+
+
+IRBuilder.bind_handlers()
+
+
+def format_operand(value):
+    return value.name if type(value) is Name else repr(value)
+
+
+def format_instruction(instruction):
+    op, target, left, right = instruction.op, instruction.target, instruction.left, instruction.right
+    if op == DECLARE:
+        return f"{left} {target.name}"
+    if op == WRITE:
+        return f"escreva {format_operand(left)}"
+    if op == READ:
+        return f"leia {target.name}" + (f" ({left})" if left else "")
+    if op == COPY:
+        return f"{target.name} = {format_operand(left)}"
+    if op == TO_FLOAT:
+        return f"{target.name} = float {format_operand(left)}"
+    return f"{target.name} = {format_operand(left)} {op} {format_operand(right)}"
+
+
+def format_terminator(terminator):
+    if isinstance(terminator, Jump):
+        return f"vá para {terminator.target}"
+    if isinstance(terminator, Branch):
+        label = "se" if terminator.kind == "if" else "enquanto"
+        return (f"{label} {format_operand(terminator.condition)} vá para {terminator.then} "
+                f"senão {terminator.otherwise}  (junção {terminator.join})")
+    if isinstance(terminator, RangeLoop):
+        step = f", {terminator.step}" if terminator.step != 1 else ""
+        return (f"{terminator.variable.name} em range({format_operand(terminator.start)}, "
+                f"{format_operand(terminator.stop)}{step}) vá para {terminator.body} senão {terminator.exit}")
+    if isinstance(terminator, NextItem):
+        loop = terminator.loop
+        return f"próximo {loop.variable.name} vá para {loop.body} senão {loop.exit}"
+    return "fim"
+
+
+def dump(function):
+    """Texto da IR: cada bloco com os predecessores, as instruções e o terminador.
+
+        b0:
+            inteiro i
+            i = 0
+            vá para b1
+        b1:  # de b0, b2
+            %1 = i < 10
+            enquanto %1 vá para b2 senão b3  (junção b3)
+    """
+    lines = []
+    for block in function.blocks:
+        header = f"{block}:"
+        if block.predecessors:
+            header += "  # de " + ", ".join(map(repr, block.predecessors))
+        lines.append(header)
+        for instruction in block.instructions:
+            lines.append(f"    {format_instruction(instruction)}")
+        lines.append(f"    {format_terminator(block.terminator)}")
+    return "\n".join(lines)
@@ -0,0 +1,330 @@
+"""Análises e otimizações de fluxo de dados sobre a IR (ir.py), aplicadas em -O2.
+
+    liveness()       - variáveis vivas na saída de cada bloco (análise para trás);
+    propagação de cópias - depois de 'x = y', os usos de x passam a ler y enquanto
+                       a cópia estiver disponível em todos os caminhos até eles;
+    subexpressões comuns - dentro de um bloco, uma operação já calculada com os
+                       mesmos operandos vira cópia do resultado anterior;
+    código morto     - remove operações puras cujo destino não é lido depois, nem
+                       por outra instrução que também será removida, e os 'se'
+                       que ficaram sem nenhuma instrução nos dois ramos.
+
+As variáveis do programa continuam vivas no fim da função, de modo que o estado
+final observável não muda. As instruções são alteradas no lugar; o grafo de
+fluxo de controle só muda quando um 'se' vazio vira um desvio direto para a junção.
+"""
+from ir import Name, Jump, Branch, RangeLoop, PURE, COPY, READ, DECLARE
+
+CHANGE_LABELS = {
+    "common": "subexpressões comuns reaproveitadas",
+    "copies": "usos substituídos por propagação de cópias",
+    "dead": "instruções mortas removidas",
+    "branches": "'se' sem nenhuma instrução nos ramos removidos",
+}
+
+DIVISIONS = ("/", "//")
+
+
+def operand_key(value):
+    """Chave de um operando: o próprio `Name`, ou tipo e texto da constante (1, 1.0 e -0.0 diferem)."""
+    return value if type(value) is Name else (type(value), repr(value))
+
+
+def can_drop(instruction):
+    """Uma instrução pode ser descartada se é pura e não tem como falhar na execução (como em optimizer.can_drop)."""
+    if instruction.op not in PURE:
+        return False
+    if instruction.op in DIVISIONS:
+        right = instruction.right
+        return type(right) is not Name and right != 0
+    return True
+
+
+class NameBits(dict):
+    """Numera os `Name` em bits, para as análises guardarem conjuntos como inteiros."""
+    def __missing__(self, name):
+        bit = self[name] = 1 << len(self)
+        return bit
+
+    def mask(self, names):
+        bits = 0
+        for name in names:
+            bits |= self[name]
+        return bits
+
+
+def block_steps(block):
+    return block.instructions + [block.terminator] if block.terminator is not None else block.instructions
+
+
+def skip_empty(block):
+    """O primeiro bloco com instruções (ou outro terminador) seguindo os desvios a partir de `block`."""
+    while not block.instructions and isinstance(block.terminator, Jump):
+        block = block.terminator.target
+    return block
+
+
+def reverse_postorder(function):
+    """Blocos alcançáveis a partir da entrada, cada um antes dos seus sucessores (exceto nas arestas de volta)."""
+    order, visited = [], {function.entry}
+    stack = [(function.entry, iter(function.entry.successors))]
+    while stack:
+        block, successors = stack[-1]
+        for successor in successors:
+            if successor not in visited:
+                visited.add(successor)
+                stack.append((successor, iter(successor.successors)))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def meet(states, blocks):
+    """Interseção dos estados de `blocks` já calculados (None, ainda não calculado, é neutro)."""
+    result = None
+    for block in blocks:
+        state = states[block]
+        if state is not None:
+            result = state if result is None else result & state
+    return result
+
+
+def live_before(block, live, bits, faint=False, dead=None):
+    """Percorre o bloco de trás para frente a partir de `live` (as vivas na saída) e devolve as vivas na entrada.
+
+    Com `faint`, uma instrução descartável cujo destino está morto não conta os
+    seus operandos como lidos (e vai para `dead`, quando é uma lista): assim uma
+    cadeia de cópias e contas que só alimentam código morto morre de uma vez.
+    Os nomes sem bit em `bits` só vivem dentro do bloco e ficam em um conjunto.
+    """
+    local = set()
+    terminator = block.terminator
+    for step in reversed(block_steps(block)):
+        target = step.defines()
+        if target is not None:
+            bit = bits.get(target, 0)
+            if faint and step is not terminator and (
+                    (step.op == COPY and step.left is target)
+                    or (not (live & bit if bit else target in local) and can_drop(step))):
+                if dead is not None:
+                    dead.append(step)
+                continue
+            if bit:
+                live &= ~bit
+            else:
+                local.discard(target)
+        for name in step.uses():
+            bit = bits.get(name, 0)
+            if bit:
+                live |= bit
+            else:
+                local.add(name)
+    return live
+
+
+def liveness(function, faint=False):
+    """Devolve (bits, {bloco: variáveis vivas na saída}), com os conjuntos em bits de `bits`, até o ponto fixo.
+
+    Só recebem bit as variáveis do programa, vivas no fim da função, e os nomes
+    lidos em algum bloco antes de serem escritos nele: os demais, quase todos
+    temporários, nunca estão vivos entre blocos. Um `RangeLoop` (e o seu
+    `NextItem`) lê a variável do laço além de escrevê-la: sem nenhuma iteração,
+    ela mantém o valor anterior. `faint` é repassado a live_before().
+    """
+    bits = NameBits()
+    at_exit = bits.mask(function.variables)
+    for block in function.blocks:
+        defined = set()
+        for step in block_steps(block):
+            for name in step.uses():
+                if name not in defined and name not in bits:
+                    bits[name]
+            target = step.defines()
+            if target is not None:
+                defined.add(target)
+
+    # Os blocos saem da pilha em pós-ordem: os sucessores antes, fora as arestas de volta.
+    order = reverse_postorder(function)
+    reachable = set(order)
+    worklist = [block for block in function.blocks if block not in reachable] + order
+    pending = set(worklist)
+    live_in = dict.fromkeys(function.blocks, 0)
+    live_out = dict.fromkeys(function.blocks, 0)
+    while worklist:
+        block = worklist.pop()
+        pending.discard(block)
+        successors = block.successors
+        out = at_exit
+        if successors:
+            out = 0
+            for successor in successors:
+                out |= live_in[successor]
+        live_out[block] = out
+        incoming = live_before(block, out, bits, faint)
+        if incoming != live_in[block]:
+            live_in[block] = incoming
+            for predecessor in block.predecessors:
+                if predecessor not in pending:
+                    pending.add(predecessor)
+                    worklist.append(predecessor)
+    return bits, live_out
+
+
+class IROptimizer:
+    """Otimiza uma `ir.Function` no lugar e contabiliza as mudanças em `changes`."""
+    def __init__(self):
+        self.changes = dict.fromkeys(CHANGE_LABELS, 0)
+
+    def optimize(self, function):
+        for block in function.blocks:
+            self.eliminate_common(block)
+        self.propagate_copies(function)
+        self.eliminate_dead(function)
+        if self.remove_empty_branches(function):
+            self.eliminate_dead(function)
+        return function
+
+    def report(self):
+        """Resumo legível das mudanças feitas."""
+        lines = ["Otimizações da IR:"]
+        for key, label in CHANGE_LABELS.items():
+            lines.append(f"  {self.changes[key]:6d} {label}")
+        return "\n".join(lines)
+
+    def eliminate_common(self, block):
+        """Numeração de valores local: reaproveita operações puras já calculadas no bloco."""
+        available = {}
+        dependents = {}
+        for instruction in block.instructions:
+            op, target = instruction.op, instruction.target
+            key = None
+            if op in PURE and op != COPY:
+                key = (op, operand_key(instruction.left), operand_key(instruction.right))
+                holder = available.get(key)
+                if holder is not None and holder is not target:
+                    instruction.op, instruction.left, instruction.right = COPY, holder, None
+                    self.changes["common"] += 1
+                    key = None
+            defined = instruction.defines()
+            if defined is None:
+                continue
+            for stale in dependents.pop(defined, ()):
+                available.pop(stale, None)
+            if key is not None and defined not in (instruction.left, instruction.right):
+                available[key] = defined
+                for name in (instruction.left, instruction.right, defined):
+                    if type(name) is Name:
+                        dependents.setdefault(name, []).append(key)
+
+    def propagate_copies(self, function):
+        """Propagação global de cópias: análise para frente com interseção nos pontos de junção.
+
+        Cada instrução 'x = y' é um bit; escrever x ou y invalida as cópias que os
+        envolvem. Os usos de x passam a ler a origem original da cópia, mesmo que a
+        própria cópia tenha sido reescrita antes.
+        """
+        copy_bits, kills, by_target = {}, {}, {}
+        for block in function.blocks:
+            for instruction in block.instructions:
+                target, source = instruction.target, instruction.left
+                if instruction.op == COPY and source is not target:
+                    bit = copy_bits[instruction] = 1 << len(copy_bits)
+                    kills[target] = kills.get(target, 0) | bit
+                    if type(source) is Name:
+                        kills[source] = kills.get(source, 0) | bit
+                    by_target.setdefault(target, []).append((bit, source))
+        if not copy_bits:
+            return
+
+        summaries = {}
+        for block in function.blocks:
+            generated, killed = 0, 0
+            for step in block_steps(block):
+                target = step.defines()
+                if target is not None:
+                    mask = kills.get(target, 0)
+                    generated &= ~mask
+                    killed |= mask
+                    generated |= copy_bits.get(step, 0)
+            summaries[block] = generated, ~killed
+
+        entry = function.entry
+        order = reverse_postorder(function)
+        incoming = dict.fromkeys(function.blocks)
+        outgoing = dict.fromkeys(function.blocks)
+        changed = True
+        while changed:
+            changed = False
+            for block in order:
+                state = 0 if block is entry else meet(outgoing, block.predecessors)
+                incoming[block] = state
+                generated, kept = summaries[block]
+                state = generated | (state & kept)
+                if state != outgoing[block]:
+                    outgoing[block] = state
+                    changed = True
+
+        for block in function.blocks:
+            state = incoming[block]
+            if state is None:
+                continue  # bloco inalcançável
+            for instruction in block.instructions:
+                if instruction.op not in (READ, DECLARE):
+                    instruction.left = self.replace(state, instruction.left, by_target)
+                    instruction.right = self.replace(state, instruction.right, by_target)
+                target = instruction.defines()
+                if target is not None:
+                    state = (state & ~kills.get(target, 0)) | copy_bits.get(instruction, 0)
+            terminator = block.terminator
+            if isinstance(terminator, Branch):
+                terminator.condition = self.replace(state, terminator.condition, by_target)
+            elif isinstance(terminator, RangeLoop):
+                terminator.start = self.replace(state, terminator.start, by_target)
+                terminator.stop = self.replace(state, terminator.stop, by_target)
+
+    def replace(self, state, value, by_target):
+        if type(value) is not Name:
+            return value
+        for bit, source in by_target.get(value, ()):
+            if state & bit:
+                self.changes["copies"] += 1
+                return source
+        return value
+
+    def eliminate_dead(self, function):
+        """Remove as instruções puras cujo destino não é lido depois, e as cópias de uma variável para ela mesma."""
+        bits, live_out = liveness(function, faint=True)
+        for block in function.blocks:
+            dead = []
+            live_before(block, live_out[block], bits, True, dead)
+            if dead:
+                dead = set(dead)
+                block.instructions = [instruction for instruction in block.instructions if instruction not in dead]
+                self.changes["dead"] += len(dead)
+
+    def remove_empty_branches(self, function):
+        """Troca por um desvio para a junção os 'se' cujos ramos chegam nela sem nenhuma instrução.
+
+        A condição continua calculada no bloco (e sai na eliminação de código morto
+        seguinte, se puder). Os blocos em pós-ordem tratam os 'se' internos antes
+        dos externos; os blocos que ficam inalcançáveis saem da função.
+        """
+        removed = 0
+        for block in reversed(reverse_postorder(function)):
+            terminator = block.terminator
+            if (isinstance(terminator, Branch) and terminator.kind == "if"
+                    and skip_empty(terminator.then) is terminator.join
+                    and skip_empty(terminator.otherwise) is terminator.join):
+                block.terminator = Jump(terminator.join)
+                removed += 1
+        if removed:
+            function.blocks = reverse_postorder(function)
+            function.blocks.sort(key=lambda block: block.index)
+            for index, block in enumerate(function.blocks):
+                block.index = index
+            function.link()
+            self.changes["branches"] += removed
+        return removed
@@ -1,5 +1,12 @@
+import re
+import sys
+from collections import namedtuple
+from functools import partial
+
 import ply.lex as lex
 
+from diagnostics import Diagnostic
+
 tokens = [
     'ID', 'NUMBER', 'ASSIGN', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE',
     'LPAREN', 'RPAREN', 'SEMI', 'LT', 'GT', 'EQ', 'NE', 'LE', 'GE', 'STRING'
@@ -53,24 +60,114 @@ def t_newline(t):
     t.lexer.lineno += len(t.value)
 
 def t_error(t):
-    print(f"Caractere ilegal: {t.value[0]}")
+    t.lexer.diagnostics.append(Diagnostic(f"Caractere ilegal: {t.value[0]}", t.lineno, t.lexpos).locate(t.lexer.lexdata))
     t.lexer.skip(1)
 
-def create_lexer():
-    return lex.lex()
-
-def t_IF(t):
-    r'se'
-    t.type = 'IF'
-    return t
-
-def t_ELSE(t):
-    r'senao'
-    t.type = 'ELSE'
-    return t
-
 def t_STRING(t):
     r'\"[^\"\n]*\"'
     t.value = t.value[1:-1]  
     return t
 
+
+# Operadores e pontuação, do texto ao tipo do token.
+operators = {
+    ':=': 'ASSIGN', '+': 'PLUS', '-': 'MINUS', '*': 'TIMES', '/': 'DIVIDE',
+    '(': 'LPAREN', ')': 'RPAREN', ';': 'SEMI', '<': 'LT', '>': 'GT',
+    '==': 'EQ', '!=': 'NE', '<=': 'LE', '>=': 'GE',
+}
+
+# Uma única expressão para todos os tokens: os espaços antes do token e o token, que é
+# uma sequência de quebras de linha, um nome, um número, um texto, um operador (os de
+# dois caracteres antes dos de um) ou, no último caso, um caractere ilegal (nunca um
+# espaço: os do fim da entrada ficam sem token). As regras são as mesmas das t_* acima.
+SCANNER_PATTERN = re.compile(r'([ \t]*)(\n+|[a-zA-Z_][a-zA-Z_0-9]*|\d+(?:\.\d+)?|"[^"\n]*"|:=|==|!=|<=|>=|[^ \t])')
+
+NAME_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+
+# Caracteres analisados por chamada de findall(); o trecho termina em uma quebra de linha.
+SCANNER_CHUNK = 1 << 16
+
+
+class Token(namedtuple("Token", ("type", "value", "lineno", "lexpos"))):
+    """Token compacto, com os mesmos atributos do LexToken do PLY.
+
+    Sem __slots__, para que o parser possa anotar `lexer` no token de um erro de sintaxe.
+    """
+    def __repr__(self):
+        return f"Token({self[0]},{self[1]!r},{self[2]},{self[3]})"
+
+
+class Scanner:
+    """Analisador léxico escrito à mão, com a interface do lexer do PLY usada pelo parser.
+
+    Produz os mesmos tokens e diagnósticos, na mesma ordem, com uma expressão
+    regular só: findall() percorre um trecho do texto em C e as posições saem dos
+    comprimentos, sem um objeto `Match` por token. O tipo e o valor de cada nome,
+    número e operador já visto saem de um dicionário, e os identificadores são
+    internados. Devolve `Token` em vez de LexToken.
+    """
+    def __init__(self):
+        self.lexdata = ""
+        self.lexpos = 0
+        self.lineno = 1
+        self.diagnostics = []
+
+    def input(self, data):
+        """Começa a analisar `data`; como no PLY, `lineno` continua de onde estava."""
+        self.lexdata = data
+        self.lexpos = 0
+        # token() passa a ser o próximo item do gerador, sem uma chamada de método Python.
+        self.token = partial(next, self.scan(data), None)
+
+    def token(self):
+        """Próximo token; None antes de input() e ao fim da entrada."""
+        return None
+
+    def scan(self, data):
+        new = tuple.__new__
+        findall = SCANNER_PATTERN.findall
+        # Texto -> (tipo, valor) dos operadores, nomes e números; vale só para esta entrada.
+        known = {text: (kind, text) for text, kind in operators.items()}
+        lineno = self.lineno
+        pos = 0
+        size = len(data)
+        while pos < size:
+            end = data.find("\n", pos + SCANNER_CHUNK) + 1 or size
+            for space, text in findall(data, pos, end):
+                start = pos + len(space)
+                pos = start + len(text)
+                entry = known.get(text)
+                if entry is None:
+                    first = text[0]
+                    if first == "\n":
+                        self.lineno = lineno = lineno + len(text)
+                        continue
+                    if first in NAME_START:
+                        text = sys.intern(text)
+                        entry = known[text] = (reserved.get(text, 'ID'), text)
+                    elif first.isdecimal():  # o \d da expressão
+                        entry = known[text] = ('NUMBER', float(text) if '.' in text else int(text))
+                    elif first == '"' and len(text) > 1:
+                        entry = ('STRING', text[1:-1])
+                    else:
+                        diagnostic = Diagnostic(f"Caractere ilegal: {text}", lineno, start)
+                        self.diagnostics.append(diagnostic.locate(data))
+                        continue
+                self.lexpos = pos
+                yield new(Token, (entry[0], entry[1], lineno, start))
+            pos = end
+        self.lexpos = size + 1  # como no PLY, ao fim da entrada
+
+
+def create_ply_lexer():
+    return lex.lex(module=sys.modules[__name__])
+
+
+LEXERS = {"scanner": Scanner, "ply": create_ply_lexer}
+
+
+def create_lexer(kind="scanner"):
+    """Cria o lexer `kind` ("scanner" ou "ply"); os erros léxicos e sintáticos são registrados na sua lista `diagnostics`."""
+    lexer = LEXERS[kind]()
+    lexer.diagnostics = []
+    return lexer
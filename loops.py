@@ -0,0 +1,201 @@
+"""Análise de laços: reescreve laços com variável de indução como laços contados.
+
+Um 'para (v := i; v < B; v := v + c) corpo' em que `v` é inteira, `B` não muda
+dentro do laço, `c` é uma constante inteira no sentido da comparação e o corpo
+não altera `v` vira um `RangeForNode`, gerado como 'for v in range(v, B, c)'.
+Um 'enquanto (v < B) v := v + c;' é resolvido em forma fechada, sem laço.
+
+Roda depois da análise semântica, da qual depende para os tipos anotados, e do
+`Optimizer` (níveis -O1 e acima). Os demais laços ficam como estão e são gerados
+como 'while'. Como no `Optimizer`, `v` é identificada pelo símbolo: a inicialização,
+a condição e o passo precisam se referir à mesma declaração.
+"""
+from astcode import AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, RangeForNode, VariableNode, ComparisonNode, DispatchTable, transform
+from flat_ast import FlatAST
+from optimizer import read_names, assigned_names, variable_key
+
+CHANGE_LABELS = {
+    "ranges": "laços 'para' convertidos em range()",
+    "closed_forms": "laços 'enquanto' resolvidos em forma fechada",
+}
+
+# Comparação equivalente com os operandos trocados ('B > v' é 'v < B').
+FLIPPED = {"<": ">", ">": "<", "<=": ">=", ">=": "<="}
+
+# Sentido do passo exigido por cada comparação e ajuste do limite para torná-lo exclusivo.
+DIRECTIONS = {"<": (1, 0), "<=": (1, 1), ">": (-1, 0), ">=": (-1, -1)}
+
+
+class LoopLowering:
+    """Converte laços com variável de indução e contabiliza as mudanças em `changes`."""
+    def __init__(self):
+        self.changes = dict.fromkeys(CHANGE_LABELS, 0)
+
+    def lower(self, program):
+        """Reescreve os laços do programa e o devolve (uma FlatAST é convertida para árvore antes)."""
+        if isinstance(program, FlatAST):
+            program = program.to_tree()
+        program.statements = self.lower_block(program.statements)
+        return program
+
+    def lower_block(self, statements):
+        if not isinstance(statements, list):
+            statements = [statements]
+        return transform(statements, self._statement_handlers, self)
+
+    def lower_statements(self, statements):
+        result = []
+        for statement in statements:
+            result.extend((yield statement))
+        return result
+
+    def lower_branch(self, statements, original):
+        block = yield statements if isinstance(statements, list) else [statements]
+        if isinstance(original, list) or len(block) != 1:
+            return block
+        return block[0]
+
+    def keep_statement(self, node):
+        return [node]
+
+    def lower_if(self, node):
+        node.then_branch = yield node.then_branch
+        if node.else_branch:
+            node.else_branch = yield node.else_branch
+        return [node]
+
+    def lower_while(self, node):
+        node.body = yield from self.lower_branch(node.body, node.body)
+        body = node.body[0] if isinstance(node.body, list) and len(node.body) == 1 else node.body
+        if not isinstance(body, AssignmentNode):
+            return [node]
+        loop = induction(body, node.condition, body, [])
+        if loop is None:
+            return [node]
+        variable, stop, step = loop
+        symbol = body.symbol
+        if abs(step) == 1:
+            final = stop
+        else:
+            # v avança de |c| em |c| até sair do intervalo: k = ceil(|S - v| / |c|) passos.
+            distance = (integer(stop, "-", typed_variable(variable, symbol)) if step > 0
+                        else integer(typed_variable(variable, symbol), "-", stop))
+            steps = integer(integer(distance, "+", abs(step) - 1), "/", abs(step))
+            final = integer(typed_variable(variable, symbol), "+" if step > 0 else "-",
+                            integer(steps, "*", abs(step)))
+        self.changes["closed_forms"] += 1
+        return [located(IfNode(node.condition, [typed_assignment(variable, final, symbol)]), node)]
+
+    def lower_for(self, node):
+        node.body = yield from self.lower_branch(node.body, node.body)
+        loop = induction(node.init, node.condition, node.update, node.body)
+        if loop is None:
+            return [node]
+        variable, stop, step = loop
+        body = node.body if isinstance(node.body, list) else [node.body]
+        loop = located(RangeForNode(variable, typed_variable(variable, node.init.symbol), stop, step, body), node)
+        loop.symbol = node.init.symbol
+        self.changes["ranges"] += 1
+        # Depois do range(), v fica com o último valor visitado; o 'se' dá o passo que faltava.
+        return [node.init, loop, located(IfNode(node.condition, [node.update]), node)]
+
+    STATEMENT_HANDLERS = {
+        list: "lower_statements",
+        IfNode: "lower_if",
+        WhileNode: "lower_while",
+        ForNode: "lower_for",
+        object: "keep_statement",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.bind_handlers()
+
+    @classmethod
+    def bind_handlers(cls):
+        cls._statement_handlers = DispatchTable.bind(cls, cls.STATEMENT_HANDLERS)
+
+
+LoopLowering.bind_handlers()
+
+
+def induction(init, condition, update, body):
+    """Reconhece um laço de indução na variável atribuída por `init`.
+
+    Devolve (nome da variável, limite exclusivo, passo) ou None quando não é possível
+    provar que o laço percorre uma progressão aritmética.
+    """
+    variable = variable_key(init)
+    if not isinstance(condition, ComparisonNode) or condition.operator not in FLIPPED:
+        return None
+    operator, bound = condition.operator, condition.right
+    if not is_variable(condition.left, variable):
+        if not is_variable(condition.right, variable):
+            return None
+        operator, bound = FLIPPED[operator], condition.left
+    if not is_integer(bound) or not isinstance(update, AssignmentNode) or variable_key(update) != variable:
+        return None
+    if update.resolved_type != "inteiro":
+        return None
+
+    step = constant_step(update.expression, variable)
+    direction, adjust = DIRECTIONS[operator]
+    if step is None or step * direction <= 0:
+        return None
+    if variable in assigned_names(body) or read_names(bound) & assigned_names([body, update]):
+        return None
+
+    if adjust:
+        bound = bound + adjust if type(bound) is int else integer(bound, "+" if adjust > 0 else "-", 1)
+    return init.var_name, bound, step
+
+
+def constant_step(expression, variable):
+    """O passo `c` de 'v + c', 'c + v' ou 'v - c', com `c` constante inteira; None se não for o caso."""
+    if not isinstance(expression, BinaryOpNode) or expression.operator not in ("+", "-"):
+        return None
+    left, right = expression.left, expression.right
+    if is_variable(left, variable) and type(right) is int and right:
+        return right if expression.operator == "+" else -right
+    if expression.operator == "+" and is_variable(right, variable) and type(left) is int and left:
+        return left
+    return None
+
+
+def is_variable(expression, variable):
+    """Verifica se a expressão é um uso de `variable` (uma chave de variable_key())."""
+    return isinstance(expression, VariableNode) and variable_key(expression) == variable
+
+
+def is_integer(expression):
+    if type(expression) is int:
+        return True
+    return getattr(expression, "resolved_type", None) == "inteiro"
+
+
+def integer(left, operator, right):
+    """Operação binária já anotada como inteira ('/' é divisão inteira)."""
+    node = BinaryOpNode(left, operator, right)
+    node.resolved_type = "inteiro"
+    return node
+
+
+def typed_variable(name, symbol):
+    node = VariableNode(name)
+    node.resolved_type = "inteiro"
+    node.symbol = symbol
+    return node
+
+
+def located(node, origin):
+    """Dá a `node` a posição no código-fonte do laço `origin` que ele substitui."""
+    node.lineno = origin.lineno
+    node.lexpos = origin.lexpos
+    return node
+
+
+def typed_assignment(name, expression, symbol):
+    node = AssignmentNode(name, expression)
+    node.resolved_type = "inteiro"
+    node.symbol = symbol
+    return node
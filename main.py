@@ -1,13 +1,17 @@
-from parsercode import parser
-import ply.yacc as yacc
-from lexer import create_lexer
-from semantic import SemanticAnalyzer
-from code_generator import PythonCodeGenerator
-from astcode import ProgramNode
+import argparse
+import sys
 
+import bytecode_backend
+import c_backend
+from compiler import CompilationError, compile_source
+from ir import dump
+from lexer import LEXERS, create_lexer
+from metrics import CompilationMetrics
+from profiler import profile_source
+import runtime
+import vm
 
-if __name__ == "__main__":
-    program_code = """
+EXAMPLE_PROGRAM = """
 programa
     inteiro a;
     decimal b;
@@ -35,16 +39,92 @@ programa
 fimprog
     """
 
-    lexer = create_lexer()
-    parser = yacc.yacc(debug=True)
-    astcode = parser.parse(program_code, lexer=lexer)
 
-    semantic_analyzer = SemanticAnalyzer()
-    semantic_analyzer.analyze_program(ProgramNode)
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compila um programa e exibe o código Python gerado.")
+    arg_parser.add_argument("arquivo", nargs="?", help="código-fonte (sem ele, compila o programa de exemplo)")
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1, 2), default=0,
+                            help="nível de otimização")
+    arg_parser.add_argument("--lexer", choices=sorted(LEXERS), default="scanner",
+                            help="analisador léxico (ply: o gerado pelo PLY)")
+    arg_parser.add_argument("--share-expressions", action="store_true",
+                            help="cria um nó só para as expressões iguais e reaproveita os valores repetidos (sharing.py)")
+    arg_parser.add_argument("--ir", action="store_true",
+                            help="imprime a IR (depois das otimizações do nível) em vez do código")
+    arg_parser.add_argument("--run", action="store_true",
+                            help="executa o programa no próprio processo (bytecode_backend.py), com 'leia' e 'escreva' "
+                                 "em blocos na entrada e na saída padrão (runtime.py)")
+    arg_parser.add_argument("--vm", action="store_true",
+                            help="executa o programa na máquina virtual (vm.py), lendo 'leia' da entrada padrão")
+    arg_parser.add_argument("--steps", type=int, metavar="N",
+                            help="com --vm, para a execução depois de N instruções")
+    arg_parser.add_argument("--native", action="store_true",
+                            help="compila o programa para C (c_backend.py) e executa o binário, lendo 'leia' da entrada padrão")
+    arg_parser.add_argument("--c", action="store_true", help="mostra o código C gerado em vez do Python")
+    arg_parser.add_argument("--line-profile", action="store_true",
+                            help="executa o código gerado e mostra o tempo e as execuções de cada linha do programa")
+    arg_parser.add_argument("--metrics", action="store_true",
+                            help="imprime as métricas de cada fase em JSON em vez do código")
+    arg_parser.add_argument("--profile", metavar="DIR",
+                            help="grava o cProfile de cada fase em DIR/<fase>.prof (implica --metrics)")
+    arg_parser.add_argument("--no-allocations", action="store_true",
+                            help="com --metrics, não mede alocações (tracemalloc deixa as fases mais lentas)")
+    args = arg_parser.parse_args()
 
-    code_generator = PythonCodeGenerator()
-    code_generator.generate(ProgramNode) 
-    code = code_generator.get_code()
+    if args.arquivo:
+        with open(args.arquivo, encoding="utf-8") as f:
+            program_code = f.read()
+    else:
+        program_code = EXAMPLE_PROGRAM
 
-    print("Código Python Gerado:")
-    print(code)
+    try:
+        if args.run:
+            result = bytecode_backend.run(bytecode_backend.compile_to_code(program_code, optimize=args.optimize),
+                                          sys.stdin, sys.stdout)
+            print(f"Executado em {result.elapsed:.6f}s", file=sys.stderr)
+        elif args.vm:
+            stdin = "" if sys.stdin.isatty() else sys.stdin.read()
+            result = vm.run_source(program_code, stdin, args.optimize, args.steps)
+            sys.stdout.write(result.output)
+            print(f"{result.steps} instruções em {result.elapsed:.6f}s", file=sys.stderr)
+        elif args.native:
+            stdin = "" if sys.stdin.isatty() else sys.stdin.read()
+            result = c_backend.run_source(program_code, stdin, args.optimize)
+            sys.stdout.write(result.output)
+            print(f"Executado em {result.elapsed:.6f}s", file=sys.stderr)
+        elif args.c:
+            print(c_backend.generate_c(program_code, args.optimize))
+        elif args.line_profile:
+            stdin = "" if sys.stdin.isatty() else sys.stdin.read()
+            line_profile = profile_source(program_code, stdin, args.optimize, create_lexer(args.lexer))
+            sys.stdout.write(line_profile.output)
+            print(line_profile.report(), file=sys.stderr)
+        elif args.metrics or args.profile:
+            metrics = CompilationMetrics(track_allocations=not args.no_allocations, profile_dir=args.profile)
+            compile_source(program_code, create_lexer(args.lexer), optimize=args.optimize, metrics=metrics,
+                           share_expressions=args.share_expressions)
+            sys.stdout.write(metrics.to_json() + "\n")
+        else:
+            result = compile_source(program_code, create_lexer(args.lexer), optimize=args.optimize,
+                                    share_expressions=args.share_expressions)
+            if args.ir:
+                print(dump(result.ir))
+            else:
+                print("Código Python Gerado:")
+                print(result.code)
+    except (CompilationError, vm.StepLimitExceeded, c_backend.NativeError, EOFError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    # Erros do programa executado: a conversão do valor lido por 'leia' e a divisão por zero.
+    except ValueError:
+        print(runtime.INVALID_INPUT, file=sys.stderr)
+        sys.exit(1)
+    except ZeroDivisionError:
+        print(runtime.DIVISION_BY_ZERO, file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        # Qualquer outra falha do programa em execução é um erro de execução, não um traceback.
+        if not (args.run or args.vm or args.native or args.line_profile):
+            raise
+        print(f"{runtime.RUNTIME_FAILURE} {type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""Métricas por fase do pipeline de compilação.
+
+`CompilationMetrics` mede cada fase aberta com `phase(nome)`: tempo de parede e,
+com `track_allocations`, os bytes alocados (pico acima do início da fase, via
+`tracemalloc`) e os que continuam alocados ao fim dela. Com `profile_dir`, cada
+fase também é executada sob o `cProfile` e as estatísticas vão para
+`<profile_dir>/<fase>.prof`. Contadores (tokens, nós da AST, profundidade,
+tamanho da saída) são registrados com `count()`.
+
+Uso: passe uma instância para `compiler.compile_source(..., metrics=...)` e leia
+`to_dict()` ou `to_json()` ao final. O `tracemalloc` deixa as fases mais lentas;
+meça sem ele quando só o tempo interessar.
+"""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from astcode import ProgramNode, AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, RangeForNode, WriteNode, ComparisonNode, DispatchTable
+
+# Atributos de cada tipo de nó que contêm filhos.
+CHILD_FIELDS = DispatchTable({
+    ProgramNode: ("statements",),
+    AssignmentNode: ("expression",),
+    BinaryOpNode: ("left", "right"),
+    ComparisonNode: ("left", "right"),
+    IfNode: ("condition", "then_branch", "else_branch"),
+    WhileNode: ("condition", "body"),
+    ForNode: ("init", "condition", "update", "body"),
+    RangeForNode: ("start", "stop", "body"),
+    WriteNode: ("expression",),
+    object: (),
+})
+
+# Nós que abrem um bloco aninhado.
+NESTING_NODES = (IfNode, WhileNode, ForNode, RangeForNode)
+
+
+class PhaseStats:
+    """Medidas de uma fase."""
+    __slots__ = ("seconds", "allocated_bytes", "retained_bytes", "profile")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.allocated_bytes = None
+        self.retained_bytes = None
+        self.profile = None
+
+    def to_dict(self):
+        data = {"seconds": self.seconds}
+        if self.allocated_bytes is not None:
+            data["allocated_bytes"] = self.allocated_bytes
+            data["retained_bytes"] = self.retained_bytes
+        if self.profile is not None:
+            data["profile"] = self.profile
+        return data
+
+
+class CompilationMetrics:
+    """Coleta as medidas das fases e os contadores de uma compilação."""
+    enabled = True
+
+    def __init__(self, track_allocations=True, profile_dir=None):
+        self.track_allocations = track_allocations
+        self.profile_dir = profile_dir
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        stats = self.phases.setdefault(name, PhaseStats())
+        started_tracing = self.track_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        profiler = cProfile.Profile() if self.profile_dir else None
+
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield stats
+        finally:
+            if profiler:
+                profiler.disable()
+            stats.seconds += time.perf_counter() - start
+            if self.track_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                stats.allocated_bytes = (stats.allocated_bytes or 0) + peak - before
+                stats.retained_bytes = (stats.retained_bytes or 0) + current - before
+            if started_tracing:
+                tracemalloc.stop()
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stats.profile = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(stats.profile)
+
+    def count(self, name, value):
+        self.counters[name] = value
+
+    def count_source(self, source):
+        self.count("source_chars", len(source))
+        self.count("source_lines", source.count("\n") + 1)
+
+    def count_tree(self, program):
+        nodes, depth, nesting = tree_shape(program)
+        self.count("ast_nodes", nodes)
+        self.count("ast_depth", depth)
+        self.count("max_nesting", nesting)
+
+    def count_output(self, code):
+        self.count("output_chars", len(code))
+        self.count("output_lines", code.count("\n") + 1 if code else 0)
+
+    def to_dict(self):
+        return {
+            "phases": {name: stats.to_dict() for name, stats in self.phases.items()},
+            "total_seconds": sum(stats.seconds for stats in self.phases.values()),
+            "counters": dict(self.counters),
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+
+class NullMetrics:
+    """Substituto sem custo quando nenhuma métrica é pedida."""
+    enabled = False
+
+    def phase(self, name):
+        return nullcontext()
+
+    def count(self, name, value):
+        pass
+
+    def count_source(self, source):
+        pass
+
+    def count_tree(self, program):
+        pass
+
+    def count_output(self, code):
+        pass
+
+
+NO_METRICS = NullMetrics()
+
+
+def tree_shape(program):
+    """Número de nós, profundidade da árvore e maior aninhamento de blocos ('se', 'enquanto', 'para').
+
+    Constantes contam como nós; o percurso usa uma pilha explícita.
+    """
+    nodes = depth = nesting = 0
+    stack = [(program, 1, 0)]
+    while stack:
+        node, level, blocks = stack.pop()
+        if isinstance(node, list):
+            stack.extend((item, level, blocks) for item in node)
+            continue
+        if node is None:
+            continue
+        nodes += 1
+        depth = max(depth, level)
+        if isinstance(node, NESTING_NODES):
+            blocks += 1
+            nesting = max(nesting, blocks)
+        for field in CHILD_FIELDS[type(node)]:
+            stack.append((getattr(node, field), level + 1, blocks))
+    return nodes, depth, nesting
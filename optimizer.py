@@ -0,0 +1,343 @@
+"""Otimizações sobre a AST, aplicadas depois da análise semântica.
+
+Níveis:
+    0 - nenhuma otimização;
+    1 - dobra de constantes e remoção de ramos e laços com condição constante;
+    2 - nível 1 mais propagação de constantes e remoção de atribuições mortas.
+
+O otimizador depende dos tipos anotados pelo analisador semântico (por exemplo,
+para dobrar '/' entre inteiros como divisão inteira) e altera a árvore no lugar;
+as expressões, que podem estar compartilhadas (sharing.py), são copiadas quando mudam.
+
+As variáveis são identificadas pelo símbolo ligado pelo `Resolver`: uma declaração
+que esconde outra de mesmo nome é outra variável. Em uma AST não resolvida, vale o nome.
+"""
+import math
+
+from astcode import DeclarationNode, AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, RangeForNode, WriteNode, ReadNode, VariableNode, ComparisonNode, DispatchTable, OPERATOR_NODES, transform, evaluate, with_operands
+from flat_ast import FlatAST
+
+LITERALS = (int, float, str)
+
+ARITHMETIC = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+}
+
+COMPARISONS = {
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+
+CHANGE_LABELS = {
+    "folded": "expressões constantes dobradas",
+    "propagated": "usos de variáveis substituídos por constantes",
+    "branches": "ramos 'se' resolvidos estaticamente",
+    "loops": "laços 'enquanto'/'para' removidos",
+    "dead_stores": "atribuições mortas removidas",
+}
+
+_UNKNOWN = object()
+
+
+def is_literal(value):
+    return type(value) in LITERALS
+
+
+class Optimizer:
+    """Aplica as otimizações do nível `level` e contabiliza as mudanças em `changes`."""
+    def __init__(self, level=1):
+        self.level = level
+        self.changes = dict.fromkeys(CHANGE_LABELS, 0)
+        self.constants = {}
+
+    def optimize(self, program):
+        """Otimiza o programa e o devolve (uma FlatAST é convertida para árvore antes)."""
+        if isinstance(program, FlatAST):
+            program = program.to_tree()
+        if self.level > 0:
+            program.statements = self.optimize_block(program.statements)
+        return program
+
+    def report(self):
+        """Resumo legível das mudanças feitas."""
+        lines = [f"Otimizações (nível -O{self.level}):"]
+        for key, label in CHANGE_LABELS.items():
+            lines.append(f"  {self.changes[key]:6d} {label}")
+        return "\n".join(lines)
+
+    # Instruções: cada manipulador devolve a lista de instruções que substitui o nó.
+    # Blocos aninhados são entregues com `yield` a astcode.transform, que devolve a lista otimizada.
+
+    def optimize_block(self, statements):
+        if not isinstance(statements, list):
+            statements = [statements]
+        return transform(statements, self._statement_handlers, self)
+
+    def optimize_statements(self, statements):
+        result = []
+        for statement in statements:
+            result.extend((yield statement))
+        if self.level >= 2:
+            result = self.remove_dead_stores(result)
+        return result
+
+    def optimize_branch(self, statements, original):
+        """Otimiza o corpo de um 'se'/'enquanto', preservando a forma (lista ou instrução única)."""
+        block = yield statements if isinstance(statements, list) else [statements]
+        if isinstance(original, list) or len(block) != 1:
+            return block
+        return block[0]
+
+    def keep_statement(self, node):
+        return [node]
+
+    def optimize_declaration(self, node):
+        self.constants.pop(variable_key(node), None)
+        return [node]
+
+    def optimize_assignment(self, node):
+        node.expression = self.optimize_expression(node.expression)
+        value = node.expression
+        if self.level >= 2 and is_literal(value):
+            if node.resolved_type == "decimal" and type(value) is int:
+                value = float(value)
+            self.constants[variable_key(node)] = value
+        else:
+            self.constants.pop(variable_key(node), None)
+        return [node]
+
+    def optimize_write(self, node):
+        node.expression = self.optimize_expression(node.expression)
+        return [node]
+
+    def optimize_read(self, node):
+        self.constants.pop(variable_key(node), None)
+        return [node]
+
+    def optimize_if(self, node):
+        node.condition = self.optimize_condition(node.condition)
+        if is_literal(node.condition):
+            self.changes["branches"] += 1
+            taken = node.then_branch if node.condition else node.else_branch
+            return (yield taken) if taken else []
+
+        before = dict(self.constants)
+        node.then_branch = yield node.then_branch
+        after_then = self.constants
+        self.constants = dict(before)
+        if node.else_branch:
+            node.else_branch = yield node.else_branch
+        # Depois do 'se', só continuam conhecidas as constantes iguais nos dois caminhos.
+        self.constants = {name: value for name, value in after_then.items()
+                          if self.constants.get(name, _UNKNOWN) == value
+                          and type(self.constants[name]) is type(value)}
+        return [node]
+
+    def optimize_while(self, node):
+        # O corpo pode rodar várias vezes: o que ele altera deixa de ser constante já na condição.
+        for key in assigned_names(node.body):
+            self.constants.pop(key, None)
+        node.condition = self.optimize_condition(node.condition)
+        if is_literal(node.condition) and not node.condition:
+            self.changes["loops"] += 1
+            return []
+        saved = dict(self.constants)
+        node.body = yield from self.optimize_branch(node.body, node.body)
+        self.constants = saved
+        return [node]
+
+    def optimize_for(self, node):
+        init = self.optimize_assignment(node.init)
+        for key in assigned_names([node.body, node.update]):
+            self.constants.pop(key, None)
+        node.condition = self.optimize_condition(node.condition)
+        if is_literal(node.condition) and not node.condition:
+            self.changes["loops"] += 1
+            return init
+        saved = dict(self.constants)
+        node.body = yield from self.optimize_branch(node.body, node.body)
+        node.update.expression = self.optimize_expression(node.update.expression)
+        self.constants = saved
+        return [node]
+
+    def remove_dead_stores(self, statements):
+        """Remove atribuições sobrescritas adiante no mesmo bloco sem leitura intermediária."""
+        overwritten = set()
+        kept = []
+        for statement in reversed(statements):
+            if isinstance(statement, AssignmentNode):
+                key = variable_key(statement)
+                if key in overwritten and can_drop(statement.expression):
+                    self.changes["dead_stores"] += 1
+                    continue
+                overwritten.add(key)
+                overwritten.difference_update(read_names(statement.expression))
+            elif isinstance(statement, ReadNode):
+                overwritten.add(variable_key(statement))
+            elif not isinstance(statement, DeclarationNode):
+                overwritten.difference_update(read_names(statement))
+            kept.append(statement)
+        kept.reverse()
+        return kept
+
+    # Expressões
+
+    def optimize_expression(self, expression):
+        return evaluate(expression, self._expression_handlers, self)
+
+    def optimize_condition(self, expression):
+        """Como optimize_expression, mas também resolve comparações constantes."""
+        expression = self.optimize_expression(expression)
+        if (isinstance(expression, ComparisonNode) and is_literal(expression.left)
+                and is_literal(expression.right)):
+            self.changes["folded"] += 1
+            return int(COMPARISONS[expression.operator](expression.left, expression.right))
+        return expression
+
+    def optimize_binary_op(self, expression, left, right):
+        expression = with_operands(expression, left, right)
+        if not (is_literal(left) and is_literal(right)):
+            return expression
+        value = fold(expression.operator, left, right, expression.resolved_type)
+        if value is None:
+            return expression
+        self.changes["folded"] += 1
+        return value
+
+    def optimize_comparison(self, expression, left, right):
+        # Comparações fora de condições continuam no código: 'escreva 1 < 2' imprime True.
+        return with_operands(expression, left, right)
+
+    def optimize_variable(self, expression):
+        value = self.constants.get(variable_key(expression), _UNKNOWN)
+        if value is _UNKNOWN:
+            return expression
+        self.changes["propagated"] += 1
+        return value
+
+    def keep_expression(self, expression):
+        return expression
+
+    STATEMENT_HANDLERS = {
+        list: "optimize_statements",
+        DeclarationNode: "optimize_declaration",
+        AssignmentNode: "optimize_assignment",
+        WriteNode: "optimize_write",
+        ReadNode: "optimize_read",
+        IfNode: "optimize_if",
+        WhileNode: "optimize_while",
+        ForNode: "optimize_for",
+        object: "keep_statement",
+    }
+
+    EXPRESSION_HANDLERS = {
+        BinaryOpNode: "optimize_binary_op",
+        ComparisonNode: "optimize_comparison",
+        VariableNode: "optimize_variable",
+        object: "keep_expression",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.bind_handlers()
+
+    @classmethod
+    def bind_handlers(cls):
+        cls._statement_handlers = DispatchTable.bind(cls, cls.STATEMENT_HANDLERS)
+        cls._expression_handlers = DispatchTable.bind(cls, cls.EXPRESSION_HANDLERS)
+
+
+Optimizer.bind_handlers()
+
+
+def fold(operator, left, right, result_type):
+    """Calcula a operação entre constantes; None quando não deve ser dobrada."""
+    if isinstance(left, str) or isinstance(right, str):
+        return left + right if operator == "+" and isinstance(left, str) and isinstance(right, str) else None
+    if operator == "/":
+        if right == 0:
+            return None  # a divisão por zero fica para a execução
+        if result_type == "inteiro":
+            return left // right
+        return left / right
+    value = ARITHMETIC[operator](left, right)
+    if result_type == "decimal":
+        value = float(value)
+        if not math.isfinite(value):
+            return None  # inf e nan não têm literal no código gerado: o estouro fica para a execução
+    return value
+
+
+def can_drop(expression):
+    """Uma expressão pode ser descartada se não tem como falhar na execução."""
+    stack = [expression]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, OPERATOR_NODES):
+            if isinstance(value, BinaryOpNode) and value.operator == "/":
+                if not is_literal(value.right) or value.right == 0:
+                    return False
+            stack.extend((value.left, value.right))
+    return True
+
+
+def variable_key(node):
+    """A variável de uma declaração, atribuição, leitura, uso ou laço contado: o símbolo, ou o nome sem `Resolver`."""
+    if node.symbol is not None:
+        return node.symbol
+    return node.variable if type(node) is RangeForNode else node.var_name
+
+
+def read_names(node):
+    """Variáveis lidas em qualquer ponto do nó (chaves de variable_key())."""
+    names = set()
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, VariableNode):
+            names.add(variable_key(value))
+        elif isinstance(value, (BinaryOpNode, ComparisonNode)):
+            stack.extend((value.left, value.right))
+        elif isinstance(value, AssignmentNode):
+            stack.append(value.expression)
+        elif isinstance(value, WriteNode):
+            stack.append(value.expression)
+        elif isinstance(value, IfNode):
+            stack.extend((value.condition, value.then_branch, value.else_branch))
+        elif isinstance(value, WhileNode):
+            stack.extend((value.condition, value.body))
+        elif isinstance(value, ForNode):
+            stack.extend((value.init, value.condition, value.update, value.body))
+        elif isinstance(value, RangeForNode):
+            stack.extend((value.start, value.stop, value.body))
+    return names
+
+
+def assigned_names(node):
+    """Variáveis atribuídas (ou lidas com 'leia') em qualquer ponto do nó (chaves de variable_key())."""
+    names = set()
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, (AssignmentNode, ReadNode)):
+            names.add(variable_key(value))
+        elif isinstance(value, IfNode):
+            stack.extend((value.then_branch, value.else_branch))
+        elif isinstance(value, WhileNode):
+            stack.append(value.body)
+        elif isinstance(value, ForNode):
+            stack.extend((value.init, value.update, value.body))
+        elif isinstance(value, RangeForNode):
+            names.add(variable_key(value))
+            stack.append(value.body)
+    return names
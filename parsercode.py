@@ -1,7 +1,17 @@
+import hashlib
+import logging
+import sys
+
 import ply.yacc as yacc
 from lexer import tokens
+from diagnostics import Diagnostic
 from astcode import ProgramNode, VariableNode, DeclarationNode, AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, WriteNode, ReadNode, ComparisonNode
 
+precedence = (
+    ('nonassoc', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NE'),
+    ('left', 'PLUS', 'MINUS'),
+    ('left', 'TIMES', 'DIVIDE'),
+)
 
 def p_program(p):
     '''program : PROGRAM statement_list END_PROGRAM'''
@@ -10,10 +20,20 @@ def p_program(p):
 def p_statement_list(p):
     '''statement_list : statement_list statement
                       | statement'''
-    if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+    # Modo streaming: cada instrução de nível superior é entregue ao consumidor e descartada.
+    # Instruções com erro de sintaxe chegam como None e são descartadas.
+    sink = getattr(p.parser, "statement_sink", None)
+    if sink is not None:
+        if p[len(p) - 1] is not None:
+            sink(p[len(p) - 1])
+        p[0] = p[1] if len(p) == 3 else []
+    elif len(p) == 3:
+        # Acrescenta no lugar: copiar a lista a cada instrução tornaria a análise quadrática.
+        if p[2] is not None:
+            p[1].append(p[2])
+        p[0] = p[1]
     else:
-        p[0] = [p[1]]
+        p[0] = block(p[1])
 
 def p_statement(p):
     '''statement : declaration
@@ -25,24 +45,40 @@ def p_statement(p):
                  | for_statement'''
     p[0] = p[1]
 
+def p_statement_error(p):
+    '''statement : error SEMI'''
+    # Recuperação em modo pânico: o erro já foi registrado por p_error e os tokens
+    # até o próximo ';' são descartados. errok() permite registrar o erro seguinte
+    # mesmo que ele esteja logo adiante.
+    p.parser.errok()
+    p[0] = None
+
 def p_declaration(p):
     '''declaration : INT_TYPE ID SEMI
                    | FLOAT_TYPE ID SEMI
                    | STRING_TYPE ID SEMI'''
-    p[0] = DeclarationNode(p[1].lower(), p[2])
+    p[0] = at(p, 2, DeclarationNode(p[1].lower(), p[2]))
 
 def p_expression_math(p):
     '''expression : expression PLUS expression
                   | expression MINUS expression
                   | expression TIMES expression
                   | expression DIVIDE expression'''
-    p[0] = BinaryOpNode(p[1], p[2], p[3])
+    interner = getattr(p.parser, "expression_interner", None)
+    if interner is not None:
+        p[0] = at(p, 2, interner.binary_op(p[1], p[2], p[3]))
+    else:
+        p[0] = at(p, 2, BinaryOpNode(p[1], p[2], p[3]))
 
 def p_expression_id(p):
     """
     expression : ID
     """
-    p[0] = VariableNode(p[1])
+    interner = getattr(p.parser, "expression_interner", None)
+    if interner is not None:
+        p[0] = at(p, 1, interner.variable(p[1]))
+    else:
+        p[0] = at(p, 1, VariableNode(p[1]))
 
 def p_expression_comparison(p):
     """
@@ -53,89 +89,145 @@ def p_expression_comparison(p):
                | expression EQ expression
                | expression NE expression
     """
-    p[0] = ComparisonNode(p[2], p[1], p[3])  
+    interner = getattr(p.parser, "expression_interner", None)
+    if interner is not None:
+        p[0] = at(p, 2, interner.comparison(p[2], p[1], p[3]))
+    else:
+        p[0] = at(p, 2, ComparisonNode(p[2], p[1], p[3]))
 
 def p_assignment(p):
     '''assignment : ID ASSIGN expression SEMI'''
-    p[0] = AssignmentNode(p[1], p[3])
+    p[0] = at(p, 1, AssignmentNode(p[1], p[3]))
 
 def p_write(p):
     '''write : WRITE expression SEMI'''
     if isinstance(p[2], list):
         raise TypeError("Erro no parser: 'WRITE' recebeu múltiplas expressões.")
-    p[0] = WriteNode(p[2])
+    p[0] = at(p, 1, WriteNode(p[2]))
 
 def p_read(p):
     '''read : READ ID SEMI'''
-    p[0] = ReadNode(p[2])
+    p[0] = at(p, 1, ReadNode(p[2]))
 
 def p_if_statement(p):
     '''if_statement : IF LPAREN expression RPAREN statement ELSE statement
                     | IF LPAREN expression RPAREN statement'''
     if len(p) == 8:
-        p[0] = IfNode(p[3], [p[5]], [p[7]])
+        p[0] = at(p, 1, IfNode(p[3], block(p[5]), block(p[7])))
     else:
-        p[0] = IfNode(p[3], [p[5]])
+        p[0] = at(p, 1, IfNode(p[3], block(p[5])))
 
 def p_while_statement(p):
     '''while_statement : WHILE LPAREN expression RPAREN statement'''
-    p[0] = WhileNode(p[3], p[5])
+    p[0] = at(p, 1, WhileNode(p[3], p[5] if p[5] is not None else []))
 
 def p_for_statement(p):
-    '''for_statement : FOR LPAREN assignment SEMI expression SEMI assignment RPAREN statement'''
-    p[0] = ForNode(p[3], p[5], p[7], p[9])
+    '''for_statement : FOR LPAREN for_assignment SEMI expression SEMI for_assignment RPAREN statement'''
+    p[0] = at(p, 1, ForNode(p[3], p[5], p[7], p[9] if p[9] is not None else []))
 
-def p_expression(p):
-    '''expression : term expression_prime'''
-    if len(p) == 3 and p[2] is not None:
-        p[0] = BinaryOpNode(p[1], p[2][0], p[2][1])
-    else:
-        p[0] = p[1]
-
-def p_expression_prime(p):
-    '''expression_prime : PLUS term
-                        | MINUS term
-                        | empty'''
-    if len(p) == 4:
-        p[0] = (p[1], p[2])
-    else:
-        p[0] = None
+def p_for_assignment(p):
+    '''for_assignment : ID ASSIGN expression'''
+    p[0] = at(p, 1, AssignmentNode(p[1], p[3]))
 
 def p_expression_string(p):
     '''expression : STRING'''
     p[0] = p[1]  
 
-def p_term(p):
-    '''term : factor term_prime'''
-    if len(p) == 3 and p[2] is not None:
-        p[0] = BinaryOpNode(p[1], p[2][0], p[2][1])
-    else:
-        p[0] = p[1]
+def p_expression_number(p):
+    '''expression : NUMBER'''
+    p[0] = p[1]
 
-def p_term_prime(p):
-    '''term_prime : TIMES factor
-                  | DIVIDE factor
-                  | empty'''
-    if len(p) == 4:
-        p[0] = (p[1], p[2])
-    else:
-        p[0] = None
+def p_expression_group(p):
+    '''expression : LPAREN expression RPAREN'''
+    p[0] = p[2]
 
-def p_factor(p):
-    '''factor : NUMBER
-              | ID
-              | LPAREN expression RPAREN'''
-    if len(p) == 2:
-        p[0] = p[1]
-    else:
-        p[0] = p[2]
+def p_error(p):
+    # No final do arquivo não há token (nem lexer) para registrar o erro: a análise
+    # devolve None e parse_source() registra "Erro de sintaxe no final do arquivo".
+    if p:
+        diagnostic = Diagnostic(f"Erro de sintaxe no token {p.type}.", p.lineno, p.lexpos)
+        p.lexer.diagnostics.append(diagnostic.locate(p.lexer.lexdata))
 
-def p_empty(p):
-    '''empty :'''
-    pass
 
-def p_error(p):
-    print(f"Erro de sintaxe no token {p.type}" if p else "Erro de sintaxe no final do arquivo")
+def at(p, n, node):
+    """Anota o nó com a linha e a posição (`lexpos`) do n-ésimo símbolo da produção, um token.
+
+    Um nó compartilhado (sharing.py) já anotado fica com a posição da primeira ocorrência.
+    """
+    if node.lineno is None:
+        node.lineno = p.lineno(n)
+        node.lexpos = p.lexpos(n)
+    return node
+
+
+def block(statement):
+    """Lista com a instrução; uma instrução com erro de sintaxe (None) vira uma lista vazia."""
+    return [] if statement is None else [statement]
+
+
+TABMODULE = "parsetab"
+
+logger = logging.getLogger(__name__)
+_parser = None
+
+
+def grammar_signature():
+    """Retorna a assinatura da gramática usada pelo PLY para validar as tabelas."""
+    pinfo = yacc.ParserReflect(sys.modules[__name__].__dict__, log=yacc.NullLogger())
+    pinfo.get_all()
+    return pinfo.signature()
+
+
+def grammar_hash():
+    """Hash SHA-256 da assinatura da gramática."""
+    return hashlib.sha256(grammar_signature().encode("utf-8")).hexdigest()
+
+
+def tables_are_current():
+    """Verifica se o módulo de tabelas gerado corresponde à gramática atual."""
+    try:
+        tables = __import__(TABMODULE)
+    except ImportError:
+        return False
+    return getattr(tables, "_lr_signature", None) == grammar_signature()
+
+
+def build_parser(debug=False, write_tables=False):
+    """Constrói o parser LALR, reaproveitando as tabelas de `parsetab` quando a assinatura confere.
+
+    Com `debug=True` o PLY escreve `parser.out` e exibe os conflitos da gramática.
+    """
+    errorlog = None if debug else yacc.NullLogger()
+    return yacc.yacc(module=sys.modules[__name__], debug=debug, tabmodule=TABMODULE,
+                     write_tables=write_tables, errorlog=errorlog)
+
+
+def get_parser(debug=False):
+    """Retorna o parser compartilhado, construindo-o na primeira chamada."""
+    global _parser
+    if _parser is None or debug:
+        if not tables_are_current():
+            logger.warning("Tabelas LALR em '%s' desatualizadas; gerando em memória. "
+                           "Execute 'python parsercode.py' para regenerá-las.", TABMODULE)
+        _parser = build_parser(debug=debug)
+    return _parser
+
+
+class LazyParser:
+    """Adia a carga das tabelas até a primeira chamada de parse()."""
+    def parse(self, *args, **kwargs):
+        return get_parser().parse(*args, **kwargs)
+
+
+parser = LazyParser()
+
+
+if __name__ == "__main__":
+    import argparse
 
+    arg_parser = argparse.ArgumentParser(description="Gera as tabelas LALR da gramática em parsetab.py.")
+    arg_parser.add_argument("--debug", action="store_true", help="escreve parser.out e exibe os conflitos")
+    args = arg_parser.parse_args()
 
-parser = yacc.yacc(debug=True)
+    build_parser(debug=args.debug, write_tables=True)
+    print(f"Tabelas gravadas em {TABMODULE}.py (gramática {grammar_hash()[:12]})")
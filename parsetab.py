@@ -0,0 +1,66 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'nonassocLTGTLEGEEQNEleftPLUSMINUSleftTIMESDIVIDEASSIGN DIVIDE ELSE END_PROGRAM EQ FLOAT_TYPE FOR GE GT ID IF INT_TYPE LE LPAREN LT MINUS NE NUMBER PLUS PROGRAM READ RPAREN SEMI STRING STRING_TYPE TIMES WHILE WRITEprogram : PROGRAM statement_list END_PROGRAMstatement_list : statement_list statement\n                      | statementstatement : declaration\n                 | assignment\n                 | write\n                 | read\n                 | if_statement\n                 | while_statement\n                 | for_statementstatement : error SEMIdeclaration : INT_TYPE ID SEMI\n                   | FLOAT_TYPE ID SEMI\n                   | STRING_TYPE ID SEMIexpression : expression PLUS expression\n                  | expression MINUS expression\n                  | expression TIMES expression\n                  | expression DIVIDE expression\n    expression : ID\n    \n    expression : expression LT expression\n               | expression GT expression\n               | expression LE expression\n               | expression GE expression\n               | expression EQ expression\n               | expression NE expression\n    assignment : ID ASSIGN expression SEMIwrite : WRITE expression SEMIread : READ ID SEMIif_statement : IF LPAREN expression RPAREN statement ELSE statement\n                    | IF LPAREN expression RPAREN statementwhile_statement : WHILE LPAREN expression RPAREN statementfor_statement : FOR LPAREN for_assignment SEMI expression SEMI for_assignment RPAREN statementfor_assignment : ID ASSIGN expressionexpression : STRINGexpression : NUMBERexpression : LPAREN expression RPAREN'
+    
+_lr_action_items = {'PROGRAM':([0,],[2,]),'$end':([1,22,],[0,-1,]),'error':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[12,12,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,12,12,-30,-31,12,-29,12,-32,]),'INT_TYPE':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[13,13,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,13,13,-30,-31,13,-29,13,-32,]),'FLOAT_TYPE':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[15,15,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,15,15,-30,-31,15,-29,15,-32,]),'STRING_TYPE':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[16,16,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,16,16,-30,-31,16,-29,16,-32,]),'ID':([2,3,4,5,6,7,8,9,10,11,13,15,16,17,18,23,24,26,33,35,36,37,38,40,41,42,43,44,45,46,47,48,49,50,51,52,54,59,71,72,73,74,75,76,79,80,81,83,84,],[14,14,-3,-4,-5,-6,-7,-8,-9,-10,25,27,28,30,34,-2,-11,30,30,30,30,58,-12,-13,-14,-27,30,30,30,30,30,30,30,30,30,30,-28,-26,14,14,30,30,-30,-31,14,58,-29,14,-32,]),'WRITE':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[17,17,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,17,17,-30,-31,17,-29,17,-32,]),'READ':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[18,18,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,18,18,-30,-31,18,-29,18,-32,]),'IF':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[19,19,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,19,19,-30,-31,19,-29,19,-32,]),'WHILE':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[20,20,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,20,20,-30,-31,20,-29,20,-32,]),'FOR':([2,3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,71,72,75,76,79,81,83,84,],[21,21,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,21,21,-30,-31,21,-29,21,-32,]),'END_PROGRAM':([3,4,5,6,7,8,9,10,11,23,24,38,40,41,42,54,59,75,76,81,84,],[22,-3,-4,-5,-6,-7,-8,-9,-10,-2,-11,-12,-13,-14,-27,-28,-26,-30,-31,-29,-32,]),'ELSE':([5,6,7,8,9,10,11,24,38,40,41,42,54,59,75,76,81,84,],[-4,-5,-6,-7,-8,-9,-10,-11,-12,-13,-14,-27,-28,-26,79,-31,-29,-32,]),'SEMI':([12,25,27,28,29,30,31,32,34,39,57,60,61,62,63,64,65,66,67,68,69,70,77,78,],[24,38,40,41,42,-19,-34,-35,54,59,73,-15,-16,-17,-18,-20,-21,-22,-23,-24,-25,-36,80,-33,]),'ASSIGN':([14,58,],[26,74,]),'STRING':([17,26,33,35,36,43,44,45,46,47,48,49,50,51,52,73,74,],[31,31,31,31,31,31,31,31,31,31,31,31,31,31,31,31,31,]),'NUMBER':([17,26,33,35,36,43,44,45,46,47,48,49,50,51,52,73,74,],[32,32,32,32,32,32,32,32,32,32,32,32,32,32,32,32,32,]),'LPAREN':([17,19,20,21,26,33,35,36,43,44,45,46,47,48,49,50,51,52,73,74,],[33,35,36,37,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,33,]),'PLUS':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[43,-19,-34,-35,43,43,43,43,-15,-16,-17,-18,43,43,43,43,43,43,-36,43,43,]),'MINUS':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[44,-19,-34,-35,44,44,44,44,-15,-16,-17,-18,44,44,44,44,44,44,-36,44,44,]),'TIMES':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[45,-19,-34,-35,45,45,45,45,45,45,-17,-18,45,45,45,45,45,45,-36,45,45,]),'DIVIDE':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[46,-19,-34,-35,46,46,46,46,46,46,-17,-18,46,46,46,46,46,46,-36,46,46,]),'LT':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[47,-19,-34,-35,47,47,47,47,-15,-16,-17,-18,None,None,None,None,None,None,-36,47,47,]),'GT':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[48,-19,-34,-35,48,48,48,48,-15,-16,-17,-18,None,None,None,None,None,None,-36,48,48,]),'LE':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[49,-19,-34,-35,49,49,49,49,-15,-16,-17,-18,None,None,None,None,None,None,-36,49,49,]),'GE':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[50,-19,-34,-35,50,50,50,50,-15,-16,-17,-18,None,None,None,None,None,None,-36,50,50,]),'EQ':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[51,-19,-34,-35,51,51,51,51,-15,-16,-17,-18,None,None,None,None,None,None,-36,51,51,]),'NE':([29,30,31,32,39,53,55,56,60,61,62,63,64,65,66,67,68,69,70,77,78,],[52,-19,-34,-35,52,52,52,52,-15,-16,-17,-18,None,None,None,None,None,None,-36,52,52,]),'RPAREN':([30,31,32,53,55,56,60,61,62,63,64,65,66,67,68,69,70,78,82,],[-19,-34,-35,70,71,72,-15,-16,-17,-18,-20,-21,-22,-23,-24,-25,-36,-33,83,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'statement_list':([2,],[3,]),'statement':([2,3,71,72,79,83,],[4,23,75,76,81,84,]),'declaration':([2,3,71,72,79,83,],[5,5,5,5,5,5,]),'assignment':([2,3,71,72,79,83,],[6,6,6,6,6,6,]),'write':([2,3,71,72,79,83,],[7,7,7,7,7,7,]),'read':([2,3,71,72,79,83,],[8,8,8,8,8,8,]),'if_statement':([2,3,71,72,79,83,],[9,9,9,9,9,9,]),'while_statement':([2,3,71,72,79,83,],[10,10,10,10,10,10,]),'for_statement':([2,3,71,72,79,83,],[11,11,11,11,11,11,]),'expression':([17,26,33,35,36,43,44,45,46,47,48,49,50,51,52,73,74,],[29,39,53,55,56,60,61,62,63,64,65,66,67,68,69,77,78,]),'for_assignment':([37,80,],[57,82,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> PROGRAM statement_list END_PROGRAM','program',3,'p_program','parsercode.py',17),
+  ('statement_list -> statement_list statement','statement_list',2,'p_statement_list','parsercode.py',21),
+  ('statement_list -> statement','statement_list',1,'p_statement_list','parsercode.py',22),
+  ('statement -> declaration','statement',1,'p_statement','parsercode.py',39),
+  ('statement -> assignment','statement',1,'p_statement','parsercode.py',40),
+  ('statement -> write','statement',1,'p_statement','parsercode.py',41),
+  ('statement -> read','statement',1,'p_statement','parsercode.py',42),
+  ('statement -> if_statement','statement',1,'p_statement','parsercode.py',43),
+  ('statement -> while_statement','statement',1,'p_statement','parsercode.py',44),
+  ('statement -> for_statement','statement',1,'p_statement','parsercode.py',45),
+  ('statement -> error SEMI','statement',2,'p_statement_error','parsercode.py',49),
+  ('declaration -> INT_TYPE ID SEMI','declaration',3,'p_declaration','parsercode.py',57),
+  ('declaration -> FLOAT_TYPE ID SEMI','declaration',3,'p_declaration','parsercode.py',58),
+  ('declaration -> STRING_TYPE ID SEMI','declaration',3,'p_declaration','parsercode.py',59),
+  ('expression -> expression PLUS expression','expression',3,'p_expression_math','parsercode.py',63),
+  ('expression -> expression MINUS expression','expression',3,'p_expression_math','parsercode.py',64),
+  ('expression -> expression TIMES expression','expression',3,'p_expression_math','parsercode.py',65),
+  ('expression -> expression DIVIDE expression','expression',3,'p_expression_math','parsercode.py',66),
+  ('expression -> ID','expression',1,'p_expression_id','parsercode.py',71),
+  ('expression -> expression LT expression','expression',3,'p_expression_comparison','parsercode.py',77),
+  ('expression -> expression GT expression','expression',3,'p_expression_comparison','parsercode.py',78),
+  ('expression -> expression LE expression','expression',3,'p_expression_comparison','parsercode.py',79),
+  ('expression -> expression GE expression','expression',3,'p_expression_comparison','parsercode.py',80),
+  ('expression -> expression EQ expression','expression',3,'p_expression_comparison','parsercode.py',81),
+  ('expression -> expression NE expression','expression',3,'p_expression_comparison','parsercode.py',82),
+  ('assignment -> ID ASSIGN expression SEMI','assignment',4,'p_assignment','parsercode.py',87),
+  ('write -> WRITE expression SEMI','write',3,'p_write','parsercode.py',91),
+  ('read -> READ ID SEMI','read',3,'p_read','parsercode.py',97),
+  ('if_statement -> IF LPAREN expression RPAREN statement ELSE statement','if_statement',7,'p_if_statement','parsercode.py',101),
+  ('if_statement -> IF LPAREN expression RPAREN statement','if_statement',5,'p_if_statement','parsercode.py',102),
+  ('while_statement -> WHILE LPAREN expression RPAREN statement','while_statement',5,'p_while_statement','parsercode.py',109),
+  ('for_statement -> FOR LPAREN for_assignment SEMI expression SEMI for_assignment RPAREN statement','for_statement',9,'p_for_statement','parsercode.py',113),
+  ('for_assignment -> ID ASSIGN expression','for_assignment',3,'p_for_assignment','parsercode.py',117),
+  ('expression -> STRING','expression',1,'p_expression_string','parsercode.py',121),
+  ('expression -> NUMBER','expression',1,'p_expression_number','parsercode.py',125),
+  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression_group','parsercode.py',129),
+]
@@ -0,0 +1,118 @@
+"""Executa o código Python gerado medindo o tempo e as execuções de cada linha do código-fonte.
+
+O código gerado roda com um rastreador de linhas (sys.settrace): cada linha
+gerada conta as vezes em que foi executada e acumula o tempo até o evento de
+linha seguinte. `CompilationResult.source_map` leva cada linha gerada à linha do
+programa que a produziu. O rastreador deixa a execução várias vezes mais lenta:
+os tempos servem para comparar as linhas entre si, não como medida absoluta.
+"""
+import builtins
+import sys
+import time
+from types import SimpleNamespace
+
+from compiler import compile_source
+import runtime
+
+FILENAME = "<programa>"
+
+
+class LineStats:
+    """Execuções e tempo (em segundos) de uma linha do código-fonte."""
+    __slots__ = ("hits", "seconds")
+
+    def __init__(self):
+        self.hits = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return f"LineStats(hits={self.hits}, seconds={self.seconds:.6f})"
+
+
+class LineProfile:
+    """Resultado de profile(): a saída do programa, o tempo total e `lines` (linha do código-fonte -> `LineStats`)."""
+    def __init__(self, output, elapsed, lines, source=None):
+        self.output = output
+        self.elapsed = elapsed
+        self.lines = lines
+        self.source = source
+
+    def report(self, top=None):
+        """Tabela por linha do código-fonte, em ordem; com `top`, só as `top` linhas mais demoradas."""
+        rows = sorted(self.lines.items())
+        if top is not None:
+            rows = sorted(rows, key=lambda row: row[1].seconds, reverse=True)[:top]
+        text = self.source.splitlines() if self.source is not None else []
+        total = sum(stats.seconds for stats in self.lines.values()) or 1.0
+        lines = [f"{'linha':>6} {'execuções':>12} {'tempo (ms)':>12} {'%':>6}  código"]
+        for line, stats in rows:
+            code = text[line - 1].strip() if 0 < line <= len(text) else ""
+            lines.append(f"{line:>6} {stats.hits:>12} {stats.seconds * 1000:>12.3f} "
+                         f"{stats.seconds / total:>6.1%}  {code}")
+        lines.append(f"Tempo total com o rastreador: {self.elapsed:.3f}s")
+        return "\n".join(lines)
+
+
+def program_namespace(stdin, output):
+    """Namespace para executar o código gerado: o 'from runtime import ...' dele recebe funções ligadas a `stdin` e `output`."""
+    program_runtime = SimpleNamespace(**runtime.namespace(runtime.Input(stdin), output))
+
+    def import_module(name, *args, **kwargs):
+        return program_runtime if name == "runtime" else __import__(name, *args, **kwargs)
+
+    return {"__builtins__": {**vars(builtins), "__import__": import_module}}
+
+
+def profile(result, stdin="", source=None):
+    """Executa o código de `result` (um `CompilationResult`), lendo 'leia' de `stdin`, e devolve um `LineProfile`.
+
+    As execuções de uma linha do código-fonte são as da linha gerada dela que mais
+    rodou (o cabeçalho de um 'para' conta também o teste que sai do laço); o
+    tempo é a soma de todas.
+    """
+    code = compile(result.code, FILENAME, "exec")
+    size = len(result.source_map) + 1
+    hits = [0] * size
+    nanoseconds = [0] * size
+    clock = time.perf_counter_ns
+    previous, last = 0, clock()
+
+    def trace_line(frame, event, arg):
+        nonlocal previous, last
+        if event == "line":
+            now = clock()
+            nanoseconds[previous] += now - last
+            previous = frame.f_lineno
+            hits[previous] += 1
+            last = clock()  # o próprio rastreador fica fora da medida
+        return trace_line
+
+    def trace_call(frame, event, arg):
+        return trace_line if frame.f_code.co_filename == FILENAME else None
+
+    output = runtime.Output()
+    namespace = program_namespace(stdin, output)
+    started = time.perf_counter()
+    sys.settrace(trace_call)
+    try:
+        exec(code, namespace)
+    finally:
+        sys.settrace(None)
+        nanoseconds[previous] += clock() - last
+    elapsed = time.perf_counter() - started
+
+    stats = {}
+    for generated, line in enumerate(result.source_map, 1):
+        if line is None or not hits[generated]:
+            continue
+        entry = stats.get(line)
+        if entry is None:
+            entry = stats[line] = LineStats()
+        entry.hits = max(entry.hits, hits[generated])
+        entry.seconds += nanoseconds[generated] / 1e9
+    return LineProfile(output.getvalue(), elapsed, stats, source)
+
+
+def profile_source(source, stdin="", optimize=0, lexer=None):
+    """Compila e executa o código-fonte com profile()."""
+    return profile(compile_source(source, lexer, optimize=optimize), stdin, source)
@@ -0,0 +1,152 @@
+"""Resolução de nomes: liga cada uso de variável ao símbolo da sua declaração.
+
+O `Resolver` percorre a AST antes da análise semântica, com as mesmas regras de
+escopo do `SemanticAnalyzer` (um escopo novo para cada 'se', 'enquanto' e 'para'),
+e preenche o atributo `symbol` de declarações, atribuições, leituras e variáveis.
+Cada `Symbol` tem a profundidade do escopo em que foi declarado e o índice (slot)
+dentro desse escopo; as fases seguintes consultam o símbolo em vez de procurar o
+nome na pilha de escopos.
+
+A busca por nome é feita uma vez por uso e em tempo constante: `visible` guarda,
+para cada nome, o símbolo visível no ponto atual, e ao sair de um escopo os
+símbolos que ele escondia são restaurados. Usos de nomes não declarados ficam com
+`symbol = None`; o erro é apontado pela análise semântica, na ordem de sempre.
+"""
+from astcode import ProgramNode, DeclarationNode, AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, WriteNode, ReadNode, VariableNode, DispatchTable, walk, evaluate
+from flat_ast import FlatAST
+
+
+class Symbol:
+    """Variável declarada: nome, tipo e posição (profundidade do escopo, slot no escopo)."""
+    __slots__ = ("name", "var_type", "depth", "slot")
+
+    def __init__(self, name, var_type, depth, slot):
+        self.name = name
+        self.var_type = var_type
+        self.depth = depth
+        self.slot = slot
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.var_type!r}, depth={self.depth}, slot={self.slot})"
+
+
+class Resolver:
+    """Liga os nós aos símbolos; `symbols` lista todos os símbolos criados, na ordem das declarações.
+
+    `frame_sizes[d]` é o maior número de slots usado por um escopo de profundidade `d`,
+    o tamanho de quadro que um executor precisa reservar para essa profundidade.
+    """
+    def __init__(self):
+        self.visible = {}
+        self.scopes = [[]]
+        self.frame_sizes = [0]
+        self.symbols = []
+
+    def resolve(self, program):
+        """Resolve o programa (ou uma instrução isolada) e o devolve."""
+        if isinstance(program, FlatAST):
+            raise TypeError("O Resolver não anota a FlatAST; converta-a com to_tree().")
+        walk(program, self._statement_handlers, self)
+        return program
+
+    def enter_scope(self):
+        self.scopes.append([])
+        if len(self.scopes) > len(self.frame_sizes):
+            self.frame_sizes.append(0)
+
+    def exit_scope(self):
+        # Cada entrada guarda o símbolo que a declaração escondeu, restaurado na ordem inversa.
+        for name, previous in reversed(self.scopes.pop()):
+            if previous is None:
+                del self.visible[name]
+            else:
+                self.visible[name] = previous
+
+    def declare(self, name, var_type):
+        scope = self.scopes[-1]
+        depth = len(self.scopes) - 1
+        symbol = Symbol(name, var_type, depth, len(scope))
+        scope.append((name, self.visible.get(name)))
+        self.visible[name] = symbol
+        self.symbols.append(symbol)
+        if len(scope) > self.frame_sizes[depth]:
+            self.frame_sizes[depth] = len(scope)
+        return symbol
+
+    def resolve_program(self, node):
+        yield node.statements
+
+    def resolve_declaration(self, node):
+        node.symbol = self.declare(node.var_name, node.var_type)
+
+    def resolve_assignment(self, node):
+        node.expression = self.resolve_expression(node.expression)
+        node.symbol = self.visible.get(node.var_name)
+
+    def resolve_binary_statement(self, node):
+        self.resolve_expression(node)
+
+    def resolve_if(self, node):
+        node.condition = self.resolve_expression(node.condition)
+        self.enter_scope()
+        yield node.then_branch
+        if node.else_branch:
+            yield node.else_branch
+        self.exit_scope()
+
+    def resolve_while(self, node):
+        node.condition = self.resolve_expression(node.condition)
+        self.enter_scope()
+        yield node.body
+        self.exit_scope()
+
+    def resolve_for(self, node):
+        yield node.init
+        node.condition = self.resolve_expression(node.condition)
+        self.enter_scope()
+        yield node.body
+        yield node.update
+        self.exit_scope()
+
+    def resolve_write(self, node):
+        node.expression = self.resolve_expression(node.expression)
+
+    def resolve_read(self, node):
+        node.symbol = self.visible.get(node.var_name)
+
+    def resolve_expression(self, expression):
+        """Liga as variáveis da expressão e a devolve (sharing.SharingResolver pode devolver uma cópia)."""
+        # Só as variáveis têm manipulador; as operações são percorridas por evaluate().
+        evaluate(expression, self._expression_handlers, self)
+        return expression
+
+    def resolve_variable(self, expression):
+        expression.symbol = self.visible.get(expression.var_name)
+
+    STATEMENT_HANDLERS = {
+        ProgramNode: "resolve_program",
+        DeclarationNode: "resolve_declaration",
+        AssignmentNode: "resolve_assignment",
+        BinaryOpNode: "resolve_binary_statement",
+        IfNode: "resolve_if",
+        WhileNode: "resolve_while",
+        ForNode: "resolve_for",
+        WriteNode: "resolve_write",
+        ReadNode: "resolve_read",
+    }
+
+    EXPRESSION_HANDLERS = {
+        VariableNode: "resolve_variable",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.bind_handlers()
+
+    @classmethod
+    def bind_handlers(cls):
+        cls._statement_handlers = DispatchTable.bind(cls, cls.STATEMENT_HANDLERS)
+        cls._expression_handlers = DispatchTable.bind(cls, cls.EXPRESSION_HANDLERS)
+
+
+Resolver.bind_handlers()
@@ -0,0 +1,154 @@
+"""Entrada e saída dos programas compilados: 'leia' e 'escreva' com buffer.
+
+O código gerado por bytecode_backend e por code_generator chama leia(),
+escreva(valor) e, no 'fimprog', fimprog(); namespace() liga esses nomes a um
+`Input` e a um `Output`. O código Python gerado os importa deste módulo
+('from runtime import leia, escreva, fimprog, inteiro, decimal'): importados
+assim, eles usam a entrada e a saída padrão.
+
+inteiro() e decimal() convertem a linha lida por 'leia' com a gramática do
+backend C (strtoll e strtod): sinal opcional, dígitos ASCII e espaços nas pontas.
+int() e float() também aceitariam '_' entre os dígitos ('1_000') e dígitos de
+outros alfabetos, que o C recusa; strtod aceitaria hexadecimal ('0x1p3'), que
+float() recusa. Os dois lados recusam os três.
+No lugar de uma chamada a input() e outra a print() por valor:
+
+- `Input` recebe a entrada inteira como texto, ou a lê de um arquivo em blocos
+  de BLOCK_SIZE caracteres, e separa as linhas de uma vez; cada 'leia' só pega a
+  próxima linha da lista;
+- `Output` guarda os valores escritos e os converte e escreve em lotes de
+  BATCH_SIZE linhas, quando o lote enche, em fimprog() ou quando flush() é
+  chamado.
+
+De um terminal, a entrada é lida linha a linha e a saída pendente é escrita
+antes de cada leitura, para que o usuário veja o que o programa escreveu antes
+de responder. Quem executa o programa deve chamar flush() também quando ele
+termina com erro, para não perder a saída anterior ao erro.
+"""
+import atexit
+import sys
+from functools import partial
+
+BLOCK_SIZE = 1 << 16
+BATCH_SIZE = 8192
+END_OF_INPUT = "Erro: Fim da entrada durante 'leia'."
+
+# Mensagens dos erros de execução do programa, as mesmas do backend C.
+INVALID_INPUT = "Erro: Valor inválido para 'leia'."
+DIVISION_BY_ZERO = "Erro: Divisão por zero."
+RUNTIME_FAILURE = "Erro: Falha na execução do programa:"
+
+
+def inteiro(text):
+    """A linha lida por 'leia' de um 'inteiro'; ValueError fora da gramática do backend C."""
+    if "_" in text or not text.isascii():
+        raise ValueError(f"inteiro inválido: {text!r}")
+    return int(text)
+
+
+def decimal(text):
+    """A linha lida por 'leia' de um 'decimal'; ValueError fora da gramática do backend C."""
+    if "_" in text or not text.isascii():
+        raise ValueError(f"decimal inválido: {text!r}")
+    return float(text)
+
+
+class Input:
+    """Linhas da entrada, sem o '\\n'; `source` é o texto da entrada ou um arquivo de texto."""
+    def __init__(self, source=""):
+        if isinstance(source, str):
+            lines = source.split("\n")
+            if not lines[-1]:
+                lines.pop()
+            self.read_block = None
+            self.interactive = False
+        else:
+            lines = []
+            self.interactive = source.isatty()
+            self.read_block = source.readline if self.interactive else partial(source.read, BLOCK_SIZE)
+        self.partial = ""
+        self.next_line = iter(lines).__next__
+
+    def read_line(self):
+        """A próxima linha; no fim da entrada, levanta EOFError."""
+        try:
+            return self.next_line()
+        except StopIteration:
+            pass
+        return self.refill()
+
+    def refill(self):
+        while self.read_block is not None:
+            block = self.read_block()
+            if not block:
+                self.read_block = None
+                break
+            lines = (self.partial + block).split("\n")
+            self.partial = lines.pop()
+            if lines:
+                self.next_line = iter(lines).__next__
+                return self.next_line()
+        if self.partial:
+            # Última linha sem '\n' no fim.
+            line, self.partial = self.partial, ""
+            return line
+        raise EOFError(END_OF_INPUT)
+
+
+class Output:
+    """Valores escritos por 'escreva', um por linha.
+
+    Com `stream` (um arquivo de texto), os lotes são escritos nele; sem, o texto
+    fica guardado e getvalue() o devolve. Os valores da linguagem são imutáveis,
+    então a conversão para texto pode esperar a escrita do lote.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.pending = []
+        self.chunks = []
+
+    def write(self, value):
+        pending = self.pending
+        pending.append(value)
+        if len(pending) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Escreve os valores pendentes."""
+        if self.pending:
+            text = "\n".join(map(str, self.pending)) + "\n"
+            self.pending.clear()
+            if self.stream is None:
+                self.chunks.append(text)
+            else:
+                self.stream.write(text)
+        if self.stream is not None:
+            self.stream.flush()
+
+    def getvalue(self):
+        """O texto escrito até aqui (sem `stream`)."""
+        self.flush()
+        return "".join(self.chunks)
+
+
+def namespace(input, output):
+    """Os nomes chamados pelo código gerado: leia(), escreva(valor), fimprog(), inteiro() e decimal()."""
+    read_line = input.read_line
+    if input.interactive:
+        def read_line():
+            output.flush()
+            return input.read_line()
+    return {"leia": read_line, "escreva": output.write, "fimprog": output.flush,
+            "inteiro": inteiro, "decimal": decimal}
+
+
+def __getattr__(name):
+    """leia, escreva e fimprog com a entrada e a saída padrão, criados na primeira importação."""
+    if name not in ("leia", "escreva", "fimprog"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    output = Output(sys.stdout)
+    # Um programa que termina com erro não chega ao fimprog(): a saída anterior ao erro é escrita na saída.
+    atexit.register(output.flush)
+    standard = namespace(Input(sys.stdin), output)
+    globals().update(standard)
+    return standard[name]
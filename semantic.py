@@ -1,12 +1,35 @@
-from astcode import ProgramNode, DeclarationNode, AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, WriteNode, ReadNode, VariableNode, ComparisonNode
+from astcode import ProgramNode, DeclarationNode, AssignmentNode, BinaryOpNode, IfNode, WhileNode, ForNode, RangeForNode, WriteNode, ReadNode, VariableNode, ComparisonNode, DispatchTable, walk, evaluate
+from flat_ast import FlatAST
+from diagnostics import Diagnostic
+
+# Tipo das expressões com erro já registrado; as verificações que o recebem não
+# registram de novo, para que um erro não se repita em cascata.
+ERROR_TYPE = "<erro>"
 
 
 class SemanticAnalyzer:
-    def __init__(self):
+    """Verifica os tipos do programa e anota os nós com o tipo resolvido (`resolved_type`).
+
+    Nós já ligados pelo `Resolver` têm o tipo lido do símbolo; os demais (por exemplo,
+    as visões da FlatAST) são procurados pelo nome na pilha de escopos.
+
+    O percurso não é recursivo (`astcode.walk` e `astcode.evaluate`): manipuladores
+    de instruções com filhos são geradores que entregam cada filho com `yield`, e os
+    de operações recebem os tipos já calculados dos operandos.
+
+    Sem `diagnostics`, o primeiro erro é levantado como exceção. Com uma lista, cada
+    erro é registrado nela como `Diagnostic` e a análise continua até o fim do programa.
+    """
+    def __init__(self, diagnostics=None):
         self.symbol_table = [{}]
-        self.symbol_table[-1]['a'] = 'inteiro'  
-        self.symbol_table[-1]['b'] = 'decimal'  
-        self.symbol_table[-1]['c'] = 'texto'
+        self.diagnostics = diagnostics
+
+    def error(self, message, node=None):
+        """Levanta o erro ou, coletando diagnósticos, o registra na posição do nó e devolve ERROR_TYPE."""
+        if self.diagnostics is None:
+            raise Exception(message)
+        self.diagnostics.append(Diagnostic(message, getattr(node, "lineno", None), getattr(node, "lexpos", None)))
+        return ERROR_TYPE
 
     def enter_scope(self):
         """Entra em um novo escopo."""
@@ -26,85 +49,177 @@ class SemanticAnalyzer:
 
     def analyze_program(self, node):
         """Inicia a análise semântica do programa."""
-        if isinstance(node, ProgramNode):
-            for statement in node.statements:
-                self.analyze_program(statement)
-        elif isinstance(node, DeclarationNode):
-            self.declare_variable(node.var_name, node.var_type)
-        elif isinstance(node, AssignmentNode):
-            var_type = self.check_variable(node.var_name)
-            expr_type = self.analyze_expression(node.expression)
-            if var_type == expr_type or (var_type == "decimal" and expr_type == "inteiro"):
-                return
-            raise Exception(f"Erro: Atribuição incompatível. '{node.var_name}' é do tipo '{var_type}', mas recebeu '{expr_type}'.")
-        elif isinstance(node, BinaryOpNode):
-            left_type = self.analyze_expression(node.left)
-            right_type = self.analyze_expression(node.right)
-            if left_type != right_type:
-                raise Exception(f"Erro: Operação inválida entre '{left_type}' e '{right_type}'.")
-        elif isinstance(node, IfNode):
-            cond_type = self.analyze_expression(node.condition)
-            if cond_type not in ["inteiro", "decimal"]:
-                raise Exception("Erro: Condição de 'if' deve ser do tipo 'inteiro' ou 'decimal'.")
-            self.enter_scope()
-            self.analyze_program(node.then_branch)
-            if node.else_branch:
-                self.analyze_program(node.else_branch)
-            self.exit_scope()
-        elif isinstance(node, ForNode): 
-            self.analyze_program(node.start)
-            cond_type = self.analyze_expression(node.end)
-            if cond_type not in ["inteiro", "decimal"]:
-                raise Exception("Erro: Condição de 'for' deve ser do tipo 'inteiro' ou 'decimal'.")
-            self.enter_scope()
-            self.analyze_program(node.body)
-            self.exit_scope()
-        elif isinstance(node, WhileNode):
-            cond_type = self.analyze_expression(node.condition)
-            if cond_type != "inteiro":
-                raise Exception("Erro: Condição de 'while' deve ser do tipo 'inteiro'.")
-            self.enter_scope()
-            self.analyze_program(node.body)
-            self.exit_scope()
-        elif isinstance(node, WriteNode):
-            expr_type = self.analyze_expression(node.expression)
-            if expr_type not in ["inteiro", "decimal", "texto"]:
-                raise Exception(f"Erro: Tipo '{expr_type}' inválido para 'escreva'.")
-        elif isinstance(node, ReadNode):
-            self.check_variable(node.var_name)
-
-    def check_variable(self, var_name):
+        if isinstance(node, FlatAST):
+            node = node.program()
+        walk(node, self._statement_handlers, self)
+
+    def analyze_program_node(self, node):
+        yield node.statements
+
+    def analyze_declaration(self, node):
+        self.declare_variable(node.var_name, node.var_type)
+
+    def analyze_assignment(self, node):
+        var_type = self.variable_type(node)
+        expr_type = self.analyze_expression(node.expression)
+        self.check_assignment(node.var_name, var_type, expr_type, node)
+        node.resolved_type = var_type
+
+    def analyze_binary_statement(self, node):
+        left_type = self.analyze_expression(node.left)
+        right_type = self.analyze_expression(node.right)
+        if left_type != right_type and ERROR_TYPE not in (left_type, right_type):
+            self.error(f"Erro: Operação inválida entre '{left_type}' e '{right_type}'.", node)
+
+    def analyze_if(self, node):
+        self.check_condition("if", self.analyze_expression(node.condition), ("inteiro", "decimal"), node)
+        self.enter_scope()
+        yield node.then_branch
+        if node.else_branch:
+            yield node.else_branch
+        self.exit_scope()
+
+    def analyze_for(self, node):
+        yield node.init
+        self.check_condition("for", self.analyze_expression(node.condition), ("inteiro", "decimal"), node)
+        self.enter_scope()
+        yield node.body
+        yield node.update
+        self.exit_scope()
+
+    def analyze_range_for(self, node):
+        for bound in (node.start, node.stop):
+            if self.analyze_expression(bound) not in ("inteiro", ERROR_TYPE):
+                self.error("Erro: Limites de laço contado devem ser do tipo 'inteiro'.", node)
+        if self.check_variable(node.variable, node) not in ("inteiro", ERROR_TYPE):
+            self.error(f"Erro: Variável de laço '{node.variable}' deve ser do tipo 'inteiro'.", node)
+        self.enter_scope()
+        yield node.body
+        self.exit_scope()
+
+    def analyze_while(self, node):
+        self.check_condition("while", self.analyze_expression(node.condition), ("inteiro",), node)
+        self.enter_scope()
+        yield node.body
+        self.exit_scope()
+
+    def analyze_write(self, node):
+        self.check_write(self.analyze_expression(node.expression), node)
+
+    def analyze_read(self, node):
+        node.resolved_type = self.variable_type(node)
+
+    def variable_type(self, node):
+        """Tipo da variável do nó, pelo símbolo ligado pelo Resolver ou, sem ele, pelo nome."""
+        symbol = getattr(node, "symbol", None)
+        if symbol is not None:
+            return symbol.var_type
+        return self.check_variable(node.var_name, node)
+
+    def check_variable(self, var_name, node=None):
         """Verifica se a variável foi declarada em algum escopo visível."""
         for scope in reversed(self.symbol_table):
             if var_name in scope:
                 return scope[var_name]
-        raise Exception(f"Erro: Variável '{var_name}' não declarada.")
+        if self.diagnostics is not None:
+            # O erro é registrado uma vez só: os usos seguintes do nome recebem ERROR_TYPE.
+            self.symbol_table[0][var_name] = ERROR_TYPE
+        return self.error(f"Erro: Variável '{var_name}' não declarada.", node)
 
-    def analyze_expression(self, expression):
-        if isinstance(expression, BinaryOpNode):
-            left_type = self.analyze_expression(expression.left)
-            right_type = self.analyze_expression(expression.right)
-            if left_type == "texto" and right_type == "texto" and expression.operator == "+":
-                return "texto"
-            if left_type == right_type:
-                return left_type
-            if left_type == "inteiro" and right_type == "decimal":
-                return "decimal"
-            if left_type == "decimal" and right_type == "inteiro":
-                return "decimal"
-            raise Exception(f"Erro: Operação inválida entre '{left_type}' e '{right_type}'.")
-        elif isinstance(expression, VariableNode):
-            return self.check_variable(expression.var_name)
-        elif isinstance(expression, ComparisonNode):
-            left_type = self.analyze_expression(expression.left)
-            right_type = self.analyze_expression(expression.right)
-            if left_type == right_type:
-                return "inteiro" 
-            raise Exception(f"Erro: Comparação entre tipos incompatíveis: '{left_type}' e '{right_type}'.")
-        elif isinstance(expression, int):
-            return "inteiro"
-        elif isinstance(expression, float):
-            return "decimal"
-        elif isinstance(expression, str):
+    def check_assignment(self, var_name, var_type, expr_type, node=None):
+        """Verifica se o tipo da expressão pode ser atribuído à variável."""
+        if var_type == expr_type or (var_type == "decimal" and expr_type == "inteiro"):
+            return
+        if ERROR_TYPE not in (var_type, expr_type):
+            self.error(f"Erro: Atribuição incompatível. '{var_name}' é do tipo '{var_type}', mas recebeu '{expr_type}'.", node)
+
+    def check_condition(self, statement, cond_type, allowed, node=None):
+        """Verifica o tipo da condição de um 'if', 'while' ou 'for'."""
+        if cond_type not in allowed and cond_type != ERROR_TYPE:
+            expected = " ou ".join(f"'{t}'" for t in allowed)
+            self.error(f"Erro: Condição de '{statement}' deve ser do tipo {expected}.", node)
+
+    def check_write(self, expr_type, node=None):
+        if expr_type not in ["inteiro", "decimal", "texto", ERROR_TYPE]:
+            self.error(f"Erro: Tipo '{expr_type}' inválido para 'escreva'.", node)
+
+    def binary_op_type(self, operator, left_type, right_type, node=None):
+        """Tipo resultante de uma operação aritmética."""
+        if left_type == "texto" and right_type == "texto" and operator == "+":
             return "texto"
+        if left_type == right_type:
+            return left_type
+        if left_type == "inteiro" and right_type == "decimal":
+            return "decimal"
+        if left_type == "decimal" and right_type == "inteiro":
+            return "decimal"
+        if ERROR_TYPE in (left_type, right_type):
+            return ERROR_TYPE
+        return self.error(f"Erro: Operação inválida entre '{left_type}' e '{right_type}'.", node)
+
+    def comparison_type(self, left_type, right_type, node=None):
+        """Tipo resultante de uma comparação."""
+        if left_type == right_type:
+            return "inteiro" 
+        if ERROR_TYPE in (left_type, right_type):
+            return "inteiro"
+        return self.error(f"Erro: Comparação entre tipos incompatíveis: '{left_type}' e '{right_type}'.", node)
+
+    def analyze_expression(self, expression):
+        return evaluate(expression, self._expression_handlers, self)
+
+    def analyze_binary_op(self, expression, left_type, right_type):
+        expression.resolved_type = self.binary_op_type(expression.operator, left_type, right_type, expression)
+        return expression.resolved_type
+
+    def analyze_variable(self, expression):
+        expression.resolved_type = self.variable_type(expression)
+        return expression.resolved_type
+
+    def analyze_comparison(self, expression, left_type, right_type):
+        expression.resolved_type = self.comparison_type(left_type, right_type, expression)
+        return expression.resolved_type
+
+    def analyze_integer(self, expression):
+        return "inteiro"
+
+    def analyze_decimal(self, expression):
+        return "decimal"
+
+    def analyze_text(self, expression):
+        return "texto"
+
+    # Manipuladores por tipo de nó; subclasses podem sobrescrever os métodos nomeados aqui.
+    STATEMENT_HANDLERS = {
+        ProgramNode: "analyze_program_node",
+        DeclarationNode: "analyze_declaration",
+        AssignmentNode: "analyze_assignment",
+        BinaryOpNode: "analyze_binary_statement",
+        IfNode: "analyze_if",
+        ForNode: "analyze_for",
+        RangeForNode: "analyze_range_for",
+        WhileNode: "analyze_while",
+        WriteNode: "analyze_write",
+        ReadNode: "analyze_read",
+    }
+
+    EXPRESSION_HANDLERS = {
+        BinaryOpNode: "analyze_binary_op",
+        VariableNode: "analyze_variable",
+        ComparisonNode: "analyze_comparison",
+        int: "analyze_integer",
+        float: "analyze_decimal",
+        str: "analyze_text",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.bind_handlers()
+
+    @classmethod
+    def bind_handlers(cls):
+        cls._statement_handlers = DispatchTable.bind(cls, cls.STATEMENT_HANDLERS)
+        cls._expression_handlers = DispatchTable.bind(cls, cls.EXPRESSION_HANDLERS)
+
 
+SemanticAnalyzer.bind_handlers()
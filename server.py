@@ -0,0 +1,229 @@
+"""Servidor de compilação: mantém o lexer, o parser e os resultados recentes aquecidos entre pedidos.
+
+Cada pedido é um objeto JSON em uma linha e cada resposta também, com o mesmo `id`.
+Os pedidos são atendidos concorrentemente, então as respostas podem sair fora de ordem.
+
+    {"id": 1, "method": "compile", "source": "programa ... fimprog", "optimize": 0}
+    {"id": 1, "ok": true, "code": "...", "diagnostics": [], "optimizations": {}}
+
+Métodos: "compile" (código gerado e diagnósticos), "check" (só os diagnósticos, sem
+gerar código), "ping" e "shutdown". Um programa com erros responde com "ok": false e
+a lista de diagnósticos ({"line", "column", "message"}). Programas pequenos são
+compilados no próprio processo do servidor, sem o custo de enviá-los a outro; os
+maiores vão para um pool de processos, cada um com o seu lexer, parser e cache.
+
+Uso:
+    python server.py                                   (pedidos pela entrada padrão)
+    python server.py --socket /tmp/compilador.sock -j 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import create_lexer
+from parsercode import get_parser
+from compiler import CompilationError, check_source, compile_source, compiler_version
+from cache import CompilationCache
+
+# Programas até este tamanho (em caracteres) são compilados no processo do servidor.
+INLINE_LIMIT = 16 * 1024
+
+# Tamanho máximo de uma linha de pedido; o padrão do asyncio (64 KiB) barraria programas grandes.
+MAX_LINE = 256 * 1024 * 1024
+
+CACHE_ENTRIES = 256
+
+# Estado de cada processo: lexer e parser aquecidos e um cache por nível de otimização.
+_worker = {}
+
+
+class RequestError(Exception):
+    """Pedido malformado: JSON inválido, método desconhecido ou parâmetros errados."""
+
+
+def init_worker(cache_entries=CACHE_ENTRIES):
+    """Prepara o lexer, o parser e os caches do processo."""
+    _worker["lexer"] = create_lexer()
+    _worker["version"] = compiler_version()
+    _worker["cache_entries"] = cache_entries
+    _worker["caches"] = {}
+    get_parser()
+
+
+def cache_for(optimize):
+    caches = _worker["caches"]
+    if optimize not in caches:
+        caches[optimize] = CompilationCache(max_entries=_worker["cache_entries"],
+                                            version=f"{_worker['version']}:O{optimize}")
+    return caches[optimize]
+
+
+def handle(method, source, optimize=0):
+    """Atende um pedido 'compile' ou 'check' no processo atual e devolve a resposta, sem o `id`."""
+    lexer = _worker["lexer"]
+    if method == "check":
+        diagnostics = check_source(source, lexer)
+        return {"ok": not diagnostics, "diagnostics": [d.to_dict() for d in diagnostics]}
+    try:
+        result = cache_for(optimize).compile(
+            source, lambda text: compile_source(text, lexer=lexer, optimize=optimize))
+    except CompilationError as e:
+        return {"ok": False, "diagnostics": [d.to_dict() for d in e.diagnostics]}
+    return {"ok": True, "code": result.code, "diagnostics": [], "optimizations": result.optimizations}
+
+
+def encode(response):
+    return (json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class CompileServer:
+    """Atende pedidos JSON por linha; `jobs` processos compilam os programas maiores que `inline_limit`.
+
+    Com `jobs=0`, todos os pedidos são compilados no processo do servidor.
+    """
+    def __init__(self, jobs=None, inline_limit=INLINE_LIMIT, cache_entries=CACHE_ENTRIES):
+        init_worker(cache_entries)
+        self.inline_limit = inline_limit
+        self.pool = None
+        if jobs != 0:
+            self.pool = ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1,
+                                            initializer=init_worker, initargs=(cache_entries,))
+        self.stopped = asyncio.Event()
+        self.requests = 0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def dispatch(self, request):
+        method = request.get("method", "compile")
+        if method == "ping":
+            return {"ok": True, "version": _worker["version"], "requests": self.requests}
+        if method == "shutdown":
+            self.stopped.set()
+            return {"ok": True}
+        if method not in ("compile", "check"):
+            raise RequestError(f"método desconhecido: {method!r}")
+        source = request.get("source")
+        optimize = request.get("optimize", 0)
+        if not isinstance(source, str):
+            raise RequestError("'source' deve ser um texto")
+        if type(optimize) is not int or optimize not in (0, 1, 2):  # true e false do JSON são bool
+            raise RequestError("'optimize' deve ser 0, 1 ou 2")
+
+        self.requests += 1
+        if self.pool is None or len(source) <= self.inline_limit:
+            return handle(method, source, optimize)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, handle, method, source, optimize)
+
+    async def respond(self, line, write):
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                raise RequestError(f"JSON inválido: {e}")
+            if not isinstance(request, dict):
+                raise RequestError("o pedido deve ser um objeto JSON")
+            request_id = request.get("id")
+            response = await self.dispatch(request)
+        except RequestError as e:
+            response = {"ok": False, "error": f"Pedido inválido: {e}"}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        response["id"] = request_id
+        write(response)
+
+    async def serve_lines(self, reader, write):
+        """Lê pedidos de `reader` até o fim da entrada ou um 'shutdown', respondendo com `write`."""
+        pending = set()
+        while not self.stopped.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(self.respond(line, write))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending)
+
+    async def serve_stdio(self):
+        """Atende os pedidos da entrada padrão, respondendo na saída padrão."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_LINE)
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+        except ValueError:
+            # Entrada redirecionada de um arquivo comum: já está toda disponível.
+            reader.feed_data(sys.stdin.buffer.read())
+            reader.feed_eof()
+        out = sys.stdout.buffer
+
+        def write(response):
+            out.write(encode(response))
+            out.flush()
+
+        await self.until_stopped(self.serve_lines(reader, write))
+
+    async def serve_socket(self, path):
+        """Atende conexões no socket Unix `path` até receber um 'shutdown'."""
+        async def on_client(reader, writer):
+            try:
+                await self.serve_lines(reader, lambda response: writer.write(encode(response)))
+                await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)  # socket deixado por um servidor anterior
+        server = await asyncio.start_unix_server(on_client, path=path, limit=MAX_LINE)
+        print(f"Servidor de compilação em {path}", file=sys.stderr, flush=True)
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def until_stopped(self, serving):
+        """Espera `serving` terminar ou um pedido 'shutdown', o que vier primeiro."""
+        serving = asyncio.ensure_future(serving)
+        stopping = asyncio.ensure_future(self.stopped.wait())
+        await asyncio.wait({serving, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (serving, stopping):
+            task.cancel()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Servidor de compilação com pedidos JSON por linha.")
+    arg_parser.add_argument("--socket", help="caminho do socket Unix (padrão: entrada e saída padrão)")
+    arg_parser.add_argument("-j", "--jobs", type=int,
+                            help="processos para os programas grandes (0: tudo no servidor; padrão: núcleos)")
+    arg_parser.add_argument("--inline-limit", type=int, default=INLINE_LIMIT,
+                            help="tamanho máximo, em caracteres, dos programas compilados no servidor")
+    arg_parser.add_argument("--cache-entries", type=int, default=CACHE_ENTRIES,
+                            help="resultados guardados por nível de otimização em cada processo")
+    args = arg_parser.parse_args(argv)
+
+    server = CompileServer(args.jobs, args.inline_limit, args.cache_entries)
+    try:
+        asyncio.run(server.serve_socket(args.socket) if args.socket else server.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Compartilhamento estrutural das expressões (hash-consing) e as fases que o aproveitam.
+
+Programas gerados por máquina repetem as mesmas subexpressões milhares de vezes.
+Com um `ExpressionInterner` no parser (compiler.parse_source), cada expressão pura
+(variável, operação aritmética ou comparação) é criada uma vez só: ocorrências
+iguais são o mesmo objeto, e a AST vira um grafo acíclico em que os nós de
+expressão podem ter vários pais. Os nós compartilhados ficam com a posição da
+primeira ocorrência.
+
+As fases que guardam algo nos nós precisam saber disso:
+
+- `SharingResolver` copia o nó de uma variável que, em outro escopo, se refere a
+  outro símbolo (uma declaração que esconde outra), e as operações acima dele;
+- `SharingSemanticAnalyzer` calcula o tipo de cada nó uma vez; um erro de tipo em
+  uma expressão repetida é registrado uma vez, na primeira ocorrência;
+- o `Optimizer` copia as expressões que muda (astcode.with_operands);
+- `ReusingIRBuilder` reaproveita, dentro de um bloco básico, o valor de uma
+  subexpressão já calculada enquanto nenhuma variável lida por ela for escrita.
+"""
+from astcode import ASTNode, BinaryOpNode, ComparisonNode, VariableNode, OPERATOR_NODES, evaluate, with_operands
+from ir import IRBuilder, Name
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+
+
+class ExpressionInterner:
+    """Fábrica de nós de expressão: devolve o nó já criado para uma expressão igual.
+
+    A chave de uma operação é o operador e os operandos; como os operandos também
+    vêm da fábrica, um nó é identificado pelo id(), e a busca não percorre a
+    subárvore. Constantes entram na chave com o tipo, para que 1 e 1.0 não se
+    confundam. `created` conta os nós criados e `reused`, os pedidos atendidos
+    com um nó existente.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.created = 0
+        self.reused = 0
+
+    def variable(self, name):
+        return self.intern(name, VariableNode, name)
+
+    def binary_op(self, left, operator, right):
+        return self.intern((BinaryOpNode, operator, operand_key(left), operand_key(right)),
+                           BinaryOpNode, left, operator, right)
+
+    def comparison(self, operator, left, right):
+        return self.intern((ComparisonNode, operator, operand_key(left), operand_key(right)),
+                           ComparisonNode, operator, left, right)
+
+    def intern(self, key, cls, *args):
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = cls(*args)
+            self.created += 1
+        else:
+            self.reused += 1
+        return node
+
+
+def operand_key(value):
+    """Chave de um operando: o id() de um nó (que vem da fábrica) ou a constante com o tipo."""
+    return id(value) if isinstance(value, ASTNode) else (type(value), value)
+
+
+class SharingResolver(Resolver):
+    """`Resolver` para árvores com expressões compartilhadas.
+
+    O primeiro uso de um nó de variável fica com o símbolo visível ali. Um uso
+    seguinte em que o nome se refere a outro símbolo recebe uma cópia do nó, e as
+    operações acima dele também são copiadas (só naquela ocorrência).
+    """
+    def __init__(self):
+        super().__init__()
+        self.bound = set()
+
+    def resolve_expression(self, expression):
+        return evaluate(expression, self._expression_handlers, self)
+
+    def resolve_variable(self, expression):
+        symbol = self.visible.get(expression.var_name)
+        if id(expression) in self.bound:
+            if expression.symbol is symbol:
+                return expression
+            original, expression = expression, VariableNode(expression.var_name)
+            expression.lineno, expression.lexpos = original.lineno, original.lexpos
+        self.bound.add(id(expression))
+        expression.symbol = symbol
+        return expression
+
+    def resolve_operation(self, expression, left, right):
+        return with_operands(expression, left, right)
+
+    def keep_expression(self, expression):
+        return expression
+
+    EXPRESSION_HANDLERS = {
+        VariableNode: "resolve_variable",
+        BinaryOpNode: "resolve_operation",
+        ComparisonNode: "resolve_operation",
+        object: "keep_expression",
+    }
+
+
+class SharingSemanticAnalyzer(SemanticAnalyzer):
+    """`SemanticAnalyzer` que calcula o tipo de cada operação compartilhada uma vez só (`types`: id do nó -> tipo)."""
+    def __init__(self, diagnostics=None):
+        super().__init__(diagnostics)
+        self.types = {}
+
+    def analyze_expression(self, expression):
+        return evaluate(expression, self._expression_handlers, self, self.types)
+
+    def analyze_binary_op(self, expression, left_type, right_type):
+        self.types[id(expression)] = resolved_type = super().analyze_binary_op(expression, left_type, right_type)
+        return resolved_type
+
+    def analyze_comparison(self, expression, left_type, right_type):
+        self.types[id(expression)] = resolved_type = super().analyze_comparison(expression, left_type, right_type)
+        return resolved_type
+
+
+class ReusingIRBuilder(IRBuilder):
+    """`IRBuilder` que reaproveita o valor das subexpressões compartilhadas dentro de um bloco básico.
+
+    `values` liga cada operação já rebaixada no bloco atual (pelo id do nó) ao
+    operando que guarda o valor, e evaluate() o usa no lugar de rebaixar o nó de
+    novo. `dependents` liga uma variável (o seu `Name`), ou o id de uma operação, às
+    operações que a leem: escrever na variável invalida os valores que dependem
+    dela, em cascata. Ao mudar de bloco, todos são descartados, pois o bloco pode
+    ser alcançado por outros caminhos.
+    """
+    def __init__(self):
+        super().__init__()
+        self.values = {}
+        self.dependents = {}
+        self.holders = {}
+        self.values_block = None
+
+    def lower_expression(self, expression):
+        if self.values_block is not self.block:
+            self.values.clear()
+            self.dependents.clear()
+            self.holders.clear()
+            self.values_block = self.block
+        return evaluate(expression, self._expression_handlers, self, self.values)
+
+    def lower_binary_op(self, expression, left, right):
+        return self.remember(expression, self.binary_op(expression, left, right))
+
+    def lower_comparison(self, expression, left, right):
+        return self.remember(expression, super().lower_comparison(expression, left, right))
+
+    def remember(self, expression, value):
+        key = id(expression)
+        self.values[key] = value
+        self.holders[value] = key
+        for operand in (expression.left, expression.right):
+            if isinstance(operand, OPERATOR_NODES):
+                self.dependents.setdefault(id(operand), []).append(key)
+            elif type(operand) is VariableNode:
+                variable = self.variable(operand.var_name, operand.resolved_type, operand.symbol)
+                self.dependents.setdefault(variable, []).append(key)
+        return value
+
+    def forget(self, key):
+        """Descarta os valores que dependem de `key` (o `Name` de uma variável ou o id de uma operação)."""
+        stack = [key]
+        while stack:
+            for dependent in self.dependents.pop(stack.pop(), ()):
+                if self.values.pop(dependent, None) is not None:
+                    stack.append(dependent)
+
+    def append(self, op, target=None, left=None, right=None):
+        super().append(op, target, left, right)
+        if target is not None and not target.temporary:
+            self.forget(target)
+
+    def assign(self, target, value):
+        instructions = self.block.instructions
+        retargeted = (type(value) is Name and value.temporary and instructions
+                      and instructions[-1].target is value)
+        super().assign(target, value)
+        if retargeted:
+            # O temporário deixou de existir: o valor guardado nele passa a estar em `target`.
+            self.forget(target)
+            key = self.holders.get(value)
+            if key is not None and self.values.get(key) is value:
+                self.values[key] = target
+                self.dependents.setdefault(target, []).append(key)
@@ -0,0 +1,146 @@
+"""Compilação de arquivos sem carregar o programa inteiro na memória.
+
+O arquivo é lido em blocos terminados em quebra de linha (por leitura bufferizada
+ou `mmap`), os tokens são produzidos por um gerador e entregues ao parser, e cada
+instrução de nível superior é analisada e traduzida assim que é reconhecida.
+Nenhum token da linguagem atravessa uma quebra de linha, então os blocos podem
+ser analisados de forma independente pelo mesmo lexer.
+"""
+import mmap
+import shutil
+import tempfile
+
+from lexer import create_lexer
+from parsercode import get_parser
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+from code_generator import PythonCodeGenerator, RUNTIME_IMPORT, END_OF_PROGRAM
+from compiler import CompilationError
+from diagnostics import Diagnostic
+from optimizer import Optimizer
+from loops import LoopLowering
+
+BLOCK_SIZE = 1 << 20
+
+
+def iter_source_blocks(path, block_size=BLOCK_SIZE, use_mmap=False):
+    """Lê o arquivo em blocos de aproximadamente `block_size` bytes, cortados em quebras de linha."""
+    with open(path, "rb") as f:
+        if use_mmap:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # arquivo vazio
+                return
+            with mm:
+                pos = 0
+                size = len(mm)
+                while pos < size:
+                    end = mm.find(b"\n", min(pos + block_size, size) - 1)
+                    end = size if end == -1 else end + 1
+                    yield mm[pos:end].decode("utf-8")
+                    pos = end
+            return
+
+        pending = b""
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                break
+            chunk = pending + chunk
+            cut = chunk.rfind(b"\n") + 1
+            if cut == 0:
+                pending = chunk
+                continue
+            pending = chunk[cut:]
+            yield chunk[:cut].decode("utf-8")
+        if pending:
+            yield pending.decode("utf-8")
+
+
+def iter_tokens(blocks, lexer=None):
+    """Gera os tokens de uma sequência de blocos de texto, mantendo a contagem de linhas."""
+    lexer = lexer or create_lexer()
+    lexer.lineno = 1
+    for block in blocks:
+        lexer.input(block)
+        token = lexer.token()
+        while token is not None:
+            yield token
+            token = lexer.token()
+
+
+def parse_stream(blocks, on_statement=None, lexer=None):
+    """Analisa o programa a partir de blocos de texto.
+
+    Com `on_statement`, cada instrução de nível superior é repassada à função
+    e não fica retida na AST devolvida. Os erros léxicos e sintáticos são
+    registrados em `lexer.diagnostics`.
+    """
+    lexer = lexer or create_lexer()
+    tokens = iter_tokens(blocks, lexer)
+    parser = get_parser()
+    parser.statement_sink = on_statement
+    try:
+        return parser.parse(lexer=lexer, tokenfunc=lambda: next(tokens, None))
+    finally:
+        parser.statement_sink = None
+
+
+def compile_path(path, out_path, block_size=BLOCK_SIZE, use_mmap=False, lexer=None, optimize=0):
+    """Compila o arquivo `path` para `out_path` instrução por instrução.
+
+    O gerador escreve o corpo em um arquivo temporário enquanto o programa é lido; ao
+    final, as declarações e o corpo são copiados para `out_path`, produzindo a
+    mesma saída de `PythonCodeGenerator.get_code()`.
+
+    Com `optimize`, cada instrução passa pelo `Optimizer`; as constantes conhecidas
+    são propagadas entre instruções, mas a remoção de atribuições mortas, que
+    exige olhar adiante, só acontece dentro de blocos aninhados.
+
+    Como em `compiler.compile_source`, todos os erros do arquivo são coletados antes
+    de levantar a `CompilationError`; depois do primeiro, nada mais é gerado.
+    """
+    lexer = lexer or create_lexer()
+    diagnostics = lexer.diagnostics = []
+    resolver = Resolver()
+    semantic_analyzer = SemanticAnalyzer(diagnostics)
+    optimizer = Optimizer(optimize) if optimize else None
+    lowering = LoopLowering()
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as body:
+        code_generator = PythonCodeGenerator(sink=body)
+
+        def on_statement(statement):
+            count = len(diagnostics)
+            resolver.resolve(statement)
+            semantic_analyzer.analyze_program(statement)
+            if len(diagnostics) > count:
+                # As posições dos nós são relativas ao bloco em que foram lidos: a coluna
+                # só é calculada para os do bloco atual; os anteriores ficam com a linha.
+                first_line = lexer.lineno - lexer.lexdata.count("\n", 0, lexer.lexpos)
+                for diagnostic in diagnostics[count:]:
+                    if diagnostic.line is not None and diagnostic.line >= first_line:
+                        diagnostic.locate(lexer.lexdata)
+            if diagnostics:
+                return
+            if optimizer is None:
+                code_generator.generate(statement)
+                return
+            for optimized in lowering.lower_block(optimizer.optimize_block([statement])):
+                code_generator.generate(optimized)
+
+        blocks = iter_source_blocks(path, block_size, use_mmap)
+        if parse_stream(blocks, on_statement, lexer) is None:
+            diagnostics.append(Diagnostic("Erro de sintaxe no final do arquivo.", lexer.lineno))
+        if diagnostics:
+            raise CompilationError.from_diagnostics(diagnostics)
+
+        body.seek(0)
+        with open(out_path, "w", encoding="utf-8") as out:
+            out.write(RUNTIME_IMPORT)
+            out.write("\n")
+            for line in code_generator.declarations:
+                out.write(line)
+                out.write("\n")
+            shutil.copyfileobj(body, out)
+            out.write(END_OF_PROGRAM)
@@ -0,0 +1,38 @@
+"""Os módulos do compilador ficam na raiz do repositório: `pytest` os importa de lá."""
+import os
+import shutil
+import signal
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HAS_C_COMPILER = shutil.which(os.environ.get("CC", "cc")) is not None
+native = pytest.mark.skipif(not HAS_C_COMPILER, reason="sem compilador C")
+
+
+class TestTimeout(Exception):
+    """Um teste passou de TIMEOUT segundos: um backend entrou em laço infinito."""
+
+
+TIMEOUT = 30
+
+
+@pytest.fixture(autouse=True)
+def timeout():
+    """Interrompe o teste depois de TIMEOUT segundos, onde há SIGALRM."""
+    if not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def interrupt(signum, frame):
+        raise TestTimeout(f"o teste passou de {TIMEOUT}s")
+
+    previous = signal.signal(signal.SIGALRM, interrupt)
+    signal.alarm(TIMEOUT)
+    try:
+        yield
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
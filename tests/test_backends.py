@@ -0,0 +1,179 @@
+"""Equivalência entre os backends e os níveis de otimização.
+
+Cada programa roda na vm em -O0 com limite de instruções (os que não terminam
+ficam de fora) e o resultado é comparado com o do bytecode_backend, da vm e do
+código Python gerado (texto, com o gerador fundido e com expressões
+compartilhadas) em -O0, -O1 e -O2, e com o do backend C quando há compilador.
+"""
+import random
+
+import pytest
+
+import bytecode_backend
+import c_backend
+import vm
+from benchmarks.workload import generate_program
+from compiler import compile_source
+from conftest import HAS_C_COMPILER, native
+from profiler import profile
+
+STDIN = "3\n4\n5\n" * 30
+STEP_LIMIT = 100000
+LEVELS = (0, 1, 2)
+
+NAMES = ("a", "b", "c")
+LITERALS = {"inteiro": ("1", "2", "7"), "decimal": ("0.5", "2.5"), "texto": ('"x"', '"yz"')}
+
+# Erros de execução do programa, pelo tipo da exceção nos backends Python e pela mensagem no C.
+RUNTIME_ERRORS = {EOFError: "Fim da entrada", ValueError: "Valor inválido", ZeroDivisionError: "Divisão por zero"}
+
+
+def shadowing_program(rng, statements=12):
+    """Programa aleatório que declara os mesmos nomes em escopos aninhados ('se' e 'para')."""
+    scopes = [{}]
+
+    def visible():
+        names = {}
+        for scope in scopes:
+            names.update(scope)
+        return names
+
+    def expression(var_type):
+        options = LITERALS[var_type] + tuple(name for name, t in visible().items() if t == var_type)
+        text = rng.choice(options)
+        if rng.random() < 0.4:
+            operator = "+" if var_type == "texto" else rng.choice("+-*")
+            text = f"{text} {operator} {rng.choice(options)}"
+        return text
+
+
+    def statement(level):
+        choice = rng.random()
+        names = visible()
+        if choice < 0.3 or not names:
+            var_type, name = rng.choice(tuple(LITERALS)), rng.choice(NAMES)
+            scopes[-1][name] = var_type
+            return f"{var_type} {name};"
+        name = rng.choice(tuple(names))
+        if choice < 0.55:
+            return f"{name} := {expression(names[name])};"
+        if choice < 0.7 or level > 2:
+            return f"escreva {name};"
+        if choice < 0.75:
+            return f"leia {name};"
+        counters = [n for n, t in names.items() if t == "inteiro"]
+        if choice < 0.88 or not counters:
+            condition = f"{rng.choice(counters + ['1'])} < {rng.choice(counters + ['2', '5'])}"
+            # 'se' e 'senao' dividem um escopo, como no Resolver. Um 'se' aninhado sem 'senao'
+            # tomaria o 'senao' do 'se' de fora.
+            scopes.append({})
+            text = f"se ({condition}) {statement(level + 1)}"
+            if level > 0 or rng.random() < 0.5:
+                text += f" senao {statement(level + 1)}"
+            scopes.pop()
+            return text
+        counter = rng.choice(counters)
+        scopes.append({})
+        body = statement(level + 1)
+        # O passo do 'para' fica no escopo do corpo: o contador tem que continuar 'inteiro' lá.
+        counted = visible()[counter] == "inteiro"
+        scopes.pop()
+        if not counted:
+            return f"escreva {counter};"
+        return f"para ({counter} := 0; {counter} < 3; {counter} := {counter} + 1) {body}"
+
+    body = "\n".join("    " + statement(0) for _ in range(statements))
+    return f"programa\n{body}\nfimprog\n"
+
+
+def outcome(run):
+    """A saída do programa, ou o tipo do erro de execução."""
+    try:
+        return run().output
+    except tuple(RUNTIME_ERRORS) as e:
+        return type(e)
+
+
+def python_backends(source):
+    """Execução do programa em cada backend Python e nível de otimização."""
+    runs = {}
+    for level in LEVELS:
+        runs[f"bytecode -O{level}"] = lambda level=level: bytecode_backend.run_source(source, STDIN, level)
+        runs[f"vm -O{level}"] = lambda level=level: vm.run_source(source, STDIN, level, STEP_LIMIT)
+        runs[f"texto -O{level}"] = lambda level=level: profile(compile_source(source, optimize=level), STDIN)
+    runs["texto fundido"] = lambda: profile(compile_source(source, fused=True), STDIN)
+    runs["texto compartilhado"] = lambda: profile(compile_source(source, share_expressions=True), STDIN)
+    return runs
+
+
+def reference(source):
+    """O resultado da vm em -O0; pula o programa se ele não termina dentro de STEP_LIMIT instruções."""
+    try:
+        return outcome(lambda: vm.run_source(source, STDIN, 0, STEP_LIMIT))
+    except vm.StepLimitExceeded:
+        pytest.skip("o programa não termina")
+
+
+PROGRAMS = (
+    [pytest.param(shadowing_program(random.Random(seed)), id=f"escopos-{seed}") for seed in range(300)]
+    + [pytest.param(generate_program(30 + seed, seed, 1 + seed % 3, seed % 3), id=f"workload-{seed}")
+       for seed in range(20)]
+)
+
+
+@pytest.mark.parametrize("source", PROGRAMS)
+def test_python_backends_agree(source):
+    expected = reference(source)
+    for name, run in python_backends(source).items():
+        assert outcome(run) == expected, name
+
+
+@native
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("level", (0, 2))
+def test_c_backend_agrees(seed, level):
+    source = shadowing_program(random.Random(seed))
+    expected = reference(source)
+    if isinstance(expected, str):
+        assert c_backend.run_source(source, STDIN, level).output == expected
+    else:
+        with pytest.raises(c_backend.NativeError, match=RUNTIME_ERRORS[expected]):
+            c_backend.run_source(source, STDIN, level)
+
+
+def run_everywhere(source):
+    """Saída do programa em todos os backends e níveis (o C só com compilador)."""
+    outputs = {name: run().output for name, run in python_backends(source).items()}
+    if HAS_C_COMPILER:
+        for level in LEVELS:
+            outputs[f"c -O{level}"] = c_backend.run_source(source, STDIN, level).output
+    return outputs
+
+
+def test_declaration_in_untaken_branch_has_default_value():
+    # 'se' e 'senao' são o mesmo escopo: 'escreva a' lê o 'decimal a' do ramo que não rodou.
+    source = "programa inteiro a; a := 1; se (a == 2) decimal a; senao escreva a; fimprog"
+    assert set(run_everywhere(source).values()) == {"0.0\n"}
+
+
+def test_shadowed_loop_variable_is_not_lowered():
+    # O passo lê e altera o 'i' declarado no corpo: o 'i' do laço nunca muda.
+    source = "programa inteiro i; para (i := 0; i < 3; i := i + 1) inteiro i; escreva i; fimprog"
+    for level in (1, 2):
+        assert compile_source(source, optimize=level).optimizations["ranges"] == 0
+    for level in LEVELS:
+        with pytest.raises(vm.StepLimitExceeded):
+            vm.run_source(source, "", level, STEP_LIMIT)
+
+
+def test_counted_loop_is_lowered():
+    source = "programa inteiro i; para (i := 0; i < 3; i := i + 1) escreva i; escreva i; fimprog"
+    for level in (1, 2):
+        assert compile_source(source, optimize=level).optimizations["ranges"] == 1
+    assert set(run_everywhere(source).values()) == {"0\n1\n2\n3\n"}
+
+
+def test_non_finite_results_are_computed_at_run_time():
+    large = "1" + "0" * 200 + ".0"
+    source = f"programa decimal d; d := {large} * {large}; escreva d; escreva d - d; fimprog"
+    assert set(run_everywhere(source).values()) == {"inf\nnan\n"}
@@ -0,0 +1,51 @@
+"""'leia' de 'inteiro' e 'decimal': a mesma gramática em todos os backends."""
+import pytest
+
+import bytecode_backend
+import c_backend
+import profiler
+import vm
+from conftest import native
+
+PROGRAM = "programa inteiro a; decimal b; leia a; leia b; escreva a; escreva b; fimprog"
+
+PYTHON_BACKENDS = {
+    "bytecode": lambda stdin: bytecode_backend.run_source(PROGRAM, stdin).output,
+    "vm": lambda stdin: vm.run_source(PROGRAM, stdin).output,
+    "texto": lambda stdin: profiler.profile_source(PROGRAM, stdin).output,
+}
+
+INVALID = ["1_000\n1\n", "1\n1_0.5\n", "٣\n1\n", "1\n0x1p3\n", "1\n\n"]
+
+
+@pytest.mark.parametrize("backend", PYTHON_BACKENDS)
+@pytest.mark.parametrize("stdin", INVALID)
+def test_python_rejects_what_c_rejects(backend, stdin):
+    with pytest.raises(ValueError):
+        PYTHON_BACKENDS[backend](stdin)
+
+
+@pytest.mark.parametrize("backend", PYTHON_BACKENDS)
+def test_python_accepts_signs_spaces_and_exponents(backend):
+    assert PYTHON_BACKENDS[backend](" -7 \n+1e3\n") == "-7\n1000.0\n"
+
+
+@native
+@pytest.mark.parametrize("stdin", INVALID)
+def test_c_rejects_invalid_input(stdin):
+    with pytest.raises(c_backend.NativeError, match="Valor inválido"):
+        c_backend.run_source(PROGRAM, stdin)
+
+
+@native
+def test_c_accepts_signs_spaces_and_exponents():
+    assert c_backend.run_source(PROGRAM, " -7 \n+1e3\n").output == "-7\n1000.0\n"
+
+
+@native
+def test_integers_from_two_to_the_63_overflow_only_in_c():
+    stdin = f"{2 ** 63}\n1\n"
+    assert bytecode_backend.run_source(PROGRAM, stdin).output == f"{2 ** 63}\n1.0\n"
+    with pytest.raises(c_backend.NativeError, match="Estouro"):
+        c_backend.run_source(PROGRAM, stdin)
+    assert c_backend.run_source(PROGRAM, f"{2 ** 63 - 1}\n1\n").output == f"{2 ** 63 - 1}\n1.0\n"
@@ -0,0 +1,413 @@
+"""Máquina virtual de registradores que executa o programa sem gerar código Python.
+
+`BytecodeCompiler` traduz a IR (ir.py) para um `Bytecode`: um `array` de
+inteiros com instruções de tamanho fixo (opcode e três operandos), em que cada
+operando é o índice de um registrador ou o destino de um desvio. As variáveis e
+os temporários ocupam os primeiros registradores; as constantes ficam em um pool
+copiado para o fim do banco de registradores, de modo que toda instrução lê os
+operandos do mesmo jeito. run() executa o bytecode em um laço de despacho único.
+
+Superinstruções cobrem o laço interno dos programas: comparação seguida de
+desvio vira uma instrução só, e o 'para' contado (RangeLoop) usa um contador
+escondido com uma instrução por iteração.
+
+As instruções executadas são contadas a cada desvio tomado, pelo tamanho do
+trecho linear percorrido desde o desvio anterior; com `step_limit`, a execução
+para com `StepLimitExceeded` no primeiro desvio depois de passar do limite.
+"""
+import operator
+import sys
+import time
+from array import array
+
+from compiler import CompilationError, parse_source
+from resolver import Resolver
+from semantic import SemanticAnalyzer
+from optimizer import Optimizer
+from loops import LoopLowering
+from ir import Name, Jump, Branch, RangeLoop, NextItem, IRBuilder, ARITHMETIC, COMPARISONS, COPY, TO_FLOAT, READ, WRITE, DECLARE
+from ir_optimizer import IROptimizer
+import runtime
+from bytecode_backend import DEFAULT_VALUES, RunResult
+
+# Opcodes. As operações binárias vêm primeiro, na ordem de OPERATIONS, seguidas
+# das comparações com desvio (mesma função, pulando quando o resultado é falso).
+OPERATIONS = ARITHMETIC + COMPARISONS
+COMPARISON_FUNCTIONS = (operator.lt, operator.gt, operator.le, operator.ge, operator.eq, operator.ne)
+FUNCTIONS = (operator.add, operator.sub, operator.mul, operator.truediv, operator.floordiv) + COMPARISON_FUNCTIONS * 2
+BRANCH_BASE = len(OPERATIONS)
+BRANCH_END = BRANCH_BASE + len(COMPARISONS)
+(MOVE, FOR_ENTER, FOR_ENTER_DOWN, FOR_LOOP, FOR_LOOP_DOWN, JUMP, JUMP_IF_NOT, WRITE_VALUE, TO_DECIMAL,
+ READ_VALUE) = range(BRANCH_END, BRANCH_END + 10)
+
+OPCODE_NAMES = {**{index: f"op {operation}" for index, operation in enumerate(OPERATIONS)},
+                **{BRANCH_BASE + index: f"se não {operation}" for index, operation in enumerate(COMPARISONS)},
+                MOVE: "move", FOR_ENTER: "para entra", FOR_ENTER_DOWN: "para entra desc",
+                FOR_LOOP: "para repete", FOR_LOOP_DOWN: "para repete desc", JUMP: "vá para",
+                JUMP_IF_NOT: "se não", WRITE_VALUE: "escreva", TO_DECIMAL: "float", READ_VALUE: "leia"}
+
+# Conversão do valor lido em 'leia', pelo operando da instrução.
+READ_CONVERSIONS = (str, runtime.inteiro, runtime.decimal)
+READ_CODES = {None: 0, "inteiro": 1, "decimal": 2}
+
+WIDTH = 4
+END = None  # destino de desvio: o fim do programa
+
+
+class StepLimitExceeded(Exception):
+    """A execução passou de `step_limit` instruções; `steps` é o número executado até o desvio em que parou."""
+    def __init__(self, limit, steps):
+        super().__init__(f"Erro: Limite de {limit} instruções excedido.")
+        self.limit = limit
+        self.steps = steps
+
+
+class Bytecode:
+    """Programa compilado: `code` (array de inteiros, WIDTH por instrução) e o banco de registradores inicial.
+
+    `registers` tem o valor padrão do tipo nos registradores das variáveis (como
+    no backend C, todas começam com ele, declaradas ou não em um ramo executado),
+    None nos dos temporários e os valores iniciais dos contadores e das constantes; `variables` liga o nome de
+    cada variável do escopo global ao seu registrador e `names` descreve cada
+    registrador para disassemble().
+    """
+    __slots__ = ("code", "registers", "variables", "names")
+
+    def __init__(self, code, registers, variables, names):
+        self.code = code
+        self.registers = registers
+        self.variables = variables
+        self.names = names
+
+    def __len__(self):
+        return len(self.code) // WIDTH
+
+    def __repr__(self):
+        return f"Bytecode({len(self)} instruções, {len(self.registers)} registradores)"
+
+
+class BytecodeCompiler:
+    """Traduz uma `ir.Function` para `Bytecode`.
+
+    Os blocos saem na ordem do percurso em pós-ordem reversa (o ramo 'então' e o
+    corpo dos laços logo depois do bloco que desvia para eles), e os desvios para
+    o bloco seguinte são omitidos.
+    """
+    def __init__(self):
+        self.code = array("i")
+        self.slots = {}
+        self.names = []
+        self.registers = []
+        self.constants = {}
+        self.fixups = []
+
+    def compile(self, function):
+        uses = function.use_counts()
+        layout = reverse_postorder_then_first(function)
+        self.allocate(layout)
+        offsets = {}
+        for index, block in enumerate(layout):
+            offsets[block] = len(self.code)
+            following = layout[index + 1] if index + 1 < len(layout) else END
+            instructions = block.instructions
+            terminator = block.terminator
+            fused = self.fused_comparison(instructions, terminator, uses)
+            for instruction in instructions[:-1] if fused else instructions:
+                self.instruction(instruction)
+            self.terminator(terminator, following, fused)
+        offsets[END] = len(self.code)
+        for position, block in self.fixups:
+            self.code[position] = offsets[block]
+        return Bytecode(self.code, self.registers, self.program_variables(function), self.names)
+
+    def program_variables(self, function):
+        """Nome -> registrador das variáveis do escopo global, como as de bytecode_backend.run().
+
+        Cada declaração tem o seu registrador; de um nome redeclarado, fica a última declaração.
+        """
+        variables = {}
+        for name in function.variables:
+            symbol = name.symbol
+            if name in self.slots and (symbol is None or symbol.depth == 0):
+                variables[name.name if symbol is None else symbol.name] = self.slots[name]
+        return variables
+
+    def allocate(self, layout):
+        """Dá um registrador a cada `Name` e aos contadores dos laços; as constantes, sem repetição, ficam no fim."""
+        operands = []
+        for block in layout:
+            for instruction in block.instructions:
+                if instruction.op == DECLARE:
+                    operands += (instruction.target, DEFAULT_VALUES[instruction.left])
+                elif instruction.op == READ:
+                    operands.append(instruction.target)
+                else:
+                    operands += (instruction.target, instruction.left, instruction.right)
+            terminator = block.terminator
+            if isinstance(terminator, Branch):
+                operands.append(terminator.condition)
+            elif isinstance(terminator, RangeLoop):
+                operands += (terminator.variable, terminator.start, terminator.stop)
+                self.loop_registers(terminator)
+        constants = []
+        for value in operands:
+            if type(value) is Name:
+                if value not in self.slots:
+                    initial = None if value.temporary else DEFAULT_VALUES.get(value.type)
+                    self.slots[value] = self.new_register(value.name, initial)
+            elif value is not None:
+                constants.append(value)
+        for value in constants:
+            key = (type(value), repr(value))
+            if key not in self.constants:
+                self.constants[key] = self.new_register(repr(value), value)
+
+    def fused_comparison(self, instructions, terminator, uses):
+        """A comparação no fim do bloco que só serve de condição para o `Branch` que o termina."""
+        if not isinstance(terminator, Branch) or not instructions:
+            return None
+        last = instructions[-1]
+        if last.target is terminator.condition and last.op in COMPARISONS and last.target.temporary \
+                and uses.get(last.target) == 1:
+            return last
+        return None
+
+    def register(self, value):
+        if type(value) is Name:
+            return self.slots[value]
+        return self.constants[(type(value), repr(value))]
+
+    def new_register(self, name, value=None):
+        self.registers.append(value)
+        self.names.append(name)
+        return len(self.registers) - 1
+
+    def emit(self, opcode, a=0, b=0, c=0):
+        self.code.extend((opcode, a, b, c))
+
+    def jump_to(self, block):
+        """Registra o último operando da instrução recém-emitida como destino de desvio para `block`."""
+        self.fixups.append((len(self.code) - 1, block))
+
+    def instruction(self, instruction):
+        op, target = instruction.op, instruction.target
+        if op in OPERATIONS:
+            self.emit(OPERATIONS.index(op), self.register(target), self.register(instruction.left),
+                      self.register(instruction.right))
+        elif op == COPY:
+            self.emit(MOVE, self.register(target), self.register(instruction.left))
+        elif op == TO_FLOAT:
+            self.emit(TO_DECIMAL, self.register(target), self.register(instruction.left))
+        elif op == WRITE:
+            self.emit(WRITE_VALUE, self.register(instruction.left))
+        elif op == READ:
+            self.emit(READ_VALUE, self.register(target), READ_CODES[instruction.left])
+        elif op == DECLARE:
+            # Como em bytecode_backend: a declaração dá à variável o valor padrão do tipo. Cada
+            # declaração tem o seu registrador, então uma que esconde outra não apaga o valor dela.
+            self.emit(MOVE, self.register(target), self.register(DEFAULT_VALUES[instruction.left]))
+        else:
+            raise TypeError(f"Instrução da IR não suportada: {instruction!r}")
+
+    def terminator(self, terminator, following, fused):
+        if terminator is None:
+            if following is not END:
+                self.emit(JUMP)
+                self.jump_to(END)
+        elif isinstance(terminator, Jump):
+            if terminator.target is not following:
+                self.emit(JUMP)
+                self.jump_to(terminator.target)
+        elif isinstance(terminator, Branch):
+            if fused is not None:
+                self.emit(BRANCH_BASE + COMPARISONS.index(fused.op), self.register(fused.left),
+                          self.register(fused.right))
+            else:
+                self.emit(JUMP_IF_NOT, self.register(terminator.condition))
+            self.jump_to(terminator.otherwise)
+            if terminator.then is not following:
+                self.emit(JUMP)
+                self.jump_to(terminator.then)
+        elif isinstance(terminator, RangeLoop):
+            counter = self.loop_registers(terminator)
+            self.emit(MOVE, counter, self.register(terminator.start))
+            self.emit(MOVE, counter + 1, self.register(terminator.stop))
+            self.emit(FOR_ENTER if terminator.step > 0 else FOR_ENTER_DOWN,
+                      self.register(terminator.variable), counter)
+            self.jump_to(terminator.exit)
+            if terminator.body is not following:
+                self.emit(JUMP)
+                self.jump_to(terminator.body)
+        elif isinstance(terminator, NextItem):
+            loop = terminator.loop
+            self.emit(FOR_LOOP if loop.step > 0 else FOR_LOOP_DOWN, self.register(loop.variable),
+                      self.loop_registers(loop))
+            self.jump_to(loop.body)
+            if loop.exit is not following:
+                self.emit(JUMP)
+                self.jump_to(loop.exit)
+        else:
+            raise TypeError(f"Terminador da IR não suportado: {terminator!r}")
+
+    def loop_registers(self, loop):
+        """Registradores escondidos do 'para' contado: próximo valor, limite e passo (constante)."""
+        counter = self.slots.get(loop)
+        if counter is None:
+            name = loop.variable.name
+            counter = self.slots[loop] = self.new_register(f"{name}.próximo")
+            self.new_register(f"{name}.limite")
+            self.new_register(f"{name}.passo", loop.step)
+        return counter
+
+
+def reverse_postorder_then_first(function):
+    """Pós-ordem reversa visitando os sucessores de trás para frente: o ramo 'então' e o corpo vêm logo depois."""
+    entry = function.entry
+    order, visited = [], {entry}
+    stack = [(entry, iter(entry.successors[::-1]))]
+    while stack:
+        block, successors = stack[-1]
+        for successor in successors:
+            if successor not in visited:
+                visited.add(successor)
+                stack.append((successor, iter(successor.successors[::-1])))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def compile_program(program, optimize=0):
+    """Traduz um ProgramNode (ou FlatAST) já analisado para `Bytecode`; com `optimize` >= 2, otimiza a IR antes."""
+    function = IRBuilder().lower(program)
+    if optimize >= 2:
+        IROptimizer().optimize(function)
+    return BytecodeCompiler().compile(function)
+
+
+def compile_to_bytecode(source, optimize=0):
+    """Compila o código-fonte da linguagem, com verificação semântica, para `Bytecode`.
+
+    Como em `compiler.compile_source`, todos os erros são levantados juntos em uma `CompilationError`.
+    """
+    diagnostics = []
+    program = parse_source(source, diagnostics=diagnostics)
+    if program is not None:
+        Resolver().resolve(program)
+        SemanticAnalyzer(diagnostics).analyze_program(program)
+    if diagnostics:
+        raise CompilationError.from_diagnostics(diagnostics, source)
+    if optimize:
+        program = LoopLowering().lower(Optimizer(optimize).optimize(program))
+    return compile_program(program, optimize)
+
+
+def run(bytecode, stdin="", step_limit=None):
+    """Executa o bytecode, lendo `leia` de `stdin`; devolve um `RunResult` com `steps`, as instruções executadas."""
+    read_line = runtime.Input(stdin).read_line
+    written = []
+    write = written.append
+    registers = list(bytecode.registers)
+    code = bytecode.code.tolist()
+    functions = FUNCTIONS
+    limit = sys.maxsize if step_limit is None else step_limit
+    end = len(code)
+    pc = start = steps = 0
+
+    started = time.perf_counter()
+    while pc < end:
+        op = code[pc]
+        if op < BRANCH_BASE:
+            registers[code[pc + 1]] = functions[op](registers[code[pc + 2]], registers[code[pc + 3]])
+            pc += WIDTH
+            continue
+        if op < BRANCH_END:
+            if functions[op](registers[code[pc + 1]], registers[code[pc + 2]]):
+                pc += WIDTH
+                continue
+        elif op == MOVE:
+            registers[code[pc + 1]] = registers[code[pc + 2]]
+            pc += WIDTH
+            continue
+        elif op == FOR_LOOP or op == FOR_LOOP_DOWN:
+            counter = code[pc + 2]
+            value = registers[counter]
+            if value < registers[counter + 1] if op == FOR_LOOP else value > registers[counter + 1]:
+                registers[code[pc + 1]] = value
+                registers[counter] = value + registers[counter + 2]
+            else:
+                pc += WIDTH
+                continue
+        elif op == FOR_ENTER or op == FOR_ENTER_DOWN:
+            counter = code[pc + 2]
+            value = registers[counter]
+            if value < registers[counter + 1] if op == FOR_ENTER else value > registers[counter + 1]:
+                registers[code[pc + 1]] = value
+                registers[counter] = value + registers[counter + 2]
+                pc += WIDTH
+                continue
+        elif op == JUMP_IF_NOT:
+            if registers[code[pc + 1]]:
+                pc += WIDTH
+                continue
+        elif op == WRITE_VALUE:
+            write(registers[code[pc + 1]])
+            pc += WIDTH
+            continue
+        elif op == TO_DECIMAL:
+            registers[code[pc + 1]] = float(registers[code[pc + 2]])
+            pc += WIDTH
+            continue
+        elif op == READ_VALUE:
+            registers[code[pc + 1]] = READ_CONVERSIONS[code[pc + 2]](read_line())
+            pc += WIDTH
+            continue
+        elif op != JUMP:
+            raise ValueError(f"Opcode inválido {op} na posição {pc // WIDTH}.")
+        # Desvio tomado: conta o trecho linear que termina aqui.
+        steps += (pc - start) // WIDTH + 1
+        if steps > limit:
+            raise StepLimitExceeded(step_limit, steps)
+        pc = start = code[pc + 3]
+    steps += (pc - start) // WIDTH
+    elapsed = time.perf_counter() - started
+
+    output = "".join(f"{value}\n" for value in written)
+    # Como no código Python gerado, a IR não separa os escopos: cada nome é uma variável só.
+    variables = {name: registers[slot] for name, slot in bytecode.variables.items() if registers[slot] is not None}
+    return RunResult(output, variables, elapsed, steps)
+
+
+def run_source(source, stdin="", optimize=0, step_limit=None):
+    """Compila e executa o código-fonte na máquina virtual."""
+    return run(compile_to_bytecode(source, optimize), stdin, step_limit)
+
+
+def disassemble(bytecode):
+    """Texto do bytecode, uma instrução por linha, com os registradores pelo nome."""
+    names = bytecode.names
+    code = bytecode.code
+    lines = []
+    for position in range(0, len(code), WIDTH):
+        op, a, b, c = code[position:position + WIDTH]
+        label = OPCODE_NAMES[op]
+        if op < BRANCH_BASE:
+            operands = f"{names[a]} = {names[b]}, {names[c]}"
+        elif op < BRANCH_END:
+            operands = f"{names[a]}, {names[b]} -> {c // WIDTH}"
+        elif op in (MOVE, TO_DECIMAL):
+            operands = f"{names[a]} = {names[b]}"
+        elif op in (FOR_ENTER, FOR_ENTER_DOWN, FOR_LOOP, FOR_LOOP_DOWN):
+            operands = f"{names[a]} = {names[b]} -> {c // WIDTH}"
+        elif op == JUMP:
+            operands = f"{c // WIDTH}"
+        elif op == JUMP_IF_NOT:
+            operands = f"{names[a]} -> {c // WIDTH}"
+        elif op == WRITE_VALUE:
+            operands = names[a]
+        else:
+            operands = f"{names[a]} ({READ_CONVERSIONS[b].__name__})"
+        lines.append(f"{position // WIDTH:5d}  {label:<18}{operands}")
+    return "\n".join(lines)